@@ -0,0 +1,88 @@
+"""Initial schema
+
+The tables as they were before migrations existed. Databases created
+back then already have them: run `alembic stamp 0001` once, then
+`alembic upgrade head`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("email", sa.String()),
+        sa.Column("hashed_password", sa.String()),
+        sa.Column("full_name", sa.String())
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "resumes",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("title", sa.String()),
+        sa.Column("content", sa.Text()),
+        sa.Column("content_vector", sa.LargeBinary(), nullable=True),
+        sa.Column("file_path", sa.String()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"))
+    )
+    op.create_index("ix_resumes_id", "resumes", ["id"])
+
+    op.create_table(
+        "job_applications",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("company", sa.String()),
+        sa.Column("position", sa.String()),
+        sa.Column("job_description", sa.Text()),
+        sa.Column("description_vector", sa.LargeBinary(), nullable=True),
+        sa.Column("status", sa.String()),
+        sa.Column("date_applied", sa.DateTime()),
+        sa.Column("notes", sa.Text(), nullable=True),
+        sa.Column("match_score", sa.Float(), nullable=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("resume_id", sa.Integer(), sa.ForeignKey("resumes.id"), nullable=True)
+    )
+    op.create_index("ix_job_applications_id", "job_applications", ["id"])
+
+    op.create_table(
+        "resume_analyses",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("resume_id", sa.Integer(), sa.ForeignKey("resumes.id")),
+        sa.Column("application_id", sa.Integer(), sa.ForeignKey("job_applications.id")),
+        sa.Column("match_score", sa.Float()),
+        sa.Column("missing_keywords", sa.Text()),
+        sa.Column("suggested_modifications", sa.Text()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("status", sa.String()),
+        sa.Column("priority", sa.Integer()),
+        sa.Column("job_description", sa.Text(), nullable=True),
+        sa.Column("progress", sa.Integer()),
+        sa.Column("stage", sa.String(), nullable=True),
+        sa.Column("result", sa.Text(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("completed_at", sa.DateTime(), nullable=True)
+    )
+    op.create_index("ix_resume_analyses_id", "resume_analyses", ["id"])
+    op.create_index("ix_resume_analyses_status", "resume_analyses", ["status"])
+
+
+def downgrade() -> None:
+    op.drop_table("resume_analyses")
+    op.drop_table("job_applications")
+    op.drop_table("resumes")
+    op.drop_table("users")
@@ -0,0 +1,49 @@
+"""Indexes for the hot analysis and application queries
+
+Each index leads with the column a route filters on and continues with
+the one it filters or orders by next, so the lookup and the ordering
+come from the index instead of a scan and a sort:
+
+- a resume's analyses by date, and a user's resumes by date
+- a user's applications by status, and by date applied (combined reports)
+- an application's analyses by status (the join from those applications)
+- queued jobs by priority, which also serves every other status filter
+  and so replaces the single-column status index
+- applications of a resume
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16
+"""
+from alembic import op
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_resumes_user_id_created_at", "resumes", ["user_id", "created_at"]),
+    ("ix_job_applications_user_id_status", "job_applications", ["user_id", "status"]),
+    ("ix_job_applications_user_id_date_applied", "job_applications", ["user_id", "date_applied"]),
+    ("ix_job_applications_resume_id", "job_applications", ["resume_id"]),
+    ("ix_resume_analyses_resume_id_created_at", "resume_analyses", ["resume_id", "created_at"]),
+    ("ix_resume_analyses_application_id_status", "resume_analyses", ["application_id", "status"]),
+    ("ix_resume_analyses_status_priority", "resume_analyses", ["status", "priority"])
+]
+
+
+def upgrade() -> None:
+    # On PostgreSQL, build without blocking writes to tables already in use;
+    # CONCURRENTLY can't run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True)
+    op.drop_index("ix_resume_analyses_status", table_name="resume_analyses")
+
+
+def downgrade() -> None:
+    op.create_index("ix_resume_analyses_status", "resume_analyses", ["status"])
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,34 @@
+"""Indexes for keyset pagination of the list endpoints
+
+The lists are ordered by (timestamp, id) descending and each page
+starts after the last key of the previous one, so an index on exactly
+those columns serves any page as a range read.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16
+"""
+from alembic import op
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_resumes_created_at_id", "resumes", ["created_at", "id"]),
+    ("ix_job_applications_date_applied_id", "job_applications", ["date_applied", "id"]),
+    ("ix_resume_analyses_created_at_id", "resume_analyses", ["created_at", "id"])
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,29 @@
+"""Owner and lease of running analysis jobs
+
+A running job records the queue worker that claimed it and when that
+worker last renewed its claim, so any process can tell a job whose
+worker died from one that is still running elsewhere.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("resume_analyses", sa.Column("worker_id", sa.String(), nullable=True))
+    op.add_column("resume_analyses", sa.Column("heartbeat_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("resume_analyses") as batch_op:
+        batch_op.drop_column("heartbeat_at")
+        batch_op.drop_column("worker_id")
@@ -0,0 +1,52 @@
+"""Make the keyset pagination timestamps NOT NULL
+
+Pages are ordered by these columns and a cursor carries the last row's
+value, so a NULL would have no place in the order and no cursor. The
+ORM always sets them; rows inserted some other way, and legacy rows,
+may not have. Backfill those from the row's nearest other timestamp,
+and default the columns in the database too.
+
+On PostgreSQL, SET NOT NULL scans the table while holding its lock.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+# table, column, fallbacks for NULLs in order of preference
+COLUMNS = [
+    ("resumes", "created_at", ["updated_at"]),
+    ("job_applications", "date_applied", []),
+    ("resume_analyses", "created_at", ["started_at", "completed_at"])
+]
+
+
+# UTC now; on SQLite in the text format SQLAlchemy stores datetimes in,
+# which keeps comparisons with the values it writes, and binds, correct
+NOW = {
+    "sqlite": "(strftime('%Y-%m-%d %H:%M:%f000', 'now'))",
+    "postgresql": "timezone('utc', now())"
+}
+
+
+def upgrade() -> None:
+    now = NOW.get(op.get_bind().dialect.name, "CURRENT_TIMESTAMP")
+    for table, column, fallbacks in COLUMNS:
+        value = f"COALESCE({', '.join(fallbacks)}, {now})" if fallbacks else now
+        op.execute(f"UPDATE {table} SET {column} = {value} WHERE {column} IS NULL")
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(column, existing_type=sa.DateTime(), nullable=False, server_default=sa.text(now))
+
+
+def downgrade() -> None:
+    for table, column, _ in reversed(COLUMNS):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(column, existing_type=sa.DateTime(), nullable=True, server_default=None)
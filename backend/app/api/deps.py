@@ -0,0 +1,22 @@
+from typing import Dict
+from fastapi import Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+import json
+from ..database import get_async_db
+from . import models
+
+
+async def get_analysis(analysis_id: int, db: AsyncSession = Depends(get_async_db)) -> models.ResumeAnalysis:
+    analysis = await db.get(models.ResumeAnalysis, analysis_id)
+    if not analysis:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    return analysis
+
+
+def get_analysis_data(analysis: models.ResumeAnalysis = Depends(get_analysis)) -> Dict:
+    """The stored report of a completed analysis."""
+    if analysis.status != "completed":
+        raise HTTPException(status_code=409, detail=f"Analysis is {analysis.status}")
+    if not analysis.result:
+        raise HTTPException(status_code=404, detail="Analysis has no stored report")
+    return json.loads(analysis.result)
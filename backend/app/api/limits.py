@@ -0,0 +1,64 @@
+from typing import Optional
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class RequestTooLarge(HTTPException):
+    def __init__(self, detail: str):
+        super().__init__(status_code=413, detail=detail)
+
+
+class LimitRequestSize:
+    """ASGI middleware answering 413 to request bodies over `max_bytes`.
+
+    A Content-Length over the limit is rejected before the body is read.
+    Otherwise the body is counted as it arrives, so chunked bodies, and
+    ones that outrun their Content-Length, are cut off at the limit
+    instead of being spooled whole before an endpoint sees them.
+    """
+
+    def __init__(self, app: ASGIApp, max_bytes: int, detail: Optional[str] = None):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.detail = detail or f"Request body exceeds the {max_bytes} byte limit"
+
+    def _rejection(self) -> JSONResponse:
+        return JSONResponse(status_code=413, content={"detail": self.detail})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        length = dict(scope["headers"]).get(b"content-length", b"")
+        if length.isdigit() and int(length) > self.max_bytes:
+            await self._rejection()(scope, receive, send)
+            return
+
+        received = 0
+        started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # FastAPI passes HTTPExceptions raised while reading the
+                    # body on to its handler, which answers with the 413
+                    raise RequestTooLarge(self.detail)
+            return message
+
+        async def tracking_send(message: Message) -> None:
+            nonlocal started
+            started = started or message["type"] == "http.response.start"
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except RequestTooLarge:
+            # Raised outside an endpoint's body parsing, e.g. by a streaming read
+            if started:
+                raise
+            await self._rejection()(scope, receive, send)
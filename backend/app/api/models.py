@@ -1,8 +1,36 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, LargeBinary, Index
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql.expression import FunctionElement
 from datetime import datetime
 from ..database import Base
 
+
+class utcnow(FunctionElement):
+    """The current UTC time as the database computes it, for server defaults.
+
+    SQLite stores it in the text format SQLAlchemy writes, so rows from
+    either source compare correctly, e.g. against pagination cursors.
+    """
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow, "sqlite")
+def _sqlite_utcnow(element, compiler, **kw):
+    return "(strftime('%Y-%m-%d %H:%M:%f000', 'now'))"
+
+
+@compiles(utcnow, "postgresql")
+def _postgresql_utcnow(element, compiler, **kw):
+    return "timezone('utc', now())"
+
+
+@compiles(utcnow)
+def _default_utcnow(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"
+
+
 class User(Base):
     __tablename__ = "users"
 
@@ -15,12 +43,19 @@ class User(Base):
 
 class Resume(Base):
     __tablename__ = "resumes"
+    __table_args__ = (
+        # A user's resumes, newest first; all resumes, a page at a time
+        Index("ix_resumes_user_id_created_at", "user_id", "created_at"),
+        Index("ix_resumes_created_at_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String)
     content = Column(Text)
+    content_vector = Column(LargeBinary, nullable=True)  # float32 document vector of content
     file_path = Column(String)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    # Keyset pagination columns are never NULL, whoever inserts the row
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow, server_default=utcnow())
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     user_id = Column(Integer, ForeignKey("users.id"))
     
@@ -29,17 +64,25 @@ class Resume(Base):
 
 class JobApplication(Base):
     __tablename__ = "job_applications"
+    __table_args__ = (
+        # A user's applications by status, and in the order they applied (combined reports)
+        Index("ix_job_applications_user_id_status", "user_id", "status"),
+        Index("ix_job_applications_user_id_date_applied", "user_id", "date_applied"),
+        # All applications, a page at a time
+        Index("ix_job_applications_date_applied_id", "date_applied", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     company = Column(String)
     position = Column(String)
     job_description = Column(Text)
+    description_vector = Column(LargeBinary, nullable=True)  # float32 document vector of job_description
     status = Column(String)  # Applied, Interview, Offer, Rejected, etc.
-    date_applied = Column(DateTime, default=datetime.utcnow)
+    date_applied = Column(DateTime, nullable=False, default=datetime.utcnow, server_default=utcnow())
     notes = Column(Text, nullable=True)
     match_score = Column(Float, nullable=True)
     user_id = Column(Integer, ForeignKey("users.id"))
-    resume_id = Column(Integer, ForeignKey("resumes.id"), nullable=True)
+    resume_id = Column(Integer, ForeignKey("resumes.id"), nullable=True, index=True)
 
     user = relationship("User", back_populates="applications")
     resume = relationship("Resume")
@@ -47,6 +90,15 @@ class JobApplication(Base):
 
 class ResumeAnalysis(Base):
     __tablename__ = "resume_analyses"
+    __table_args__ = (
+        # A resume's analyses, newest first; all analyses, a page at a time
+        Index("ix_resume_analyses_resume_id_created_at", "resume_id", "created_at"),
+        Index("ix_resume_analyses_created_at_id", "created_at", "id"),
+        # An application's completed analyses, joined from its user's applications
+        Index("ix_resume_analyses_application_id_status", "application_id", "status"),
+        # The queued jobs, by priority, on startup and when submitting
+        Index("ix_resume_analyses_status_priority", "status", "priority"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     resume_id = Column(Integer, ForeignKey("resumes.id"))
@@ -54,7 +106,20 @@ class ResumeAnalysis(Base):
     match_score = Column(Float)
     missing_keywords = Column(Text)  # Stored as JSON string
     suggested_modifications = Column(Text)  # Stored as JSON string
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow, server_default=utcnow())
+
+    # Job queue state; analyses computed inline are stored already completed
+    status = Column(String, default="completed")  # queued, running, cancelling, completed, failed, cancelled
+    priority = Column(Integer, default=0)  # Higher runs first
+    job_description = Column(Text, nullable=True)  # Analyzed text when not taken from the application
+    progress = Column(Integer, default=100)
+    stage = Column(String, nullable=True)  # Last completed analysis stage
+    result = Column(Text, nullable=True)  # Full analysis report as JSON string
+    error = Column(Text, nullable=True)
+    started_at = Column(DateTime, nullable=True)
+    completed_at = Column(DateTime, nullable=True)
+    worker_id = Column(String, nullable=True)  # Queue worker running the job
+    heartbeat_at = Column(DateTime, nullable=True)  # Its claim lapses ANALYSIS_LEASE_SECONDS after this
 
     resume = relationship("Resume", back_populates="analyses")
     application = relationship("JobApplication", back_populates="analysis")
\ No newline at end of file
@@ -0,0 +1,100 @@
+"""Keyset pagination of list endpoints, newest first.
+
+Rows are ordered by (timestamp, id) descending, and a page's cursor is
+the sort key of its last row: the next page is the rows strictly after
+that key, read from an index on those columns however deep the page is.
+An offset instead counts and discards every earlier row, and rows
+inserted meanwhile shift the pages under the client.
+
+Cursors are opaque to clients: url-safe base64 of "1|<timestamp>|<id>",
+the leading 1 being the format version. The timestamp columns are NOT
+NULL (migration 0005), since a NULL key would have no cursor.
+"""
+from typing import List, Optional, Tuple
+import base64
+import binascii
+from datetime import datetime
+from fastapi import HTTPException, Request, Response
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query
+
+CURSOR_VERSION = "1"
+
+# Page size bounds shared by the list endpoints
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    raw = f"{CURSOR_VERSION}|{timestamp.isoformat()}|{row_id}".encode("ascii")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """The (timestamp, id) in `cursor`; raises ValueError if it isn't one of ours."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("ascii")
+        version, timestamp, row_id = raw.split("|")
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Malformed cursor")
+    if version != CURSOR_VERSION:
+        raise ValueError(f"Unsupported cursor version {version}")
+    return datetime.fromisoformat(timestamp), int(row_id)
+
+
+def _page_statement(statement, timestamp_column, id_column, cursor: Optional[str], limit: int):
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        statement = statement.filter(tuple_(timestamp_column, id_column) < tuple_(*after))
+    # One extra row tells whether another page follows
+    return statement.order_by(timestamp_column.desc(), id_column.desc()).limit(limit + 1)
+
+
+def _split_page(rows: List, timestamp_column, id_column, limit: int) -> Tuple[List, Optional[str]]:
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, timestamp_column.key), getattr(last, id_column.key))
+
+
+def keyset_page(
+    query: Query,
+    timestamp_column,
+    id_column,
+    cursor: Optional[str],
+    limit: int
+) -> Tuple[List, Optional[str]]:
+    """One page of `query` after `cursor`, and the cursor of the next (None on the last page).
+
+    `query` must select the timestamp and id columns, as attributes of
+    its entity or as named columns.
+    """
+    rows = _page_statement(query, timestamp_column, id_column, cursor, limit).all()
+    return _split_page(rows, timestamp_column, id_column, limit)
+
+
+async def keyset_page_async(
+    db: AsyncSession,
+    statement: Select,
+    timestamp_column,
+    id_column,
+    cursor: Optional[str],
+    limit: int
+) -> Tuple[List, Optional[str]]:
+    """keyset_page for an AsyncSession and a select() of one entity."""
+    page = _page_statement(statement, timestamp_column, id_column, cursor, limit)
+    rows = list((await db.scalars(page)).all())
+    return _split_page(rows, timestamp_column, id_column, limit)
+
+
+def page_headers(request: Request, response: Response, next_cursor: Optional[str]) -> None:
+    """Point the client at the next page, if any, in X-Next-Cursor and a Link header."""
+    if next_cursor is None:
+        return
+    response.headers["X-Next-Cursor"] = next_cursor
+    response.headers["Link"] = f'<{request.url.include_query_params(cursor=next_cursor)}>; rel="next"'
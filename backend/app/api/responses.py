@@ -0,0 +1,133 @@
+from typing import Dict, Iterator, Optional, Tuple
+import os
+import re
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+from ..services.charts import FORMATS, chart_key, chart_renderer
+
+# Charts of a finished analysis never change, but may hold personal data
+CHART_CACHE_CONTROL = "private, max-age=86400"
+
+FILE_CHUNK_SIZE = 64 * 1024
+
+BYTE_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match already names `etag`."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored
+    candidates = {tag.strip() for tag in header.split(",")}
+    return etag in candidates or f"W/{etag}" in candidates
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+
+async def chart_response(
+    request: Request,
+    chart: Tuple[str, Dict],
+    format: str = "png",
+    cache_control: str = CHART_CACHE_CONTROL
+) -> Response:
+    """Serve a chart image with a strong ETag.
+
+    The ETag is the chart's cache key, a hash of its inputs, so a
+    revalidating client gets a 304 without the chart being rendered.
+    """
+    kind, spec = chart
+    etag = f'"{chart_key(kind, spec, format)}"'
+    if etag_matches(request, etag):
+        return not_modified(etag, cache_control)
+
+    image = await chart_renderer.render(kind, spec, format)
+    return Response(
+        content=image,
+        media_type=FORMATS[format],
+        headers={"ETag": etag, "Cache-Control": cache_control}
+    )
+
+
+def byte_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Inclusive (start, end) of a single-range Range header, or None for the whole file.
+
+    Raises ValueError when the range lies outside the file. Multiple
+    ranges and malformed headers are answered with the whole file, which
+    RFC 9110 allows.
+    """
+    match = BYTE_RANGE.match(header.strip()) if header else None
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+    first, last = match.groups()
+    if first == "":
+        # Suffix range: the last N bytes
+        if int(last) == 0 or size == 0:
+            raise ValueError("Unsatisfiable range")
+        return max(size - int(last), 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("Unsatisfiable range")
+    return start, end
+
+
+def _file_chunks(path: str, start: int, length: int) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(FILE_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def file_response(
+    request: Request,
+    path: str,
+    media_type: str,
+    filename: str,
+    cache_control: str = CHART_CACHE_CONTROL
+) -> Response:
+    """Serve a stored file with ETag revalidation and single byte ranges.
+
+    Starlette's FileResponse ignores Range in this version, so resumed
+    and partial downloads of large reports are handled here. The ETag
+    comes from the file's mtime and size, as Starlette's does.
+    """
+    stat = os.stat(path)
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    if etag_matches(request, etag):
+        return not_modified(etag, cache_control)
+
+    headers = {
+        "ETag": etag,
+        "Cache-Control": cache_control,
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f"attachment; filename={filename}"
+    }
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    # A Range sent with a stale If-Range gets the whole new file
+    if if_range is not None and if_range.strip() != etag:
+        range_header = None
+    try:
+        span = byte_range(range_header, stat.st_size)
+    except ValueError:
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{stat.st_size}"})
+
+    start, end = span if span is not None else (0, stat.st_size - 1)
+    headers["Content-Length"] = str(end - start + 1)
+    if span is not None:
+        headers["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+    return StreamingResponse(
+        _file_chunks(path, start, end - start + 1),
+        status_code=206 if span is not None else 200,
+        media_type=media_type,
+        headers=headers
+    )
@@ -1,68 +1,164 @@
-from fastapi import APIRouter, WebSocket, BackgroundTasks, Response
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, WebSocket
 from fastapi.responses import StreamingResponse
-from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, load_only
+from typing import Dict, List, Optional
+from datetime import datetime
+from io import BytesIO
+import json
+from ...database import get_async_db, get_db
+from ...services import tasks
+from ...services.analysis_jobs import FINISHED, QueueFull, analysis_jobs
+from ...services.bulk_export import export_analyses
 from ...services.enhanced_analyzer import EnhancedAnalyzer
-from ...api.websocket import manager
-import asyncio
+from ...services.executor import run_cpu
+from ...services.report_artifacts import report_artifacts
+from ...api.websocket import handle_websocket
+from .. import models, schemas
+from ..deps import get_analysis_data
+from ..pagination import DEFAULT_LIMIT, MAX_LIMIT, keyset_page_async, page_headers
+from ..responses import chart_response, file_response
 
 router = APIRouter(prefix="/analysis", tags=["analysis"])
-analyzer = EnhancedAnalyzer()
+
+# What schemas.AnalysisJobSummary returns; reports and analyzed text stay in the database
+JOB_LIST_COLUMNS = (
+    models.ResumeAnalysis.id, models.ResumeAnalysis.status, models.ResumeAnalysis.priority,
+    models.ResumeAnalysis.progress, models.ResumeAnalysis.stage, models.ResumeAnalysis.resume_id,
+    models.ResumeAnalysis.application_id, models.ResumeAnalysis.match_score, models.ResumeAnalysis.error,
+    models.ResumeAnalysis.created_at, models.ResumeAnalysis.started_at, models.ResumeAnalysis.completed_at
+)
+
+def _job_response(job: models.ResumeAnalysis) -> schemas.AnalysisJob:
+    return schemas.AnalysisJob(
+        id=job.id,
+        status=job.status,
+        priority=job.priority,
+        progress=job.progress,
+        stage=job.stage,
+        resume_id=job.resume_id,
+        application_id=job.application_id,
+        match_score=job.match_score,
+        result=json.loads(job.result) if job.result else None,
+        error=job.error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        completed_at=job.completed_at
+    )
+
+def _get_job(db: Session, job_id: int) -> models.ResumeAnalysis:
+    job = db.query(models.ResumeAnalysis).filter(models.ResumeAnalysis.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Analysis job not found")
+    return job
 
 @router.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     await handle_websocket(websocket)
 
-@router.post("/analyze")
-async def analyze_resume(
+# Submitting and cancelling stay on sync sessions, which the job queue
+# shares with its workers; as plain `def` routes they run in the
+# threadpool rather than on the event loop
+@router.post("/analyze", response_model=schemas.AnalysisJob, status_code=202)
+def analyze_resume(
     resume_id: int,
-    job_description: str,
-    background_tasks: BackgroundTasks
+    job_description: Optional[str] = None,
+    application_id: Optional[int] = None,
+    priority: int = Query(0, ge=0, le=10),
+    db: Session = Depends(get_db)
 ):
-    async def process_analysis():
-        analysis_id = f"analysis_{resume_id}_{int(time.time())}"
-        
-        # Update progress through WebSocket
-        await manager.update_analysis_progress(
-            analysis_id, 0, "Starting analysis..."
-        )
-        
-        # Simulate analysis steps
-        steps = [
-            (20, "Extracting resume content..."),
-            (40, "Analyzing skills..."),
-            (60, "Evaluating experience..."),
-            (80, "Generating visualizations..."),
-            (100, "Analysis complete!")
-        ]
-        
-        for progress, message in steps:
-            await asyncio.sleep(1)  # Simulate processing time
-            await manager.update_analysis_progress(
-                analysis_id, progress, message
-            )
-
-    background_tasks.add_task(process_analysis)
-    return {"message": "Analysis started"}
+    resume = db.query(models.Resume).filter(models.Resume.id == resume_id).first()
+    if not resume:
+        raise HTTPException(status_code=404, detail="Resume not found")
+
+    if application_id is not None:
+        application = db.query(models.JobApplication).filter(
+            models.JobApplication.id == application_id
+        ).first()
+        if not application:
+            raise HTTPException(status_code=404, detail="Application not found")
+    elif job_description is None:
+        raise HTTPException(status_code=400, detail="Provide job_description or application_id")
+
+    try:
+        job = analysis_jobs.submit(db, resume_id, application_id, job_description, priority)
+    except QueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    # Progress is published on the websocket topic analysis:<job id>
+    return _job_response(job)
+
+@router.get("/jobs", response_model=List[schemas.AnalysisJobSummary])
+async def list_analysis_jobs(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    resume_id: Optional[int] = None,
+    status: Optional[str] = Query(None, pattern="^(queued|running|cancelling|completed|failed|cancelled)$"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Analysis jobs without their reports, newest first; the next page's cursor is in X-Next-Cursor."""
+    statement = select(models.ResumeAnalysis).options(load_only(*JOB_LIST_COLUMNS))
+    if resume_id is not None:
+        statement = statement.where(models.ResumeAnalysis.resume_id == resume_id)
+    if status is not None:
+        statement = statement.where(models.ResumeAnalysis.status == status)
+    jobs, next_cursor = await keyset_page_async(
+        db, statement, models.ResumeAnalysis.created_at, models.ResumeAnalysis.id, cursor, limit
+    )
+    page_headers(request, response, next_cursor)
+    return jobs
+
+@router.get("/jobs/{job_id}", response_model=schemas.AnalysisJob)
+async def get_analysis_job(job_id: int, db: AsyncSession = Depends(get_async_db)):
+    job = await db.get(models.ResumeAnalysis, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Analysis job not found")
+    return _job_response(job)
+
+@router.delete("/jobs/{job_id}", response_model=schemas.AnalysisJob)
+def cancel_analysis_job(job_id: int, db: Session = Depends(get_db)):
+    job = _get_job(db, job_id)
+    if job.status in FINISHED:
+        raise HTTPException(status_code=409, detail=f"Analysis job already {job.status}")
+    return _job_response(analysis_jobs.cancel(db, job))
+
+@router.get("/export")
+async def export_analyses_bulk(
+    user_id: int,
+    format: str = Query("csv", pattern="^(csv|xlsx)$"),
+    status: str = Query("completed", pattern="^(all|queued|running|cancelling|completed|failed|cancelled)$"),
+    since: Optional[datetime] = None
+) -> StreamingResponse:
+    """Every analysis of `user_id`'s as one spreadsheet, streamed as it is read from the database."""
+    chunks, media_type = export_analyses(format, user_id, None if status == "all" else status, since)
+    filename = f"analyses_{datetime.utcnow():%Y%m%d}.{format}"
+    # A sync iterator, so each chunk is produced on a threadpool thread
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
 
 @router.get("/export/{analysis_id}")
 async def export_report(
     analysis_id: int,
-    format: str = "pdf"
-) -> StreamingResponse:
-    # Get analysis data
-    analysis_data = {} # Get from database
-    
-    # Generate report
-    output = analyzer.export_report(analysis_data, format)
-    
-    media_type = {
-        'pdf': 'application/pdf',
-        'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    }[format]
-    
+    request: Request,
+    format: str = Query("pdf", pattern="^(pdf|xlsx)$"),
+    analysis_data: Dict = Depends(get_analysis_data)
+):
+    if format == "pdf":
+        # Rendered once per report version, then served from disk
+        path = await report_artifacts.ensure(analysis_id, analysis_data)
+        return file_response(request, path, "application/pdf", "analysis_report.pdf")
+
+    # Generate report on a worker; rendering is CPU-bound
+    output = BytesIO(await run_cpu(tasks.export_report, analysis_data, format))
     return StreamingResponse(
         output,
-        media_type=media_type,
+        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
         headers={
             'Content-Disposition': f'attachment; filename=analysis_report.{format}'
         }
@@ -71,16 +167,30 @@ async def export_report(
 @router.get("/visualizations/{analysis_id}")
 async def get_visualizations(
     analysis_id: int,
-    chart_type: Optional[str] = None
-):
-    analysis_data = {} # Get from database
-    
-    if chart_type:
-        return {
-            "chart": analyzer.visualization_types[chart_type](analysis_data)
-        }
-    
+    request: Request,
+    analysis_data: Dict = Depends(get_analysis_data)
+) -> Dict[str, str]:
+    """URLs of the charts this analysis has data for."""
+    analyzer = EnhancedAnalyzer()
     return {
-        chart_type: viz_func(analysis_data)
-        for chart_type, viz_func in analyzer.visualization_types.items()
-    }
\ No newline at end of file
+        chart_type: str(request.url_for(
+            "get_visualization", analysis_id=analysis_id, chart_type=chart_type
+        ))
+        for chart_type in analyzer.visualization_types
+        if analyzer.chart_spec(chart_type, analysis_data) is not None
+    }
+
+@router.get("/visualizations/{analysis_id}/{chart_type}")
+async def get_visualization(
+    chart_type: str,
+    request: Request,
+    format: str = Query("png", pattern="^(png|svg)$"),
+    analysis_data: Dict = Depends(get_analysis_data)
+):
+    analyzer = EnhancedAnalyzer()
+    if chart_type not in analyzer.visualization_types:
+        raise HTTPException(status_code=404, detail=f"Unknown chart type: {chart_type}")
+    chart = analyzer.chart_spec(chart_type, analysis_data)
+    if chart is None:
+        raise HTTPException(status_code=404, detail=f"Analysis has no data for a {chart_type} chart")
+    return await chart_response(request, chart, format)
@@ -1,118 +1,281 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, defer
+from typing import List, Optional, Set, Tuple
+import asyncio
 import json
-import spacy
-from ...database import get_db
+import math
+from ...config import settings
+from ...database import get_async_db, get_db
+from ...services import tasks
+from ...services.ann_index import get_job_index
+from ...services.doc_vectors import application_vectors, compute_vector, decode_vector
+from ...services.executor import executor, run_cpu
+from ...services.text_extraction import ExtractionTimeout
+from ...services.upload_store import UploadTooLarge, upload_store
 from .. import models, schemas
-import docx2txt
-import PyPDF2
-import io
-import os
-from datetime import datetime
+from ..pagination import DEFAULT_LIMIT, MAX_LIMIT, keyset_page_async, page_headers
 
 router = APIRouter()
-nlp = spacy.load("en_core_web_lg")
-
-UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 @router.post("/resumes/", response_model=schemas.Resume)
 async def create_resume(
     title: str,
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    engine: str = Query("auto", pattern="^(auto|pypdf2|pdfplumber)$"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    # Save file
-    file_path = os.path.join(UPLOAD_DIR, f"{datetime.now().timestamp()}_{file.filename}")
-    content = await file.read()
-    
-    with open(file_path, "wb") as f:
-        f.write(content)
-    
-    # Extract text content
-    if file.filename.endswith('.docx'):
-        text_content = docx2txt.process(io.BytesIO(content))
-    elif file.filename.endswith('.pdf'):
-        pdf_reader = PyPDF2.PdfReader(io.BytesIO(content))
-        text_content = ""
-        for page in pdf_reader.pages:
-            text_content += page.extract_text()
-    else:
+    # Stream the file to content-addressed storage, enforcing the size limit
+    try:
+        stored = await upload_store.save(file)
+    except ValueError:
         raise HTTPException(status_code=400, detail="Unsupported file format")
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    
+    # Extract text content, or reuse it if the same file was uploaded before
+    try:
+        text_content = await upload_store.extract(stored, engine)
+    except ExtractionTimeout as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    # Parse now so later analyses of this resume hit the document cache, and
+    # compute the vector off the event loop so the insert doesn't have to
+    content_vector = await run_cpu(tasks.prepare_document, text_content)
     
     # Create resume record
     db_resume = models.Resume(
         title=title,
         content=text_content,
-        file_path=file_path,
+        file_path=stored.path,
         user_id=1  # TODO: Get from authenticated user
     )
+    db_resume.content_vector = content_vector
     db.add(db_resume)
-    db.commit()
-    db.refresh(db_resume)
+    await db.commit()
+    await db.refresh(db_resume)
     return db_resume
 
 @router.post("/resumes/analyze/", response_model=schemas.ResumeAnalysis)
 async def analyze_resume(
     resume_id: int,
     application_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    resume = db.query(models.Resume).filter(models.Resume.id == resume_id).first()
-    application = db.query(models.JobApplication).filter(
-        models.JobApplication.id == application_id
-    ).first()
+    resume = await db.get(models.Resume, resume_id)
+    application = await db.get(models.JobApplication, application_id)
     
     if not resume or not application:
         raise HTTPException(status_code=404, detail="Resume or application not found")
     
-    # Analyze match
-    resume_doc = nlp(resume.content)
-    job_doc = nlp(application.job_description)
-    
-    # Extract key terms
-    job_keywords = set()
-    for token in job_doc:
-        if token.pos_ in ['NOUN', 'PROPN'] and not token.is_stop:
-            job_keywords.add(token.text.lower())
-    
-    resume_keywords = set()
-    for token in resume_doc:
-        if token.pos_ in ['NOUN', 'PROPN'] and not token.is_stop:
-            resume_keywords.add(token.text.lower())
-    
-    # Calculate match score
-    matching_keywords = job_keywords.intersection(resume_keywords)
-    missing_keywords = list(job_keywords - resume_keywords)
-    
-    score = len(matching_keywords) / len(job_keywords) if job_keywords else 0
-    
-    # Generate suggestions
-    suggestions = [
-        f"Consider adding experience with {keyword}" for keyword in missing_keywords[:5]
-    ]
+    # Analyze match on the NLP workers
+    resume_keywords, job_keywords = await run_cpu(
+        tasks.keyword_sets, [resume.content, application.job_description]
+    )
+    score, missing_keywords, suggestions = _score_keywords(resume_keywords, job_keywords)
     
     # Create analysis record
     analysis = models.ResumeAnalysis(
         resume_id=resume_id,
         application_id=application_id,
-        match_score=score * 100,
+        match_score=score,
         missing_keywords=json.dumps(missing_keywords),
         suggested_modifications=json.dumps(suggestions)
     )
     
     db.add(analysis)
-    db.commit()
-    db.refresh(analysis)
+    await db.commit()
+    await db.refresh(analysis)
     
     return analysis
 
-@router.get("/resumes/", response_model=List[schemas.Resume])
-def get_resumes(
-    skip: int = 0,
-    limit: int = 100,
+@router.post("/resumes/analyze/batch/", response_model=List[schemas.BatchAnalysisResult])
+async def analyze_resume_batch(
+    request: schemas.BatchAnalysisRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Score one resume against many applications and return them ranked."""
+    resume = await db.get(models.Resume, request.resume_id)
+    if not resume:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    
+    statement = select(models.JobApplication).options(defer(models.JobApplication.description_vector))
+    if request.application_ids is None:
+        statement = statement.where(models.JobApplication.user_id == resume.user_id)
+    else:
+        statement = statement.where(models.JobApplication.id.in_(request.application_ids))
+    applications = (await db.scalars(statement.order_by(models.JobApplication.id))).all()
+    
+    if request.application_ids is not None:
+        missing_ids = set(request.application_ids) - {app.id for app in applications}
+        if missing_ids:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Applications not found: {sorted(missing_ids)}"
+            )
+    
+    # Parse the resume once, then split the job descriptions into contiguous
+    # chunks that are piped through the pipeline on separate NLP workers
+    batch_size = request.batch_size or settings.NLP_BATCH_SIZE
+    parallel = min(request.n_process or executor.cpu.max_workers, executor.cpu.max_workers)
+    texts = [app.job_description for app in applications]
+    chunk_size = max(math.ceil(len(texts) / parallel), 1)
+    resume_keywords, *chunks = await asyncio.gather(
+        run_cpu(tasks.keyword_sets, [resume.content]),
+        *(
+            run_cpu(tasks.keyword_sets, texts[i:i + chunk_size], batch_size)
+            for i in range(0, len(texts), chunk_size)
+        )
+    )
+    resume_keywords = resume_keywords[0]
+    job_keywords = [keywords for chunk in chunks for keywords in chunk]
+    
+    results = []
+    for application, keywords in zip(applications, job_keywords):
+        score, missing_keywords, suggestions = _score_keywords(resume_keywords, keywords)
+        analysis = models.ResumeAnalysis(
+            resume_id=resume.id,
+            application_id=application.id,
+            match_score=score,
+            missing_keywords=json.dumps(missing_keywords),
+            suggested_modifications=json.dumps(suggestions)
+        )
+        results.append((application, analysis, missing_keywords, suggestions))
+    
+    # One transaction for the whole batch
+    db.add_all([analysis for _, analysis, _, _ in results])
+    await db.commit()
+    
+    results.sort(key=lambda result: result[1].match_score, reverse=True)
+    return [
+        schemas.BatchAnalysisResult(
+            rank=rank,
+            application_id=application.id,
+            company=application.company,
+            position=application.position,
+            analysis=schemas.ResumeAnalysis(
+                id=analysis.id,
+                match_score=analysis.match_score,
+                missing_keywords=missing_keywords,
+                suggested_modifications=suggestions,
+                created_at=analysis.created_at
+            )
+        )
+        for rank, (application, analysis, missing_keywords, suggestions) in enumerate(results, 1)
+    ]
+
+# Ranking and matching stay on sync sessions: the vector services read
+# and backfill vectors through them, and as plain `def` routes they run
+# in the threadpool rather than on the event loop
+@router.get("/resumes/{resume_id}/rankings", response_model=List[schemas.ApplicationRanking])
+def rank_applications(
+    resume_id: int,
+    limit: int = Query(50, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    """Rank the owner's applications by vector similarity to a resume."""
+    resume = db.query(models.Resume).filter(models.Resume.id == resume_id).first()
+    if not resume:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    
+    ranked = application_vectors.rank(db, resume, limit)
+    applications = {
+        app.id: app for app in db.query(models.JobApplication).filter(
+            models.JobApplication.id.in_([application_id for application_id, _ in ranked])
+        )
+    }
+    return [
+        schemas.ApplicationRanking(
+            rank=rank,
+            application_id=application_id,
+            company=applications[application_id].company,
+            position=applications[application_id].position,
+            status=applications[application_id].status,
+            similarity=round(similarity * 100, 2)
+        )
+        for rank, (application_id, similarity) in enumerate(ranked, 1)
+    ]
+
+@router.get("/resumes/{resume_id}/matches", response_model=List[schemas.ApplicationRanking])
+def match_job_postings(
+    resume_id: int,
+    k: int = Query(10, ge=1, le=100),
+    nprobe: Optional[int] = Query(None, ge=1),
     db: Session = Depends(get_db)
 ):
-    resumes = db.query(models.Resume).offset(skip).limit(limit).all()
-    return resumes
\ No newline at end of file
+    """Top-k job postings across all applications, from the approximate index."""
+    resume = db.query(models.Resume).filter(models.Resume.id == resume_id).first()
+    if not resume:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    
+    vector = decode_vector(resume.content_vector)
+    if vector is None:
+        resume.content_vector = compute_vector(resume.content)
+        db.commit()
+        vector = decode_vector(resume.content_vector)
+    if vector is None:
+        return []
+    
+    matches = get_job_index().search(vector, k, nprobe)
+    applications = {
+        app.id: app for app in db.query(models.JobApplication).filter(
+            models.JobApplication.id.in_([application_id for application_id, _ in matches])
+        )
+    }
+    # The index is updated just after commit, so it can briefly hold deleted ids; skip them
+    matches = [match for match in matches if match[0] in applications]
+    return [
+        schemas.ApplicationRanking(
+            rank=rank,
+            application_id=application_id,
+            company=applications[application_id].company,
+            position=applications[application_id].position,
+            # Postings are shared, but where another user stands with theirs isn't
+            status=(
+                applications[application_id].status
+                if applications[application_id].user_id == resume.user_id else None
+            ),
+            similarity=round(similarity * 100, 2)
+        )
+        for rank, (application_id, similarity) in enumerate(matches, 1)
+    ]
+
+def _score_keywords(
+    resume_keywords: Set[str],
+    job_keywords: Set[str]
+) -> Tuple[float, List[str], List[str]]:
+    """Keyword match score (0-100), missing keywords and suggestions."""
+    matching_keywords = job_keywords.intersection(resume_keywords)
+    missing_keywords = list(job_keywords - resume_keywords)
+    
+    score = len(matching_keywords) / len(job_keywords) if job_keywords else 0
+    
+    # Generate suggestions
+    suggestions = [
+        f"Consider adding experience with {keyword}" for keyword in missing_keywords[:5]
+    ]
+    return score * 100, missing_keywords, suggestions
+
+@router.get("/applications/", response_model=List[schemas.JobApplication])
+async def get_applications(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    user_id: Optional[int] = None,
+    status: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Applications, most recently applied first; the next page's cursor is in X-Next-Cursor."""
+    # The description vector is only read for ranking
+    statement = select(models.JobApplication).options(defer(models.JobApplication.description_vector))
+    if user_id is not None:
+        statement = statement.where(models.JobApplication.user_id == user_id)
+    if status is not None:
+        statement = statement.where(models.JobApplication.status == status)
+    applications, next_cursor = await keyset_page_async(
+        db, statement, models.JobApplication.date_applied, models.JobApplication.id, cursor, limit
+    )
+    page_headers(request, response, next_cursor)
+    return applications
\ No newline at end of file
@@ -1,21 +1,29 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from app.database import get_db
+from app.api.websocket import manager
+from app.database import async_engine, database_stats, engine, get_async_db
+from app.services.charts import chart_renderer
+from app.services.doc_cache import doc_cache
+from app.services.executor import executor
+from app.services.nlp_registry import nlp_registry
+from app.services.report_artifacts import report_artifacts
+from app.services.skill_taxonomy import skill_taxonomy
+from app.services.upload_store import upload_store
 
 router = APIRouter(tags=["health"])
 
 @router.get("/health")
-async def health_check(db: Session = Depends(get_db)):
+async def health_check(db: AsyncSession = Depends(get_async_db)):
     try:
         # Test database connection
-        result = db.execute(text("SELECT 1")).fetchone()
+        result = (await db.execute(text("SELECT 1"))).fetchone()
         if result[0] == 1:
             return {
                 "status": "healthy",
                 "database": "connected",
                 "details": {
-                    "database_type": "postgresql",
+                    "database_type": engine.dialect.name,
                     "connection": "successful"
                 }
             }
@@ -24,4 +32,47 @@ async def health_check(db: Session = Depends(get_db)):
             "status": "unhealthy",
             "database": "disconnected",
             "error": str(e)
-        }
\ No newline at end of file
+        }
+
+@router.get("/health/database")
+async def database_health():
+    """Engine profile, connection pool occupancy and how long connections are held.
+
+    The top level is the sync engine's; `async` is that of the engine
+    behind the `async def` routes, which has a pool of its own.
+    """
+    return {**database_stats(engine), "async": database_stats(async_engine.sync_engine)}
+
+@router.get("/health/nlp")
+async def nlp_health():
+    """Report which spaCy pipelines this worker has loaded and what they cost."""
+    return {
+        **nlp_registry.stats(),
+        "doc_cache": doc_cache.stats(),
+        "skill_taxonomy": skill_taxonomy.stats()
+    }
+
+@router.get("/health/executor")
+async def executor_health():
+    """Queue depth and wait times of the worker pools."""
+    return executor.stats()
+
+@router.get("/health/uploads")
+async def uploads_health():
+    """Upload size limit and how often extracted text was reused."""
+    return upload_store.stats()
+
+@router.get("/health/charts")
+async def charts_health():
+    """Chart cache hit rate and rendering latency."""
+    return chart_renderer.stats()
+
+@router.get("/health/reports")
+async def reports_health():
+    """PDF reports served from disk versus rendered."""
+    return report_artifacts.stats()
+
+@router.get("/health/websocket")
+async def websocket_health():
+    """Connected clients, subscriptions and messages coalesced or dropped for slow clients."""
+    return manager.stats()
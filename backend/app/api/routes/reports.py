@@ -1,9 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import Optional
-from ...database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List, Optional
+import json
+from ...config import settings
+from ...database import get_async_db
+from ...services.report_artifacts import report_artifacts
 from ...services.report_generator import ResumeReportGenerator
 from .. import models
+from ..deps import get_analysis_data
+from ..responses import chart_response, file_response
 
 router = APIRouter(
     prefix="/reports",
@@ -12,26 +18,89 @@ router = APIRouter(
 
 report_generator = ResumeReportGenerator()
 
+@router.get("/combined")
+async def get_combined_report(
+    request: Request,
+    user_id: Optional[int] = None,
+    analysis_ids: Optional[List[int]] = Query(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """One PDF with the reports of a whole job search.
+
+    Either every completed analysis of `user_id`'s applications, in the
+    order they applied, or the completed analyses in `analysis_ids`.
+    Only queued analyses store a report; inline ones are left out.
+    """
+    statement = (
+        select(models.ResumeAnalysis, models.JobApplication)
+        .outerjoin(models.JobApplication, models.JobApplication.id == models.ResumeAnalysis.application_id)
+        # Analyses computed inline are stored completed but without a report
+        .where(models.ResumeAnalysis.status == "completed", models.ResumeAnalysis.result.isnot(None))
+    )
+    if analysis_ids:
+        rows = list((await db.execute(statement.where(models.ResumeAnalysis.id.in_(analysis_ids)))).all())
+        found = {analysis.id for analysis, _ in rows}
+        missing = [analysis_id for analysis_id in analysis_ids if analysis_id not in found]
+        if missing:
+            raise HTTPException(status_code=404, detail=f"No completed analyses with ids {missing}")
+        order = {analysis_id: i for i, analysis_id in enumerate(analysis_ids)}
+        rows.sort(key=lambda row: order[row[0].id])
+    elif user_id is not None:
+        rows = (await db.execute(statement.where(models.JobApplication.user_id == user_id).order_by(
+            models.JobApplication.date_applied, models.ResumeAnalysis.id
+        ))).all()
+    else:
+        raise HTTPException(status_code=400, detail="Provide user_id or analysis_ids")
+
+    if not rows:
+        raise HTTPException(status_code=404, detail="No completed analyses to report on")
+    if len(rows) > settings.REPORT_COMBINED_MAX_ANALYSES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.REPORT_COMBINED_MAX_ANALYSES} analyses fit in one report"
+        )
+
+    analyses = [
+        (
+            analysis.id,
+            f"{application.position} at {application.company}" if application else f"Analysis {analysis.id}",
+            json.loads(analysis.result)
+        )
+        for analysis, application in rows
+    ]
+    path = await report_artifacts.ensure_combined(analyses)
+    return file_response(request, path, "application/pdf", "job_search_report.pdf")
+
 @router.get("/{analysis_id}")
 async def generate_report(
     analysis_id: int,
+    request: Request,
     report_type: Optional[str] = "detailed",
-    db: Session = Depends(get_db)
+    analysis_data: Dict = Depends(get_analysis_data)
 ):
     """Generate a report for a specific analysis."""
-    analysis = db.query(models.ResumeAnalysis).filter(
-        models.ResumeAnalysis.id == analysis_id
-    ).first()
-    
-    if not analysis:
-        raise HTTPException(status_code=404, detail="Analysis not found")
-    
+    def chart_url(name: str) -> str:
+        return str(request.url_for("get_report_chart", analysis_id=analysis_id, name=name))
+
     try:
-        analysis_data = json.loads(analysis.analysis_data)
-        report = report_generator.generate_report(analysis_data, report_type)
-        return report
+        return report_generator.generate_report(analysis_data, report_type, chart_url)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error generating report: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+@router.get("/{analysis_id}/charts/{name}")
+async def get_report_chart(
+    name: str,
+    request: Request,
+    format: str = Query("png", pattern="^(png|svg)$"),
+    analysis_data: Dict = Depends(get_analysis_data)
+):
+    """One of a detailed report's charts, as an image."""
+    chart = report_generator.chart_specs(analysis_data).get(name)
+    if chart is None:
+        raise HTTPException(status_code=404, detail=f"Report has no chart named {name}")
+    return await chart_response(request, chart, format)
@@ -1,67 +1,81 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from sqlalchemy.orm import Session
-from typing import List
-import spacy
-from ...database import get_db
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+from typing import List, Optional
+from ...database import get_async_db
+from ...services import tasks
+from ...services.executor import run_cpu
+from ...services.text_extraction import ExtractionTimeout
+from ...services.upload_store import UploadTooLarge, upload_store
 from .. import models, schemas
-import docx2txt
-import PyPDF2
-import io
-import os
-from datetime import datetime
+from ..pagination import DEFAULT_LIMIT, MAX_LIMIT, keyset_page_async, page_headers
 
 router = APIRouter(
     prefix="/resumes",
     tags=["resumes"]
 )
 
-nlp = spacy.load("en_core_web_lg")
+# What schemas.Resume returns; the text and its vector stay in the database
+RESUME_LIST_COLUMNS = (
+    models.Resume.id, models.Resume.title, models.Resume.file_path,
+    models.Resume.created_at, models.Resume.updated_at, models.Resume.user_id
+)
 
 @router.post("/", response_model=schemas.Resume)
 async def create_resume(
     title: str,
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    engine: str = Query("auto", pattern="^(auto|pypdf2|pdfplumber)$"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    # Create uploads directory if it doesn't exist
-    os.makedirs("uploads", exist_ok=True)
+    # Stream the file to content-addressed storage, enforcing the size limit
+    try:
+        stored = await upload_store.save(file)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Unsupported file format")
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
     
-    # Save file
-    file_path = os.path.join("uploads", f"{datetime.now().timestamp()}_{file.filename}")
-    content = await file.read()
+    # Extract text content, or reuse it if the same file was uploaded before
+    try:
+        text_content = await upload_store.extract(stored, engine)
+    except ExtractionTimeout as e:
+        raise HTTPException(status_code=422, detail=str(e))
     
-    with open(file_path, "wb") as f:
-        f.write(content)
-    
-    # Extract text content
-    if file.filename.endswith('.docx'):
-        text_content = docx2txt.process(io.BytesIO(content))
-    elif file.filename.endswith('.pdf'):
-        pdf_reader = PyPDF2.PdfReader(io.BytesIO(content))
-        text_content = ""
-        for page in pdf_reader.pages:
-            text_content += page.extract_text()
-    else:
-        raise HTTPException(status_code=400, detail="Unsupported file format")
+    # Parse now so later analyses of this resume hit the document cache, and
+    # compute the vector off the event loop so the insert doesn't have to
+    content_vector = await run_cpu(tasks.prepare_document, text_content)
     
     # Create resume record
     db_resume = models.Resume(
         title=title,
         content=text_content,
-        file_path=file_path,
+        file_path=stored.path,
         user_id=1  # TODO: Get from authenticated user
     )
+    db_resume.content_vector = content_vector
     
     db.add(db_resume)
-    db.commit()
-    db.refresh(db_resume)
+    await db.commit()
+    await db.refresh(db_resume)
     return db_resume
 
 @router.get("/", response_model=List[schemas.Resume])
-def get_resumes(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+async def get_resumes(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    user_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    resumes = db.query(models.Resume).offset(skip).limit(limit).all()
-    return resumes
\ No newline at end of file
+    """Resumes, newest first; the next page's cursor is in X-Next-Cursor."""
+    statement = select(models.Resume).options(load_only(*RESUME_LIST_COLUMNS))
+    if user_id is not None:
+        statement = statement.where(models.Resume.user_id == user_id)
+    resumes, next_cursor = await keyset_page_async(
+        db, statement, models.Resume.created_at, models.Resume.id, cursor, limit
+    )
+    page_headers(request, response, next_cursor)
+    return resumes
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional, List
+from pydantic import BaseModel, EmailStr, Field
+from typing import Any, Dict, Optional, List
 from datetime import datetime
 
 class UserBase(BaseModel):
@@ -67,6 +67,48 @@ class ResumeAnalysis(ResumeAnalysisBase):
     class Config:
         from_attributes = True
 
+class AnalysisJobSummary(BaseModel):
+    id: int
+    status: str
+    priority: int
+    progress: int
+    stage: Optional[str] = None
+    resume_id: int
+    application_id: Optional[int] = None
+    match_score: Optional[float] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class AnalysisJob(AnalysisJobSummary):
+    result: Optional[Dict[str, Any]] = None
+
+class BatchAnalysisRequest(BaseModel):
+    resume_id: int
+    # None means every application belonging to the resume's owner
+    application_ids: Optional[List[int]] = None
+    batch_size: Optional[int] = Field(default=None, ge=1)
+    n_process: Optional[int] = Field(default=None, ge=1)
+
+class BatchAnalysisResult(BaseModel):
+    rank: int
+    application_id: int
+    company: str
+    position: str
+    analysis: ResumeAnalysis
+
+class ApplicationRanking(BaseModel):
+    rank: int
+    application_id: int
+    company: str
+    position: str
+    status: Optional[str] = None
+    similarity: float
+
 class Token(BaseModel):
     access_token: str
     token_type: str
@@ -1,44 +1,338 @@
 from fastapi import WebSocket, WebSocketDisconnect
-from typing import List, Dict
-import json
+from collections import OrderedDict, defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 import asyncio
+import itertools
+import json
+import logging
+import re
+import time
+from datetime import datetime
+from ..config import settings
+from ..services.pubsub import PubSub, create_pubsub
+
+logger = logging.getLogger(__name__)
+
+# analysis:<id> carries one analysis's progress, user:<id> that of all of a user's analyses
+TOPIC = re.compile(r"^(analysis|user):\d+$")
+
+PING = json.dumps({"type": "ping"})
+
+
+class Connection:
+    """One client socket, its topics, and the messages waiting to be sent to it.
+
+    Messages are queued by key and sent by the connection's own task, so a
+    slow client only delays itself. A newer message with the key of one
+    still queued replaces it (a progress update supersedes the previous
+    one); past `queue_limit` queued messages the oldest is dropped.
+    """
+
+    def __init__(self, websocket: WebSocket, queue_limit: int, send_timeout: float):
+        self.websocket = websocket
+        self.queue_limit = queue_limit
+        self.send_timeout = send_timeout
+        self.topics: Set[str] = set()
+        self.last_seen = time.monotonic()
+        self.sent = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self._pending: "OrderedDict[str, str]" = OrderedDict()
+        self._ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.closed = False
+
+    def start(self, on_failure) -> None:
+        self._task = asyncio.ensure_future(self._send_loop(on_failure))
+
+    def enqueue(self, key: str, text: str) -> None:
+        if self.closed:
+            return
+        if key in self._pending:
+            self._pending[key] = text
+            self.coalesced += 1
+        else:
+            if len(self._pending) >= self.queue_limit:
+                self._pending.popitem(last=False)
+                self.dropped += 1
+            self._pending[key] = text
+        self._ready.set()
+
+    @property
+    def queued(self) -> int:
+        return len(self._pending)
+
+    def close(self) -> None:
+        """Stop sending and close the socket in the background."""
+        if self.closed:
+            return
+        self.closed = True
+        self._pending.clear()
+        if self._task is not None and self._task is not asyncio.current_task():
+            self._task.cancel()
+        asyncio.ensure_future(self._close_socket())
+
+    async def _send_loop(self, on_failure) -> None:
+        try:
+            while True:
+                await self._ready.wait()
+                self._ready.clear()
+                while self._pending:
+                    _, text = self._pending.popitem(last=False)
+                    await asyncio.wait_for(self.websocket.send_text(text), self.send_timeout)
+                    self.sent += 1
+                    # A client still taking our messages is alive, even one that never writes
+                    self.last_seen = time.monotonic()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Timed out or already gone; either way the client is not keeping up
+            logger.debug("Dropping websocket client: %r", e)
+            on_failure(self)
+
+    async def _close_socket(self) -> None:
+        try:
+            await asyncio.wait_for(self.websocket.close(), self.send_timeout)
+        except Exception:
+            pass
+
 
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
-        self.analysis_updates: Dict = {}
+    """Topic subscriptions and fan-out of analysis progress to websockets.
+
+    Publishing serializes a message once and hands it to each subscriber's
+    queue without waiting on any socket. The last progress update of each
+    analysis is retained for late subscribers, at most `retained_limit`
+    of them and each for `retained_ttl` seconds. A heartbeat pings every
+    client and disconnects those not heard from, and not successfully
+    sent to, for `heartbeat_timeout` seconds; clients needn't answer the
+    ping. Dead peers are found by the server's protocol-level pings
+    (uvicorn's `--ws-ping-interval`/`--ws-ping-timeout`) and by sends
+    that time out.
+    Published messages also go to the other workers' managers through
+    `pubsub`, which delivers theirs here.
+    """
 
-    async def connect(self, websocket: WebSocket):
+    def __init__(
+        self,
+        queue_limit: int = settings.WS_SEND_QUEUE,
+        send_timeout: float = settings.WS_SEND_TIMEOUT_SECONDS,
+        heartbeat_seconds: float = settings.WS_HEARTBEAT_SECONDS,
+        heartbeat_timeout: float = settings.WS_HEARTBEAT_TIMEOUT_SECONDS,
+        retained_limit: int = settings.WS_RETAINED_MAX,
+        retained_ttl: float = settings.WS_RETAINED_TTL_SECONDS,
+        max_topics: int = settings.WS_MAX_TOPICS,
+        pubsub: Optional[PubSub] = None
+    ):
+        self.queue_limit = queue_limit
+        self.send_timeout = send_timeout
+        self.heartbeat_seconds = heartbeat_seconds
+        self.heartbeat_timeout = heartbeat_timeout
+        self.retained_limit = retained_limit
+        self.retained_ttl = retained_ttl
+        self.max_topics = max_topics
+        # Carries messages to the managers of other API workers
+        self.pubsub = pubsub if pubsub is not None else create_pubsub()
+        self.connections: Set[Connection] = set()
+        self.subscribers: Dict[str, Set[Connection]] = defaultdict(set)
+        # topic -> (monotonic time stored, message)
+        self.retained: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self.published = 0
+        self.pruned = 0
+        self._closed_stats = {"sent": 0, "coalesced": 0, "dropped": 0}
+        self._keys = itertools.count()
+        self._heartbeat: Optional[asyncio.Task] = None
+
+    async def connect(self, websocket: WebSocket) -> Connection:
         await websocket.accept()
-        self.active_connections.append(websocket)
+        connection = Connection(websocket, self.queue_limit, self.send_timeout)
+        self.connections.add(connection)
+        connection.start(self.disconnect)
+        return connection
 
-    def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+    def disconnect(self, connection: Connection) -> None:
+        if connection not in self.connections:
+            return
+        self.connections.discard(connection)
+        for topic in connection.topics:
+            subscribers = self.subscribers.get(topic)
+            if subscribers is not None:
+                subscribers.discard(connection)
+                if not subscribers:
+                    del self.subscribers[topic]
+        for name in self._closed_stats:
+            self._closed_stats[name] += getattr(connection, name)
+        connection.close()
 
-    async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            await connection.send_text(message)
+    def subscribe(self, connection: Connection, topics: Iterable[str]) -> None:
+        """Add topics, sending each one's retained update; raises ValueError for bad topics."""
+        topics = [topic for topic in topics if topic not in connection.topics]
+        invalid = [topic for topic in topics if not TOPIC.match(topic)]
+        if invalid:
+            raise ValueError(f"Unknown topics: {', '.join(invalid)}")
+        if len(connection.topics) + len(topics) > self.max_topics:
+            raise ValueError(f"At most {self.max_topics} topics per connection")
+        for topic in topics:
+            connection.topics.add(topic)
+            self.subscribers[topic].add(connection)
+            retained = self._retained(topic)
+            if retained is not None:
+                connection.enqueue(topic, retained)
+
+    def unsubscribe(self, connection: Connection, topics: Iterable[str]) -> None:
+        for topic in topics:
+            if topic in connection.topics:
+                connection.topics.discard(topic)
+                self.subscribers[topic].discard(connection)
+                if not self.subscribers[topic]:
+                    del self.subscribers[topic]
+
+    def publish(self, topic: str, message: Dict, key: Optional[str] = None, retain: bool = False) -> int:
+        """Queue `message` for every subscriber of `topic`, in every worker.
+
+        Returns how many subscribers this worker had. Queued messages with
+        the same `key` (default: the topic) are replaced rather than sent
+        one after another.
+        """
+        text = json.dumps(message)
+        self.published += 1
+        self.pubsub.publish(topic, key or topic, text, retain)
+        return self.deliver(topic, key or topic, text, retain)
 
-    async def send_personal_message(self, message: str, websocket: WebSocket):
-        await websocket.send_text(message)
+    def deliver(self, topic: str, key: str, text: str, retain: bool = False) -> int:
+        """Queue an already serialized message for this worker's subscribers only."""
+        if retain:
+            self.retained[topic] = (time.monotonic(), text)
+            self.retained.move_to_end(topic)
+            while len(self.retained) > self.retained_limit:
+                self.retained.popitem(last=False)
+        subscribers = self.subscribers.get(topic, ())
+        for connection in subscribers:
+            connection.enqueue(key, text)
+        return len(subscribers)
 
-    async def update_analysis_progress(self, analysis_id: str, progress: int, message: str):
+    async def broadcast(self, message: str):
+        """Queue a message for every client of this worker, whatever they subscribed to."""
+        key = f"broadcast:{next(self._keys)}"
+        for connection in self.connections:
+            connection.enqueue(key, message)
+
+    async def update_analysis_progress(
+        self, analysis_id: str, progress: int, message: str, user_id: Optional[int] = None
+    ):
         update = {
             "analysis_id": analysis_id,
             "progress": progress,
             "message": message,
             "timestamp": datetime.now().isoformat()
         }
-        self.analysis_updates[analysis_id] = update
-        await self.broadcast(json.dumps(update))
+        key = f"analysis:{analysis_id}"
+        self.publish(key, {"topic": key, **update}, retain=True)
+        if user_id is not None:
+            # Coalesced per analysis, so one busy analysis can't crowd out the others
+            topic = f"user:{user_id}"
+            self.publish(topic, {"topic": topic, **update}, key=key)
+
+    def handle_message(self, connection: Connection, text: str) -> None:
+        """Act on a client message: subscribe, unsubscribe, ping or pong."""
+        connection.last_seen = time.monotonic()
+        try:
+            request = json.loads(text)
+            action = request.get("action")
+            topics = request.get("topics", [])
+            if action == "subscribe":
+                self.subscribe(connection, topics)
+            elif action == "unsubscribe":
+                self.unsubscribe(connection, topics)
+            elif action == "ping":
+                connection.enqueue("pong", json.dumps({"type": "pong"}))
+                return
+            elif action == "pong":
+                return
+            else:
+                raise ValueError(f"Unknown action: {action}")
+        except (AttributeError, TypeError, ValueError) as e:
+            connection.enqueue("error", json.dumps({"type": "error", "detail": str(e)}))
+            return
+        connection.enqueue(
+            "subscriptions", json.dumps({"type": "subscriptions", "topics": sorted(connection.topics)})
+        )
+
+    def heartbeat(self) -> None:
+        """Disconnect idle clients, ping the rest, and forget expired updates."""
+        now = time.monotonic()
+        for connection in list(self.connections):
+            if now - connection.last_seen > self.heartbeat_timeout:
+                self.pruned += 1
+                self.disconnect(connection)
+            else:
+                connection.enqueue("ping", PING)
+        while self.retained:
+            stored, _ = next(iter(self.retained.values()))
+            if now - stored <= self.retained_ttl:
+                break
+            self.retained.popitem(last=False)
+
+    async def start(self) -> None:
+        await self.pubsub.start(self.deliver)
+        if self._heartbeat is None:
+            self._heartbeat = asyncio.ensure_future(self._heartbeat_loop())
+
+    async def stop(self) -> None:
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+        await self.pubsub.stop()
+        for connection in list(self.connections):
+            self.disconnect(connection)
+
+    def stats(self) -> Dict:
+        totals = dict(self._closed_stats)
+        queued = 0
+        for connection in self.connections:
+            queued += connection.queued
+            for name in totals:
+                totals[name] += getattr(connection, name)
+        return {
+            "connections": len(self.connections),
+            "topics": len(self.subscribers),
+            "retained": len(self.retained),
+            "published": self.published,
+            "queued": queued,
+            "pruned": self.pruned,
+            **totals,
+            "pubsub": self.pubsub.stats()
+        }
+
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            self.heartbeat()
+
+    def _retained(self, topic: str) -> Optional[str]:
+        entry = self.retained.get(topic)
+        if entry is None:
+            return None
+        stored, text = entry
+        if time.monotonic() - stored > self.retained_ttl:
+            del self.retained[topic]
+            return None
+        return text
+
 
 manager = ConnectionManager()
 
 async def handle_websocket(websocket: WebSocket):
-    await manager.connect(websocket)
+    connection = await manager.connect(websocket)
     try:
+        # Topics can also be given up front, as ?topics=analysis:12,user:3
+        topics = [topic for topic in websocket.query_params.get("topics", "").split(",") if topic]
+        if topics:
+            manager.handle_message(connection, json.dumps({"action": "subscribe", "topics": topics}))
         while True:
-            data = await websocket.receive_text()
-            await manager.broadcast(data)
-    except WebSocketDisconnect:
-        manager.disconnect(websocket)
\ No newline at end of file
+            manager.handle_message(connection, await websocket.receive_text())
+    except (WebSocketDisconnect, RuntimeError):
+        # RuntimeError: the socket was closed from our side while receiving
+        pass
+    finally:
+        manager.disconnect(connection)
@@ -1,6 +1,7 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -13,11 +14,125 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./resume_tracker.db")
+
+    # SQLite connections: journal mode, fsync level, how long a writer waits
+    # for the lock before "database is locked", memory-mapped I/O and page cache
+    SQLITE_JOURNAL_MODE: str = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    SQLITE_MMAP_BYTES: int = int(os.getenv("SQLITE_MMAP_BYTES", str(256 * 1024 * 1024)))
+    SQLITE_CACHE_KIB: int = int(os.getenv("SQLITE_CACHE_KIB", "65536"))
+
+    # PostgreSQL connection pool, per API or worker process
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT_SECONDS: float = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+    DB_POOL_RECYCLE_SECONDS: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
     
     # Security
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+
+    # NLP
+    SPACY_MODEL: str = os.getenv("SPACY_MODEL", "en_core_web_lg")
+    NLP_WARMUP: bool = os.getenv("NLP_WARMUP", "false").lower() == "true"
+    NLP_BATCH_SIZE: int = int(os.getenv("NLP_BATCH_SIZE", "32"))
+    NLP_N_PROCESS: int = int(os.getenv("NLP_N_PROCESS", "1"))
+
+    # Import matplotlib and the PDF/XLSX libraries at startup instead of on
+    # the first chart or export
+    REPORTS_WARMUP: bool = os.getenv("REPORTS_WARMUP", "false").lower() == "true"
+
+    # Parsed document cache
+    DOC_CACHE_DIR: str = os.getenv("DOC_CACHE_DIR", "cache/docs")
+    DOC_CACHE_MEMORY_BYTES: int = int(os.getenv("DOC_CACHE_MEMORY_BYTES", str(256 * 1024 * 1024)))
+    DOC_CACHE_DISK_BYTES: int = int(os.getenv("DOC_CACHE_DISK_BYTES", str(2 * 1024 * 1024 * 1024)))
+
+    # Stored document vectors
+    VECTOR_CACHE_TTL_SECONDS: float = float(os.getenv("VECTOR_CACHE_TTL_SECONDS", "30"))
+
+    # Approximate nearest-neighbour index over job descriptions
+    ANN_INDEX_DIR: str = os.getenv("ANN_INDEX_DIR", "cache/ann")
+    ANN_NLIST: int = int(os.getenv("ANN_NLIST", "0"))  # 0 = sqrt(corpus size)
+    ANN_NPROBE: int = int(os.getenv("ANN_NPROBE", "8"))
+    ANN_TRAIN_MIN: int = int(os.getenv("ANN_TRAIN_MIN", "1000"))
+
+    # Skill taxonomy; edits to the file are picked up without a restart
+    SKILL_TAXONOMY_PATH: str = os.getenv(
+        "SKILL_TAXONOMY_PATH", os.path.join(os.path.dirname(__file__), "data", "skills.json")
+    )
+    SKILL_TAXONOMY_RELOAD_SECONDS: float = float(os.getenv("SKILL_TAXONOMY_RELOAD_SECONDS", "10"))
+
+    # Uploads are stored by content hash; larger files are rejected with 413
+    UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", "uploads")
+    MAX_FILE_SIZE: int = int(os.getenv("MAX_FILE_SIZE", str(10 * 1024 * 1024)))
+    UPLOAD_CHUNK_SIZE: int = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+
+    # Uploaded PDFs are extracted page by page and stop at whichever cap comes first
+    PDF_MAX_PAGES: int = int(os.getenv("PDF_MAX_PAGES", "50"))
+    PDF_MAX_CHARS: int = int(os.getenv("PDF_MAX_CHARS", "200000"))
+    # Pages per worker below which a PDF is not split across the pdf pool,
+    # and how long extracting one document may take
+    PDF_PARALLEL_MIN_PAGES: int = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "4"))
+    EXTRACTION_TIMEOUT_SECONDS: float = float(os.getenv("EXTRACTION_TIMEOUT_SECONDS", "30"))
+
+    # Worker pools for blocking work: threads for file handling, processes
+    # (each with a loaded model) for NLP, where 0 runs NLP on a thread
+    # instead, processes for decoding PDF pages, where 0 uses the threads,
+    # and processes for drawing charts, where 0 draws them on threads
+    EXECUTOR_IO_WORKERS: int = int(os.getenv("EXECUTOR_IO_WORKERS", "8"))
+    EXECUTOR_CPU_WORKERS: int = int(os.getenv("EXECUTOR_CPU_WORKERS", "2"))
+    EXECUTOR_PDF_WORKERS: int = int(os.getenv("EXECUTOR_PDF_WORKERS", "2"))
+    EXECUTOR_RENDER_WORKERS: int = int(os.getenv("EXECUTOR_RENDER_WORKERS", "1"))
+
+    # Rendered chart images, cached by a hash of their inputs
+    CHART_CACHE_BYTES: int = int(os.getenv("CHART_CACHE_BYTES", str(64 * 1024 * 1024)))
+
+    # Bulk exports read analyses from the database this many rows at a time
+    # and send the file in chunks of this many bytes
+    EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", "500"))
+    EXPORT_CHUNK_SIZE: int = int(os.getenv("EXPORT_CHUNK_SIZE", str(64 * 1024)))
+
+    # Rendered PDF reports; rendered when an analysis completes unless
+    # disabled, otherwise on first download
+    REPORT_DIR: str = os.getenv("REPORT_DIR", "reports")
+    REPORTS_ON_COMPLETE: bool = os.getenv("REPORTS_ON_COMPLETE", "true").lower() == "true"
+    REPORT_COMBINED_MAX_ANALYSES: int = int(os.getenv("REPORT_COMBINED_MAX_ANALYSES", "100"))
+    REPORT_COMBINED_KEEP: int = int(os.getenv("REPORT_COMBINED_KEEP", "100"))
+
+    # Websocket clients: messages queued per client before the oldest is
+    # dropped, how long one send may take before the client is dropped,
+    # heartbeat interval and the silence after which a client is dropped,
+    # and how many last progress updates are kept for late subscribers
+    WS_SEND_QUEUE: int = int(os.getenv("WS_SEND_QUEUE", "100"))
+    WS_SEND_TIMEOUT_SECONDS: float = float(os.getenv("WS_SEND_TIMEOUT_SECONDS", "5"))
+    WS_HEARTBEAT_SECONDS: float = float(os.getenv("WS_HEARTBEAT_SECONDS", "20"))
+    WS_HEARTBEAT_TIMEOUT_SECONDS: float = float(os.getenv("WS_HEARTBEAT_TIMEOUT_SECONDS", "60"))
+    WS_RETAINED_MAX: int = int(os.getenv("WS_RETAINED_MAX", "10000"))
+    WS_RETAINED_TTL_SECONDS: float = float(os.getenv("WS_RETAINED_TTL_SECONDS", "3600"))
+    WS_MAX_TOPICS: int = int(os.getenv("WS_MAX_TOPICS", "100"))
+
+    # How websocket messages reach clients connected to other API workers:
+    # "inprocess" for a single worker, "broker" to relay through a Unix
+    # socket. Messages are batched for PUBSUB_FLUSH_MS before relaying
+    PUBSUB_BACKEND: str = os.getenv("PUBSUB_BACKEND", "inprocess")
+    PUBSUB_SOCKET: str = os.getenv(
+        "PUBSUB_SOCKET", os.path.join(tempfile.gettempdir(), "resume-analyzer-pubsub.sock")
+    )
+    PUBSUB_FLUSH_MS: float = float(os.getenv("PUBSUB_FLUSH_MS", "5"))
+    PUBSUB_MAX_BATCH: int = int(os.getenv("PUBSUB_MAX_BATCH", "500"))
+    PUBSUB_PEER_BUFFER_BYTES: int = int(os.getenv("PUBSUB_PEER_BUFFER_BYTES", str(8 * 1024 * 1024)))
+
+    # Queued resume analyses: concurrent jobs per process (0 leaves running
+    # them to other processes), how many may wait, how often idle workers
+    # check the database for jobs submitted elsewhere, and how long a running
+    # job's claim lasts without renewal before another process may requeue it
+    ANALYSIS_WORKERS: int = int(os.getenv("ANALYSIS_WORKERS", "2"))
+    ANALYSIS_QUEUE_LIMIT: int = int(os.getenv("ANALYSIS_QUEUE_LIMIT", "1000"))
+    ANALYSIS_POLL_SECONDS: float = float(os.getenv("ANALYSIS_POLL_SECONDS", "2"))
+    ANALYSIS_LEASE_SECONDS: float = float(os.getenv("ANALYSIS_LEASE_SECONDS", "60"))
     
     # CORS
     BACKEND_CORS_ORIGINS: list = [
@@ -1,13 +1,217 @@
-from sqlalchemy import create_engine
+from collections import deque
+from typing import Any, Deque, Dict, List
+import threading
+import time
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from .config import settings
 
-engine = create_engine(
-    settings.DATABASE_URL, connect_args={"check_same_thread": False}  # Only needed for SQLite
-)
+
+def sqlite_pragmas(database: str) -> Dict[str, Any]:
+    """PRAGMAs run on every new SQLite connection.
+
+    WAL lets readers run alongside the single writer, and with it
+    synchronous=NORMAL only syncs at checkpoints; a crash can lose the
+    last commits but never corrupts the file. In-memory databases have
+    no journal to tune.
+    """
+    pragmas = {
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        "cache_size": -settings.SQLITE_CACHE_KIB,  # Negative: KiB rather than pages
+        "temp_store": "MEMORY"
+    }
+    if database and database != ":memory:" and not database.startswith("file::memory:"):
+        pragmas.update({
+            "journal_mode": settings.SQLITE_JOURNAL_MODE,
+            "synchronous": settings.SQLITE_SYNCHRONOUS,
+            "mmap_size": settings.SQLITE_MMAP_BYTES
+        })
+    return pragmas
+
+
+def engine_profile(url: str, tuned: bool = True) -> Dict[str, Any]:
+    """Name, create_engine keyword arguments and connection PRAGMAs for `url`.
+
+    `tuned=False` gives SQLAlchemy's defaults, for comparison.
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "sqlite":
+        return {
+            "name": "sqlite" if tuned else "sqlite-default",
+            # Sessions are used from executor threads, not only the one that connected
+            "kwargs": {"connect_args": {"check_same_thread": False}},
+            "pragmas": sqlite_pragmas(parsed.database or "") if tuned else {}
+        }
+    if backend == "postgresql" and tuned:
+        return {
+            "name": "postgresql",
+            "kwargs": {
+                "pool_size": settings.DB_POOL_SIZE,
+                "max_overflow": settings.DB_MAX_OVERFLOW,
+                "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+                # Servers and proxies drop idle connections; replace them first
+                "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+                "pool_pre_ping": settings.DB_POOL_PRE_PING,
+                # Reuse the most recent connection so idle ones can expire
+                "pool_use_lifo": True,
+                "connect_args": {"application_name": settings.APP_NAME}
+            },
+            "pragmas": {}
+        }
+    return {"name": backend if tuned else f"{backend}-default", "kwargs": {}, "pragmas": {}}
+
+
+class PoolMetrics:
+    """Connection pool activity of one engine, recorded from pool events.
+
+    Hold times run from checkout to checkin, i.e. how long a request or
+    job kept a connection; long holds are what exhaust a pool.
+    """
+
+    def __init__(self, samples: int = 1000):
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self._holds: Deque[float] = deque(maxlen=samples)
+        self._lock = threading.Lock()
+
+    def attach(self, engine: Engine) -> None:
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        event.listen(engine, "invalidate", self._on_invalidate)
+
+    def stats(self, engine: Engine) -> Dict[str, Any]:
+        pool = engine.pool
+        with self._lock:
+            holds = sorted(self._holds)
+        # QueuePool reports its occupancy; other pool classes may not
+        status = {
+            name: getattr(pool, name)()
+            for name in ("size", "checkedin", "checkedout", "overflow")
+            if callable(getattr(pool, name, None))
+        }
+        return {
+            "pool": type(pool).__name__,
+            **status,
+            "connects": self.connects,
+            "checkouts": self.checkouts,
+            "invalidations": self.invalidations,
+            "p50_hold_ms": self._percentile_ms(holds, 0.5),
+            "p95_hold_ms": self._percentile_ms(holds, 0.95),
+            "max_hold_ms": round(holds[-1] * 1000, 2) if holds else 0.0
+        }
+
+    def _on_connect(self, dbapi_connection, connection_record) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        connection_record.info["checked_out_at"] = time.perf_counter()
+        with self._lock:
+            self.checkouts += 1
+
+    def _on_checkin(self, dbapi_connection, connection_record) -> None:
+        started = connection_record.info.pop("checked_out_at", None)
+        with self._lock:
+            self.checkins += 1
+            if started is not None:
+                self._holds.append(time.perf_counter() - started)
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception) -> None:
+        with self._lock:
+            self.invalidations += 1
+
+    @staticmethod
+    def _percentile_ms(values: List[float], q: float) -> float:
+        if not values:
+            return 0.0
+        return round(values[min(int(len(values) * q), len(values) - 1)] * 1000, 2)
+
+
+# The asyncio driver of each backend the async engine supports
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def async_url(url: str) -> str:
+    """`url` with its backend's asyncio driver in place of the sync one."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver for {backend} databases")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def _instrument(engine: Engine, profile: Dict[str, Any]) -> Engine:
+    pragmas = profile["pragmas"]
+    if pragmas:
+        @event.listens_for(engine, "connect")
+        def apply_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+            cursor.close()
+
+    engine.profile = profile
+    engine.metrics = PoolMetrics()
+    engine.metrics.attach(engine)
+    return engine
+
+
+def make_engine(url: str, tuned: bool = True) -> Engine:
+    """Engine for `url` configured by its profile, with PoolMetrics at `engine.metrics`."""
+    profile = engine_profile(url, tuned)
+    return _instrument(create_engine(url, **profile["kwargs"]), profile)
+
+
+def make_async_engine(url: str, tuned: bool = True) -> AsyncEngine:
+    """Asyncio engine for `url`, through aiosqlite or asyncpg, with the same profile as make_engine.
+
+    Its profile and PoolMetrics are on `engine.sync_engine`.
+    """
+    profile = engine_profile(url, tuned)
+    kwargs = dict(profile["kwargs"])
+    connect_args = dict(kwargs.get("connect_args", {}))
+    if "application_name" in connect_args:
+        # asyncpg takes it as a server setting rather than a libpq option
+        connect_args["server_settings"] = {"application_name": connect_args.pop("application_name")}
+        kwargs["connect_args"] = connect_args
+    parsed = make_url(url)
+    if tuned and parsed.get_backend_name() == "sqlite" and parsed.database not in (None, "", ":memory:"):
+        # aiosqlite otherwise opens, and runs the PRAGMAs on, a new connection per session
+        kwargs["poolclass"] = AsyncAdaptedQueuePool
+    engine = create_async_engine(async_url(url), **kwargs)
+    _instrument(engine.sync_engine, profile)
+    return engine
+
+
+def database_stats(engine: Engine) -> Dict[str, Any]:
+    return {
+        "dialect": engine.dialect.name,
+        "profile": engine.profile["name"],
+        "pragmas": engine.profile["pragmas"],
+        **engine.metrics.stats(engine)
+    }
+
+
+# Sync sessions, for code that runs in threads and worker pools: the
+# analysis job queue, exports, report rendering, vector ranking, and
+# plain `def` routes, which FastAPI runs in its threadpool
+engine = make_engine(settings.DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async sessions, for `async def` routes, so a query awaits instead of
+# blocking the event loop. Attributes stay loaded after commit: loading
+# them again would be I/O outside an await
+async_engine = make_async_engine(settings.DATABASE_URL)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 # Database dependency
@@ -16,4 +220,8 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,8 +1,13 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
-from .api.routes import analysis, resume, applications
-from .api.websocket import handle_websocket
+from .api.limits import LimitRequestSize
+from .api.routes import analysis, resume, applications, health, reports
+from .api.websocket import handle_websocket, manager
 from .config import settings
+from .database import async_engine
+from .services.analysis_jobs import analysis_jobs
+from .services.executor import executor
+from .services.nlp_registry import nlp_registry
 
 app = FastAPI(title=settings.APP_NAME)
 
@@ -14,9 +19,69 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Room for multipart boundaries and the other form fields of an upload
+UPLOAD_OVERHEAD_BYTES = 64 * 1024
+
+# Reject oversized uploads from their Content-Length, before the body is
+# read, and cut off bodies without one once they pass the limit
+app.add_middleware(
+    LimitRequestSize,
+    max_bytes=settings.MAX_FILE_SIZE + UPLOAD_OVERHEAD_BYTES,
+    detail=f"File exceeds the {settings.MAX_FILE_SIZE} byte upload limit"
+)
+
+app.include_router(health.router)
 app.include_router(analysis.router)
 app.include_router(resume.router)
 app.include_router(applications.router)
+app.include_router(reports.router)
+
+@app.on_event("startup")
+def warmup_nlp():
+    # Pay the model load cost before serving instead of on the first analysis
+    if settings.NLP_WARMUP:
+        nlp_registry.warmup()
+
+@app.on_event("startup")
+async def warmup_reports():
+    # Charts and exports import their libraries lazily; optionally pay that now
+    if settings.REPORTS_WARMUP:
+        from .services.enhanced_analyzer import warmup
+
+        await executor.run_io(warmup)
+
+@app.on_event("startup")
+async def start_executor():
+    # Spawn the NLP worker processes, each loading its own model, before serving
+    if settings.NLP_WARMUP:
+        await executor.start()
+
+@app.on_event("startup")
+async def start_websockets():
+    # Join the other workers' relay, then ping clients and drop the ones that stopped answering
+    await manager.start()
+
+@app.on_event("startup")
+async def start_analysis_jobs():
+    # Requeue jobs whose worker died, in any process, and start consuming
+    await analysis_jobs.start()
+
+@app.on_event("shutdown")
+async def stop_analysis_jobs():
+    await analysis_jobs.stop()
+
+@app.on_event("shutdown")
+async def stop_websockets():
+    await manager.stop()
+
+@app.on_event("shutdown")
+def stop_executor():
+    executor.shutdown()
+
+@app.on_event("shutdown")
+async def close_async_engine():
+    # Close pooled connections from the loop that opened them
+    await async_engine.dispose()
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
@@ -0,0 +1,441 @@
+from typing import List, Optional, Set, Tuple
+import asyncio
+import heapq
+import json
+import logging
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+from ..api import models
+from ..api.websocket import manager
+from ..config import settings
+from ..database import SessionLocal
+from .executor import run_cpu, run_io
+from .report_artifacts import report_artifacts
+from .resume_analyzer import AnalysisCancelled, ResumeAnalyzer
+
+logger = logging.getLogger(__name__)
+
+FINISHED = ("completed", "failed", "cancelled")
+# States in which a job belongs to the worker that claimed it
+CLAIMED = ("running", "cancelling")
+
+
+class QueueFull(Exception):
+    """Raised when too many analysis jobs are already waiting."""
+
+
+class _ProgressRecorder:
+    """Progress callback that stores each completed stage on the job row.
+
+    It runs wherever the analysis runs, including executor worker
+    processes, so it reports through the database rather than the event
+    loop. It is also where a cancellation request, or the loss of the
+    job to another worker after its lease lapsed, is noticed.
+    """
+
+    def __init__(self, job_id: int, worker_id: str):
+        self.job_id = job_id
+        self.worker_id = worker_id
+
+    def __call__(self, percent: int, message: str) -> None:
+        db = SessionLocal()
+        try:
+            job = db.get(models.ResumeAnalysis, self.job_id)
+            if job.worker_id != self.worker_id:
+                raise AnalysisCancelled(f"Analysis job {self.job_id} was requeued for another worker")
+            if job.status == "cancelling":
+                raise AnalysisCancelled(f"Analysis job {self.job_id} was cancelled")
+            job.progress = percent
+            job.stage = message
+            db.commit()
+        finally:
+            db.close()
+
+
+def run_analysis_job(job_id: int, worker_id: str) -> Optional[str]:
+    """Run one job claimed by `worker_id` and persist its outcome.
+
+    Returns the final status, or None if the job was requeued for another
+    worker meanwhile, whose outcome wins.
+
+    Module-level so it can be sent to the executor's worker processes.
+    """
+    db = SessionLocal()
+    try:
+        job = db.get(models.ResumeAnalysis, job_id)
+        resume_text = job.resume.content
+        job_description = job.job_description
+        if job_description is None:
+            job_description = job.application.job_description
+    finally:
+        db.close()
+
+    status, values = "completed", {}
+    try:
+        result = ResumeAnalyzer().analyze_resume_for_job(
+            resume_text, job_description, _ProgressRecorder(job_id, worker_id)
+        )
+        values = {
+            "match_score": result["match_score"],
+            "missing_keywords": json.dumps(result["skills_match"]["missing_skills"]),
+            "suggested_modifications": json.dumps(result["improvement_suggestions"]),
+            "result": json.dumps(result),
+            "progress": 100,
+            "stage": "Analysis complete"
+        }
+    except AnalysisCancelled:
+        status, values = "cancelled", {"stage": "Cancelled"}
+    except Exception as e:
+        status, values = "failed", {"stage": "Analysis failed", "error": str(e)}
+
+    return status if _finish(job_id, worker_id, status, **values) else None
+
+
+def _finish(job_id: int, worker_id: str, status: str, **values) -> bool:
+    """Record a job's outcome; False if `worker_id` no longer holds it."""
+    db = SessionLocal()
+    try:
+        finished = db.query(models.ResumeAnalysis).filter(
+            models.ResumeAnalysis.id == job_id,
+            models.ResumeAnalysis.worker_id == worker_id,
+            models.ResumeAnalysis.status.in_(CLAIMED)
+        ).update(
+            {"status": status, "completed_at": datetime.utcnow(), **values},
+            synchronize_session=False
+        )
+        db.commit()
+        return finished == 1
+    finally:
+        db.close()
+
+
+def _claim(job_id: int, worker_id: str) -> bool:
+    """Move a queued job to running under `worker_id`; False if it was cancelled or taken meanwhile."""
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        claimed = db.query(models.ResumeAnalysis).filter(
+            models.ResumeAnalysis.id == job_id,
+            models.ResumeAnalysis.status == "queued"
+        ).update(
+            {
+                "status": "running", "started_at": now, "progress": 0, "stage": None,
+                "worker_id": worker_id, "heartbeat_at": now
+            },
+            synchronize_session=False
+        )
+        db.commit()
+        return claimed == 1
+    finally:
+        db.close()
+
+
+def _heartbeat(job_id: int, worker_id: str) -> bool:
+    """Renew `worker_id`'s lease on a job; False if it no longer holds it."""
+    db = SessionLocal()
+    try:
+        renewed = db.query(models.ResumeAnalysis).filter(
+            models.ResumeAnalysis.id == job_id,
+            models.ResumeAnalysis.worker_id == worker_id,
+            models.ResumeAnalysis.status.in_(CLAIMED)
+        ).update({"heartbeat_at": datetime.utcnow()}, synchronize_session=False)
+        db.commit()
+        return renewed == 1
+    finally:
+        db.close()
+
+
+def _state(job_id: int) -> Tuple[str, int, Optional[str]]:
+    db = SessionLocal()
+    try:
+        return tuple(db.query(
+            models.ResumeAnalysis.status,
+            models.ResumeAnalysis.progress,
+            models.ResumeAnalysis.stage
+        ).filter(models.ResumeAnalysis.id == job_id).one())
+    finally:
+        db.close()
+
+
+def _owner(job_id: int) -> Optional[int]:
+    """User whose resume a job analyzes, for their progress channel."""
+    db = SessionLocal()
+    try:
+        row = db.query(models.Resume.user_id).join(
+            models.ResumeAnalysis, models.ResumeAnalysis.resume_id == models.Resume.id
+        ).filter(models.ResumeAnalysis.id == job_id).first()
+        return row[0] if row else None
+    finally:
+        db.close()
+
+
+def _queued_jobs() -> List[Tuple[int, int]]:
+    db = SessionLocal()
+    try:
+        return [
+            (row.priority or 0, row.id) for row in db.query(
+                models.ResumeAnalysis.id, models.ResumeAnalysis.priority
+            ).filter(models.ResumeAnalysis.status == "queued")
+        ]
+    finally:
+        db.close()
+
+
+def _recover(lease_seconds: float) -> List[Tuple[int, int]]:
+    """Requeue jobs whose worker stopped renewing its lease and return everything queued.
+
+    Jobs still renewed are left to their worker, whichever process it is in.
+    """
+    now = datetime.utcnow()
+    # Rows claimed before leases existed have no heartbeat and count as lapsed
+    lapsed = or_(
+        models.ResumeAnalysis.heartbeat_at.is_(None),
+        models.ResumeAnalysis.heartbeat_at < now - timedelta(seconds=lease_seconds)
+    )
+    db = SessionLocal()
+    try:
+        requeued = db.query(models.ResumeAnalysis).filter(
+            models.ResumeAnalysis.status == "running", lapsed
+        ).update(
+            {
+                "status": "queued", "progress": 0, "stage": "Requeued after its worker stopped",
+                "worker_id": None, "heartbeat_at": None
+            },
+            synchronize_session=False
+        )
+        db.query(models.ResumeAnalysis).filter(
+            models.ResumeAnalysis.status == "cancelling", lapsed
+        ).update(
+            {"status": "cancelled", "stage": "Cancelled", "completed_at": now},
+            synchronize_session=False
+        )
+        db.commit()
+        if requeued:
+            logger.info("Requeued %d interrupted analysis job(s)", requeued)
+    finally:
+        db.close()
+    return _queued_jobs()
+
+
+def _release(worker_id: str) -> None:
+    """Requeue the jobs `worker_id` holds, on shutdown, without waiting for their leases to lapse."""
+    db = SessionLocal()
+    try:
+        owned = models.ResumeAnalysis.worker_id == worker_id
+        db.query(models.ResumeAnalysis).filter(models.ResumeAnalysis.status == "running", owned).update(
+            {
+                "status": "queued", "progress": 0, "stage": "Requeued after shutdown",
+                "worker_id": None, "heartbeat_at": None
+            },
+            synchronize_session=False
+        )
+        db.query(models.ResumeAnalysis).filter(models.ResumeAnalysis.status == "cancelling", owned).update(
+            {"status": "cancelled", "stage": "Cancelled", "completed_at": datetime.utcnow()},
+            synchronize_session=False
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def _new_worker_id() -> str:
+    # Unique per start, so processes forked from one parent get their own
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class AnalysisJobQueue:
+    """Priority queue of resume analyses, persisted as ResumeAnalysis rows.
+
+    The table is the source of truth: a job is a row in state queued,
+    running, cancelling, completed, failed or cancelled, and workers claim
+    rows with a conditional update. An in-memory heap orders the queued
+    rows by priority, then age. When idle, workers poll the table, which
+    picks up jobs submitted by other processes.
+
+    Any number of processes may run workers. A claimed row names its
+    queue's `worker_id` and holds a lease, renewed while the job runs; on
+    start and while polling, a queue requeues only rows whose lease has
+    lapsed, i.e. whose process died, and a worker that lost its job that
+    way stops at the next stage without recording anything.
+    """
+
+    # How often a running job's stored progress is checked and broadcast
+    progress_poll_seconds = 0.25
+
+    def __init__(
+        self,
+        workers: int = settings.ANALYSIS_WORKERS,
+        queue_limit: int = settings.ANALYSIS_QUEUE_LIMIT,
+        poll_seconds: float = settings.ANALYSIS_POLL_SECONDS,
+        lease_seconds: float = settings.ANALYSIS_LEASE_SECONDS
+    ):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self.worker_id: Optional[str] = None
+        self._recovered_at = 0.0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._heap: List[Tuple[int, int]] = []
+        self._pending: Set[int] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def submit(
+        self,
+        db: Session,
+        resume_id: int,
+        application_id: Optional[int] = None,
+        job_description: Optional[str] = None,
+        priority: int = 0
+    ) -> models.ResumeAnalysis:
+        """Persist a new queued job and schedule it; callable from any thread."""
+        queued = db.query(func.count(models.ResumeAnalysis.id)).filter(
+            models.ResumeAnalysis.status == "queued"
+        ).scalar()
+        if queued >= self.queue_limit:
+            raise QueueFull(f"{queued} analysis jobs are already queued")
+
+        job = models.ResumeAnalysis(
+            resume_id=resume_id,
+            application_id=application_id,
+            job_description=job_description,
+            priority=priority,
+            status="queued",
+            progress=0
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        self._push(job.priority, job.id)
+        return job
+
+    def cancel(self, db: Session, job: models.ResumeAnalysis) -> models.ResumeAnalysis:
+        """Cancel a queued job now, or ask a running one to stop at its next stage."""
+        for current, new, values in (
+            ("queued", "cancelled", {"stage": "Cancelled", "completed_at": datetime.utcnow()}),
+            ("running", "cancelling", {})
+        ):
+            updated = db.query(models.ResumeAnalysis).filter(
+                models.ResumeAnalysis.id == job.id,
+                models.ResumeAnalysis.status == current
+            ).update({"status": new, **values}, synchronize_session=False)
+            db.commit()
+            if updated:
+                break
+        db.refresh(job)
+        return job
+
+    async def start(self) -> None:
+        if self.workers <= 0:
+            return
+        self.worker_id = _new_worker_id()
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        for priority, job_id in await self._poll():
+            self._push(priority, job_id)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self.worker_id is not None:
+            await run_io(_release, self.worker_id)
+
+    def _push(self, priority: Optional[int], job_id: int) -> None:
+        # The heap and the wakeup event belong to the workers' loop; submit
+        # runs on threadpool threads, so hand the job over to that loop
+        if self._loop is not None and not self._on_loop():
+            self._loop.call_soon_threadsafe(self._push, priority, job_id)
+            return
+        if job_id in self._pending:
+            return
+        heapq.heappush(self._heap, (-(priority or 0), job_id))
+        self._pending.add(job_id)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _on_loop(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    async def _next(self) -> int:
+        while True:
+            if self._heap:
+                _, job_id = heapq.heappop(self._heap)
+                self._pending.discard(job_id)
+                return job_id
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_seconds)
+            except asyncio.TimeoutError:
+                for priority, job_id in await self._poll():
+                    self._push(priority, job_id)
+
+    async def _poll(self) -> List[Tuple[int, int]]:
+        # Looking for lapsed leases writes to the table; a few times per lease is enough
+        if time.monotonic() - self._recovered_at < self.lease_seconds / 2:
+            return await run_io(_queued_jobs)
+        self._recovered_at = time.monotonic()
+        return await run_io(_recover, self.lease_seconds)
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._next()
+            try:
+                if await run_io(_claim, job_id, self.worker_id):
+                    await self._execute(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Analysis job %d could not be run", job_id)
+
+    async def _execute(self, job_id: int) -> None:
+        run = asyncio.ensure_future(run_cpu(run_analysis_job, job_id, self.worker_id))
+        user_id = await run_io(_owner, job_id)
+        last = None
+        renewed_at = time.monotonic()
+        while True:
+            done, _ = await asyncio.wait({run}, timeout=self.progress_poll_seconds)
+            if not done and time.monotonic() - renewed_at >= self.lease_seconds / 3:
+                renewed_at = time.monotonic()
+                if not await run_io(_heartbeat, job_id, self.worker_id):
+                    logger.warning("Analysis job %d was requeued for another worker", job_id)
+            state = await run_io(_state, job_id)
+            if state != last:
+                last = state
+                status, progress, stage = state
+                await self._broadcast(job_id, user_id, progress, stage or status)
+            if done:
+                break
+
+        try:
+            status = run.result()
+        except Exception as e:
+            # The worker died before it could record an outcome itself
+            logger.exception("Analysis job %d crashed", job_id)
+            await run_io(_finish, job_id, self.worker_id, "failed", stage="Analysis failed", error=str(e))
+            await self._broadcast(job_id, user_id, last[1] if last else 0, "Analysis failed")
+            return
+
+        if status == "completed" and settings.REPORTS_ON_COMPLETE:
+            report_artifacts.schedule(job_id)
+
+    @staticmethod
+    async def _broadcast(job_id: int, user_id: Optional[int], progress: int, message: str) -> None:
+        try:
+            await manager.update_analysis_progress(str(job_id), progress, message, user_id)
+        except Exception as e:
+            logger.warning("Could not broadcast progress of analysis job %d: %s", job_id, e)
+
+
+analysis_jobs = AnalysisJobQueue()
@@ -0,0 +1,426 @@
+"""Approximate nearest-neighbour index over job description vectors.
+
+An inverted-file (IVF) index built with NumPy: vectors are clustered with
+spherical k-means and a query only scores the members of the `nprobe`
+clusters closest to it. Vectors, ids and cluster assignments live in
+memory-mapped files so a large corpus doesn't have to fit in RAM, and
+inserts and deletes are applied in place without a rebuild.
+
+Rebuild from the database with:
+
+    python -m app.services.ann_index
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+import fcntl
+import json
+import logging
+import math
+import os
+import threading
+import numpy as np
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+DELETED = -1
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def spherical_kmeans(
+    vectors: np.ndarray,
+    nlist: int,
+    iterations: int = 10,
+    seed: int = 0
+) -> np.ndarray:
+    """Cluster normalized vectors by cosine similarity; returns unit centroids."""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        empty = np.flatnonzero(np.bincount(assignment, minlength=nlist) == 0)
+        # Re-seed empty clusters from random points so every list stays useful
+        sums[empty] = vectors[rng.choice(len(vectors), size=len(empty))]
+        centroids = _normalize(sums)
+    return centroids
+
+
+class IVFIndex:
+    """Disk-backed IVF index mapping integer ids to unit vectors.
+
+    Writes are serialized across processes with a file lock, and every
+    write bumps a generation number; other processes notice it and reload
+    before their next search.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        dims: int,
+        nlist: int = settings.ANN_NLIST,
+        nprobe: int = settings.ANN_NPROBE,
+        train_min: int = settings.ANN_TRAIN_MIN
+    ):
+        self.path = path
+        self.dims = dims
+        self.nlist_setting = nlist
+        self.nprobe = nprobe
+        self.train_min = train_min
+        self._lock = threading.RLock()
+        self._training = False
+        os.makedirs(path, exist_ok=True)
+        self._load()
+
+    # Persistence
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _read_meta(self) -> Dict:
+        try:
+            with open(self._file("meta.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_meta(self) -> None:
+        self.generation += 1
+        meta = {
+            "dims": self.dims,
+            "count": self.count,
+            "capacity": self.capacity,
+            "trained_count": self.trained_count,
+            "generation": self.generation
+        }
+        tmp_path = self._file("meta.json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self._file("meta.json"))
+        self._meta_mtime = os.stat(self._file("meta.json")).st_mtime_ns
+
+    def _open_arrays(self) -> None:
+        shape = (max(self.capacity, 1),)
+        mode = "r+" if self.capacity else "w+"
+        self._vectors = np.memmap(
+            self._file("vectors.f32"), dtype=np.float32, mode=mode, shape=shape + (self.dims,)
+        )
+        self._ids = np.memmap(self._file("ids.i64"), dtype=np.int64, mode=mode, shape=shape)
+        self._lists = np.memmap(self._file("lists.i32"), dtype=np.int32, mode=mode, shape=shape)
+        self.capacity = shape[0]
+
+    def _load(self) -> None:
+        meta = self._read_meta()
+        if meta.get("dims") != self.dims:
+            # New index, or vectors from a different model: start over
+            meta = {}
+            for name in ("vectors.f32", "ids.i64", "lists.i32", "centroids.npy"):
+                if os.path.exists(self._file(name)):
+                    os.remove(self._file(name))
+
+        self.count = meta.get("count", 0)
+        self.capacity = meta.get("capacity", 0)
+        self.trained_count = meta.get("trained_count", 0)
+        self.generation = meta.get("generation", 0)
+        self._open_arrays()
+
+        centroids_path = self._file("centroids.npy")
+        self._centroids = np.load(centroids_path) if os.path.exists(centroids_path) else None
+
+        self._row_of = {
+            int(self._ids[row]): row
+            for row in np.flatnonzero(self._lists[:self.count] != DELETED)
+        }
+        self._rebuild_members()
+        if not meta:
+            self._write_meta()
+        self._meta_mtime = os.stat(self._file("meta.json")).st_mtime_ns
+
+    def _refresh(self) -> None:
+        """Reload if another process has written to the index since we last looked."""
+        try:
+            mtime = os.stat(self._file("meta.json")).st_mtime_ns
+        except OSError:
+            return
+        if mtime != self._meta_mtime and self._read_meta().get("generation") != self.generation:
+            self._load()
+
+    def _rebuild_members(self) -> None:
+        self._pending: Dict[int, List[int]] = {}
+        self._pending_count = 0
+        if self._centroids is None:
+            self._members: List[np.ndarray] = []
+            return
+        lists = np.asarray(self._lists[:self.count])
+        order = np.argsort(lists, kind="stable")
+        bounds = np.searchsorted(lists[order], np.arange(len(self._centroids) + 1))
+        self._members = [
+            order[bounds[i]:bounds[i + 1]].astype(np.int64) for i in range(len(self._centroids))
+        ]
+
+    def _grow(self, needed: int) -> None:
+        if needed <= self.capacity:
+            return
+        capacity = max(1024, self.capacity * 2, needed)
+        self._vectors.flush()
+        self._ids.flush()
+        self._lists.flush()
+        del self._vectors, self._ids, self._lists
+        for name, itemsize in (
+            ("vectors.f32", 4 * self.dims), ("ids.i64", 8), ("lists.i32", 4)
+        ):
+            with open(self._file(name), "r+b") as f:
+                f.truncate(capacity * itemsize)
+        self.capacity = capacity
+        self._open_arrays()
+
+    class _WriteLock:
+        def __init__(self, index: "IVFIndex"):
+            self.index = index
+
+        def __enter__(self):
+            self.index._lock.acquire()
+            self._fd = open(self.index._file("index.lock"), "a")
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            self.index._refresh()
+            return self.index
+
+        def __exit__(self, *exc):
+            index = self.index
+            index._vectors.flush()
+            index._ids.flush()
+            index._lists.flush()
+            index._write_meta()
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            self._fd.close()
+            index._lock.release()
+
+    # Mutation
+
+    def train(self) -> None:
+        """(Re)cluster every live vector and reassign all rows."""
+        with self._WriteLock(self):
+            self._train()
+
+    def _train(self) -> None:
+        live = np.flatnonzero(self._lists[:self.count] != DELETED)
+        if not len(live):
+            return
+        nlist = self.nlist_setting or int(math.sqrt(len(live)))
+        nlist = max(1, min(nlist, len(live)))
+        rng = np.random.default_rng(0)
+        sample = live if len(live) <= 50000 else rng.choice(live, 50000, replace=False)
+        self._centroids = spherical_kmeans(np.asarray(self._vectors[np.sort(sample)]), nlist)
+        np.save(self._file("centroids.npy"), self._centroids)
+
+        for start in range(0, len(live), 65536):
+            rows = live[start:start + 65536]
+            self._lists[rows] = np.argmax(self._vectors[rows] @ self._centroids.T, axis=1)
+        self.trained_count = len(live)
+        self._rebuild_members()
+        logger.info("Trained IVF index with %d lists over %d vectors", nlist, len(live))
+
+    def upsert(self, ids: Sequence[int], vectors: np.ndarray) -> None:
+        """Insert vectors, replacing any existing entry with the same id.
+
+        New vectors join their nearest existing cluster; (re)training is
+        left to `train` or `schedule_training`.
+        """
+        vectors = _normalize(np.atleast_2d(vectors))
+        with self._WriteLock(self):
+            self._remove(ids)
+            self._grow(self.count + len(ids))
+            rows = np.arange(self.count, self.count + len(ids))
+            self._vectors[rows] = vectors
+            self._ids[rows] = ids
+            if self._centroids is None:
+                self._lists[rows] = 0
+            else:
+                assignment = np.argmax(vectors @ self._centroids.T, axis=1)
+                self._lists[rows] = assignment
+                for row, cluster in zip(rows, assignment):
+                    self._pending.setdefault(int(cluster), []).append(int(row))
+                self._pending_count += len(rows)
+            self.count += len(ids)
+            self._row_of.update(zip((int(i) for i in ids), (int(r) for r in rows)))
+
+            if self._pending_count > max(1024, self.count // 10):
+                self._rebuild_members()
+
+    @property
+    def needs_training(self) -> bool:
+        """Whether there's enough data to train, or the corpus has outgrown its clusters."""
+        live = len(self._row_of)
+        return live >= self.train_min and (self._centroids is None or live > 4 * self.trained_count)
+
+    def schedule_training(self) -> None:
+        """Train on the io pool if needed, without holding up the caller.
+
+        Until training finishes, searches keep using the old clusters, or
+        score every vector when there are none yet.
+        """
+        with self._lock:
+            if self._training or not self.needs_training:
+                return
+            self._training = True
+
+        from .executor import executor
+
+        def done(future) -> None:
+            self._training = False
+            if future.exception() is not None:
+                logger.error("Training the IVF index failed", exc_info=future.exception())
+
+        executor.io.executor.submit(self.train).add_done_callback(done)
+
+    def remove(self, ids: Sequence[int]) -> None:
+        with self._WriteLock(self):
+            self._remove(ids)
+
+    def _remove(self, ids: Sequence[int]) -> None:
+        for id_ in ids:
+            row = self._row_of.pop(int(id_), None)
+            if row is not None:
+                self._lists[row] = DELETED
+
+    # Queries
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def search(
+        self,
+        vector: np.ndarray,
+        k: int = 10,
+        nprobe: Optional[int] = None
+    ) -> List[Tuple[int, float]]:
+        """Approximate top-k (id, cosine similarity) pairs, best first."""
+        query = _normalize(vector)
+        with self._lock:
+            self._refresh()
+            if self._centroids is None:
+                return self.exact_search(query, k)
+
+            nprobe = min(nprobe or self.nprobe, len(self._centroids))
+            centroid_scores = self._centroids @ query
+            probes = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+            candidates = np.concatenate(
+                [self._members[c] for c in probes]
+                + [np.asarray(self._pending.get(int(c), []), dtype=np.int64) for c in probes]
+            )
+            # Drop rows deleted (or moved) since the member lists were built
+            candidates = candidates[np.isin(self._lists[candidates], probes)]
+            return self._top_k(candidates, query, k)
+
+    def exact_search(self, vector: np.ndarray, k: int = 10) -> List[Tuple[int, float]]:
+        """Brute-force top-k over every live vector."""
+        query = _normalize(vector)
+        with self._lock:
+            self._refresh()
+            candidates = np.flatnonzero(self._lists[:self.count] != DELETED)
+            return self._top_k(candidates, query, k)
+
+    def _top_k(self, rows: np.ndarray, query: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        if not len(rows):
+            return []
+        scores = self._vectors[rows] @ query
+        if k < len(scores):
+            top = np.argpartition(-scores, k)[:k]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(self._ids[rows[i]]), float(scores[i])) for i in top]
+
+
+_job_index: Optional[IVFIndex] = None
+_job_index_lock = threading.Lock()
+
+
+def get_job_index() -> IVFIndex:
+    """The process-wide index over JobApplication.description_vector."""
+    global _job_index
+    if _job_index is None:
+        from .nlp_registry import get_nlp
+
+        with _job_index_lock:
+            if _job_index is None:
+                dims = get_nlp(profile="vectors").vocab.vectors_length
+                _job_index = IVFIndex(settings.ANN_INDEX_DIR, dims)
+    return _job_index
+
+
+def rebuild_job_index(db, batch_size: int = 5000) -> IVFIndex:
+    """Load every job description vector into a fresh, trained index.
+
+    Rows bulk-loaded without a stored vector are vectorized first.
+    """
+    from sqlalchemy import update
+    from ..api import models
+    from .doc_cache import doc_cache
+    from .doc_vectors import decode_vector
+    from .nlp_registry import get_nlp
+
+    nlp = get_nlp(profile="vectors")
+    while True:
+        missing = db.query(
+            models.JobApplication.id, models.JobApplication.job_description
+        ).filter(
+            models.JobApplication.description_vector.is_(None),
+            models.JobApplication.job_description.isnot(None),
+            models.JobApplication.job_description != ""
+        ).limit(batch_size).all()
+        if not missing:
+            break
+        docs = doc_cache.pipe(nlp, (row.job_description for row in missing))
+        db.execute(update(models.JobApplication), [
+            {"id": row.id, "description_vector": np.asarray(doc.vector, dtype=np.float32).tobytes()}
+            for row, doc in zip(missing, docs)
+        ])
+        db.commit()
+
+    index = get_job_index()
+    with index._WriteLock(index):
+        index._remove(list(index._row_of))
+        index.count = 0
+        index.trained_count = 0
+        index._centroids = None
+        if os.path.exists(index._file("centroids.npy")):
+            os.remove(index._file("centroids.npy"))
+        index._rebuild_members()
+
+    query = db.query(
+        models.JobApplication.id, models.JobApplication.description_vector
+    ).filter(
+        models.JobApplication.description_vector.isnot(None)
+    ).order_by(models.JobApplication.id).yield_per(batch_size)
+
+    ids, vectors = [], []
+    for row in query:
+        vector = decode_vector(row.description_vector, index.dims)
+        if vector is not None:
+            ids.append(row.id)
+            vectors.append(vector)
+        if len(ids) >= batch_size:
+            index.upsert(ids, np.stack(vectors))
+            ids, vectors = [], []
+    if ids:
+        index.upsert(ids, np.stack(vectors))
+    index.train()
+    return index
+
+
+if __name__ == "__main__":
+    from ..database import SessionLocal
+
+    logging.basicConfig(level=logging.INFO)
+    session = SessionLocal()
+    try:
+        print(f"Indexed {len(rebuild_job_index(session))} job descriptions")
+    finally:
+        session.close()
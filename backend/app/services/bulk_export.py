@@ -0,0 +1,145 @@
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+import csv
+import io
+import json
+import os
+import tempfile
+from sqlalchemy import or_
+from ..config import settings
+from ..database import SessionLocal
+from ..api import models
+
+EXPORT_FORMATS = {
+    # Starlette adds the charset to text/* types
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+}
+
+HEADER = [
+    "Analysis ID", "Status", "Created", "Completed", "Resume ID", "Resume",
+    "Application ID", "Company", "Position", "Application Status",
+    "Match Score", "Missing Keywords", "Suggestions"
+]
+
+# Joined with this inside a cell; JSON lists don't read well in a spreadsheet
+LIST_SEPARATOR = "; "
+
+
+def _list_cell(value: Optional[str]) -> str:
+    if not value:
+        return ""
+    try:
+        return LIST_SEPARATOR.join(str(item) for item in json.loads(value))
+    except (TypeError, ValueError):
+        return value
+
+
+def iter_analysis_rows(
+    user_id: int,
+    status: Optional[str] = "completed",
+    since: Optional[datetime] = None,
+    batch_size: int = settings.EXPORT_BATCH_SIZE
+) -> Iterator[List]:
+    """One spreadsheet row per analysis of `user_id`'s, oldest first.
+
+    An analysis is theirs when its resume or its application is.
+
+    Rows are fetched `batch_size` at a time (a server-side cursor on
+    PostgreSQL), and only the columns in HEADER are selected, so memory
+    does not grow with the number of analyses. Opens its own session:
+    the caller's request-scoped one is closed before a streamed
+    response is sent.
+    """
+    db = SessionLocal()
+    try:
+        query = (
+            db.query(
+                models.ResumeAnalysis.id,
+                models.ResumeAnalysis.status,
+                models.ResumeAnalysis.created_at,
+                models.ResumeAnalysis.completed_at,
+                models.ResumeAnalysis.resume_id,
+                models.Resume.title,
+                models.ResumeAnalysis.application_id,
+                models.JobApplication.company,
+                models.JobApplication.position,
+                models.JobApplication.status,
+                models.ResumeAnalysis.match_score,
+                models.ResumeAnalysis.missing_keywords,
+                models.ResumeAnalysis.suggested_modifications
+            )
+            .outerjoin(models.Resume, models.Resume.id == models.ResumeAnalysis.resume_id)
+            .outerjoin(models.JobApplication, models.JobApplication.id == models.ResumeAnalysis.application_id)
+            .filter(or_(models.Resume.user_id == user_id, models.JobApplication.user_id == user_id))
+            .order_by(models.ResumeAnalysis.id)
+        )
+        if status is not None:
+            query = query.filter(models.ResumeAnalysis.status == status)
+        if since is not None:
+            query = query.filter(models.ResumeAnalysis.created_at >= since)
+
+        for row in query.execution_options(yield_per=batch_size):
+            *head, missing, suggestions = row
+            yield [*head, _list_cell(missing), _list_cell(suggestions)]
+    finally:
+        db.close()
+
+
+def iter_csv(rows: Iterator[List], chunk_size: int = settings.EXPORT_CHUNK_SIZE) -> Iterator[bytes]:
+    """CSV with a header line, as UTF-8 chunks of about `chunk_size` bytes."""
+    buffer = io.StringIO()
+    # BOM so Excel detects UTF-8 when the file is opened directly
+    buffer.write("\ufeff")
+    writer = csv.writer(buffer)
+    writer.writerow(HEADER)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= chunk_size:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+def iter_xlsx(rows: Iterator[List], chunk_size: int = settings.EXPORT_CHUNK_SIZE) -> Iterator[bytes]:
+    """XLSX workbook with one "Analyses" sheet, in chunks of `chunk_size` bytes.
+
+    A write-only workbook streams rows to a temporary file instead of
+    keeping cells in memory. XLSX is a zip archive whose directory is
+    written last, so the file is sent once complete and then deleted.
+    """
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Analyses")
+    ws.append(HEADER)
+    for row in rows:
+        ws.append(row)
+
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    try:
+        with os.fdopen(fd, "wb") as output:
+            wb.save(output)
+        with open(path, "rb") as output:
+            while True:
+                chunk = output.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        os.unlink(path)
+
+
+def export_analyses(
+    format: str,
+    user_id: int,
+    status: Optional[str] = "completed",
+    since: Optional[datetime] = None
+) -> Tuple[Iterator[bytes], str]:
+    """Chunks of every matching analysis of `user_id`'s in `format`, and their media type."""
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {format}")
+    rows = iter_analysis_rows(user_id, status, since)
+    chunks = iter_csv(rows) if format == "csv" else iter_xlsx(rows)
+    return chunks, EXPORT_FORMATS[format]
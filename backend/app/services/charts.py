@@ -0,0 +1,201 @@
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Tuple
+import asyncio
+import hashlib
+import io
+import json
+import time
+from ..config import settings
+from .executor import executor
+from .lru import SizedLRUCache
+
+# Bump when chart styling changes so cached images are not served stale
+CHART_VERSION = 1
+
+FORMATS = {"png": "image/png", "svg": "image/svg+xml"}
+
+
+def _pie(fig, spec: Dict) -> None:
+    ax = fig.add_subplot()
+    ax.pie(spec["values"], labels=spec["labels"], autopct='%1.1f%%')
+    ax.set_title(spec.get("title", ""))
+
+
+def _line(fig, spec: Dict) -> None:
+    ax = fig.add_subplot()
+    ax.plot(spec["x"], spec["y"], marker='o')
+    ax.set_title(spec.get("title", ""))
+    ax.set_ylabel(spec.get("ylabel", ""))
+    ax.tick_params(axis='x', labelrotation=45)
+
+
+def _radar(fig, spec: Dict) -> None:
+    import numpy as np
+
+    labels = spec["labels"]
+    angles = np.linspace(0, 2 * np.pi, len(labels), endpoint=False).tolist()
+    values = list(spec["values"])
+    # Close the polygon
+    angles += angles[:1]
+    values += values[:1]
+
+    ax = fig.add_subplot(projection='polar')
+    ax.plot(angles, values)
+    ax.fill(angles, values, alpha=0.25)
+    ax.set_xticks(angles[:-1])
+    ax.set_xticklabels(labels)
+    ax.set_title(spec.get("title", ""))
+
+
+def _heatmap(fig, spec: Dict) -> None:
+    import numpy as np
+
+    matrix = np.asarray(spec["matrix"], dtype=float)
+    ax = fig.add_subplot()
+    image = ax.imshow(
+        matrix, cmap=spec.get("cmap", "RdYlGn"), aspect="auto",
+        vmin=spec.get("vmin"), vmax=spec.get("vmax")
+    )
+    fig.colorbar(image, ax=ax)
+    ax.set_xticks(range(matrix.shape[1]), labels=spec.get("col_labels", [""] * matrix.shape[1]))
+    ax.set_yticks(range(matrix.shape[0]), labels=spec.get("row_labels", [""] * matrix.shape[0]))
+    for (row, col), value in np.ndenumerate(matrix):
+        ax.text(col, row, format(value, spec.get("fmt", ".0f")), ha="center", va="center")
+    ax.set_title(spec.get("title", ""))
+
+
+CHART_KINDS: Dict[str, Callable] = {
+    "pie": _pie,
+    "line": _line,
+    "radar": _radar,
+    "heatmap": _heatmap
+}
+
+
+def chart_key(kind: str, spec: Dict, format: str) -> str:
+    """Hash of everything that determines a chart's bytes."""
+    payload = json.dumps(
+        [CHART_VERSION, kind, format, spec], sort_keys=True, separators=(",", ":"), default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def render_chart(kind: str, spec: Dict, format: str = "png") -> Tuple[bytes, float]:
+    """Draw one chart and return its bytes and the seconds it took.
+
+    Uses its own Figure on an Agg canvas rather than pyplot's global
+    state, so concurrent renders in threads can't draw on each other.
+    """
+    import matplotlib
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    if kind not in CHART_KINDS:
+        raise ValueError(f"Unknown chart kind: {kind}")
+    if format not in FORMATS:
+        raise ValueError(f"Unsupported chart format: {format}")
+
+    # Same inputs must give the same bytes, since the input hash is the ETag;
+    # SVG ids are otherwise salted randomly and SVG metadata carries a date
+    matplotlib.rcParams["svg.hashsalt"] = f"chart-v{CHART_VERSION}"
+    start = time.perf_counter()
+    fig = Figure(figsize=tuple(spec.get("size", (10, 6))))
+    FigureCanvasAgg(fig)
+    CHART_KINDS[kind](fig, spec)
+    buf = io.BytesIO()
+    fig.savefig(
+        buf, format=format, bbox_inches='tight',
+        metadata={"Date": None} if format == "svg" else None
+    )
+    return buf.getvalue(), time.perf_counter() - start
+
+
+def warmup() -> None:
+    """Import matplotlib and build its font cache before the first real chart."""
+    render_chart("pie", {"labels": ["a"], "values": [1]}, "png")
+
+
+class ChartRenderer:
+    """Chart images cached by a hash of their inputs.
+
+    `render` runs misses on the executor's render pool and is what async
+    code should call; concurrent requests for the same chart share one
+    render. `render_sync` draws in the calling thread, for code that is
+    already off the event loop. The cache is per process and bounded in
+    bytes with LRU eviction.
+    """
+
+    def __init__(self, cache_bytes: int = settings.CHART_CACHE_BYTES, latency_samples: int = 1000):
+        self._cache = SizedLRUCache(cache_bytes)
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._latencies: Deque[float] = deque(maxlen=latency_samples)
+        self.renders = 0
+        self.render_seconds_total = 0.0
+
+    async def render(self, kind: str, spec: Dict, format: str = "png") -> bytes:
+        key = chart_key(kind, spec, format)
+        data = self._cache.get(key)
+        if data is not None:
+            return data
+
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            data, seconds = await executor.run_render(render_chart, kind, spec, format)
+            self._store(key, data, seconds)
+            future.set_result(data)
+            return data
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Nobody may be waiting on it; don't log "exception never retrieved"
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+
+    def render_sync(self, kind: str, spec: Dict, format: str = "png") -> bytes:
+        key = chart_key(kind, spec, format)
+        data = self._cache.get(key)
+        if data is None:
+            data, seconds = render_chart(kind, spec, format)
+            self._store(key, data, seconds)
+        return data
+
+    def stats(self) -> Dict[str, Any]:
+        cache = self._cache.stats()
+        lookups = cache["hits"] + cache["misses"]
+        latencies = sorted(self._latencies)
+        return {
+            **cache,
+            "hit_rate": round(cache["hits"] / lookups, 4) if lookups else 0.0,
+            "renders": self.renders,
+            "avg_render_ms": round(self.render_seconds_total / self.renders * 1000, 2) if self.renders else 0.0,
+            "p50_render_ms": self._percentile_ms(latencies, 0.5),
+            "p95_render_ms": self._percentile_ms(latencies, 0.95),
+            "max_render_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0
+        }
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def _store(self, key: str, data: bytes, seconds: float) -> None:
+        self.renders += 1
+        self.render_seconds_total += seconds
+        self._latencies.append(seconds)
+        self._cache.put(key, data, len(data))
+
+    @staticmethod
+    def _percentile_ms(latencies: List[float], q: float) -> float:
+        if not latencies:
+            return 0.0
+        return round(latencies[min(int(len(latencies) * q), len(latencies) - 1)] * 1000, 2)
+
+
+chart_renderer = ChartRenderer()
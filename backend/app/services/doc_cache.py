@@ -0,0 +1,209 @@
+from typing import Dict, Iterable, List, Optional
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from spacy.tokens import Doc, DocBin
+from ..config import settings
+from .lru import SizedLRUCache
+from .nlp_registry import PipelineView
+
+logger = logging.getLogger(__name__)
+
+# Memory of a parsed token beyond its share of the tensor: spaCy's TokenC
+# struct and the Doc's per-token arrays, measured at ~240 bytes
+TOKEN_BYTES = 256
+
+
+def doc_size(doc: Doc) -> int:
+    """Approximate memory held by a live Doc, for the memory tier's budget.
+
+    Not its DocBin size: DocBins leave out the tensor and are compressed,
+    so they can be hundreds of times smaller than the Doc they decode to.
+    """
+    return doc.tensor.nbytes + len(doc) * TOKEN_BYTES + len(doc.text)
+
+
+
+class DocCache:
+    """Two-tier cache of parsed spaCy Docs keyed by content hash.
+
+    Keys combine a SHA-256 of the text with the pipeline name, version and
+    enabled components, so a model upgrade or a different pipeline profile
+    never serves stale annotations. The memory tier holds live Doc objects,
+    charged at their estimated size in memory (`doc_size`); the disk tier
+    holds DocBin bytes and survives restarts. Both tiers are bounded by
+    size in bytes.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = settings.DOC_CACHE_DIR,
+        memory_bytes: int = settings.DOC_CACHE_MEMORY_BYTES,
+        disk_bytes: int = settings.DOC_CACHE_DISK_BYTES
+    ):
+        self.cache_dir = cache_dir
+        self.disk_bytes = disk_bytes
+        self._memory = SizedLRUCache(memory_bytes)
+        self._disk_lock = threading.Lock()
+        self._disk_usage: Optional[int] = None
+        self.disk_hits = 0
+        self.disk_evictions = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(nlp: PipelineView, text: str) -> str:
+        meta = nlp.meta
+        digest = hashlib.sha256()
+        digest.update(
+            f"{meta.get('lang')}_{meta.get('name')}\0{meta.get('version')}\0"
+            f"{','.join(nlp.pipe_names)}\0".encode("utf-8")
+        )
+        digest.update(text.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, nlp: PipelineView, text: str) -> Optional[Doc]:
+        """Return the cached Doc for `text`, or None."""
+        key = self.key(nlp, text)
+        doc = self._memory.get(key)
+        if doc is not None:
+            return doc
+
+        data = self._read_disk(key)
+        if data is None:
+            self.misses += 1
+            return None
+
+        self.disk_hits += 1
+        doc = self._from_bytes(nlp, data)
+        self._memory.put(key, doc, doc_size(doc))
+        return doc
+
+    def parse(self, nlp: PipelineView, text: str) -> Doc:
+        """Return the cached Doc for `text`, parsing and storing it on a miss."""
+        doc = self.get(nlp, text)
+        if doc is None:
+            doc = nlp(text)
+            self._store(self.key(nlp, text), doc)
+        return doc
+
+    def pipe(
+        self,
+        nlp: PipelineView,
+        texts: Iterable[str],
+        batch_size: int = settings.NLP_BATCH_SIZE,
+        n_process: int = settings.NLP_N_PROCESS
+    ) -> List[Doc]:
+        """Like `nlp.pipe`, but only texts missing from the cache are parsed."""
+        texts = list(texts)
+        docs = [self.get(nlp, text) for text in texts]
+        missing = [i for i, doc in enumerate(docs) if doc is None]
+
+        parsed = nlp.pipe(
+            (texts[i] for i in missing), batch_size=batch_size, n_process=n_process
+        )
+        for i, doc in zip(missing, parsed):
+            self._store(self.key(nlp, texts[i]), doc)
+            docs[i] = doc
+        return docs
+
+    def stats(self) -> Dict[str, int]:
+        memory = self._memory.stats()
+        return {
+            "memory_hits": memory["hits"],
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "memory_evictions": memory["evictions"],
+            "disk_evictions": self.disk_evictions,
+            "memory_entries": memory["entries"],
+            "memory_bytes": memory["bytes"],
+            "memory_max_bytes": memory["max_bytes"],
+            "disk_bytes": self._disk_usage or 0,
+            "disk_max_bytes": self.disk_bytes
+        }
+
+    def clear_memory(self) -> None:
+        self._memory.clear()
+
+    def _store(self, key: str, doc: Doc) -> None:
+        data = DocBin(docs=[doc], store_user_data=False).to_bytes()
+        self._memory.put(key, doc, doc_size(doc))
+        try:
+            self._write_disk(key, data)
+        except OSError as e:
+            # The disk tier is an optimisation; never fail a parse because of it
+            logger.warning("Could not write doc cache entry %s: %s", key, e)
+
+    @staticmethod
+    def _from_bytes(nlp: PipelineView, data: bytes) -> Doc:
+        return next(DocBin().from_bytes(data).get_docs(nlp.vocab))
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.spacy")
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        try:
+            # Keep recently used entries at the back of the eviction order
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def _write_disk(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        if len(data) > self.disk_bytes or os.path.exists(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._disk_lock:
+            if self._disk_usage is None:
+                self._disk_usage = self._scan_disk_usage()
+            else:
+                self._disk_usage += len(data)
+            if self._disk_usage > self.disk_bytes:
+                self._evict_disk()
+
+    def _entries_on_disk(self) -> List[os.DirEntry]:
+        entries = []
+        if not os.path.isdir(self.cache_dir):
+            return entries
+        for bucket in os.scandir(self.cache_dir):
+            if bucket.is_dir():
+                entries.extend(e for e in os.scandir(bucket.path) if e.name.endswith(".spacy"))
+        return entries
+
+    def _scan_disk_usage(self) -> int:
+        return sum(entry.stat().st_size for entry in self._entries_on_disk())
+
+    def _evict_disk(self) -> None:
+        # Trim to 90% of the budget so we don't rescan on every write
+        target = int(self.disk_bytes * 0.9)
+        entries = sorted(
+            ((entry.stat().st_mtime, entry.stat().st_size, entry.path)
+             for entry in self._entries_on_disk()),
+        )
+        usage = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if usage <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            usage -= size
+            self.disk_evictions += 1
+        self._disk_usage = usage
+
+
+doc_cache = DocCache()
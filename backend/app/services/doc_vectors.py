@@ -0,0 +1,203 @@
+from typing import Dict, List, Optional, Tuple
+import threading
+import time
+import numpy as np
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+from ..api import models
+from ..config import settings
+from .ann_index import get_job_index
+from .doc_cache import doc_cache
+from .nlp_registry import get_nlp
+
+
+def compute_vector(text: Optional[str]) -> Optional[bytes]:
+    """float32 document vector of `text`, serialized for a LargeBinary column."""
+    if not text:
+        return None
+    doc = doc_cache.parse(get_nlp(profile="vectors"), text)
+    return np.asarray(doc.vector, dtype=np.float32).tobytes()
+
+
+def decode_vector(data: Optional[bytes], dims: Optional[int] = None) -> Optional[np.ndarray]:
+    """Inverse of `compute_vector`; None if missing or from a different model."""
+    if not data:
+        return None
+    if dims is None:
+        dims = get_nlp(profile="vectors").vocab.vectors_length
+    vector = np.frombuffer(data, dtype=np.float32)
+    if vector.shape[0] != dims:
+        return None
+    return vector
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+# Stored vectors are invalidated whenever their source text changes and
+# recomputed when the row is flushed, so they can never drift from the text.
+
+@event.listens_for(models.Resume.content, "set")
+def _resume_content_changed(target, value, oldvalue, initiator):
+    if value != oldvalue:
+        target.content_vector = None
+
+
+@event.listens_for(models.JobApplication.job_description, "set")
+def _job_description_changed(target, value, oldvalue, initiator):
+    if value != oldvalue:
+        target.description_vector = None
+
+
+@event.listens_for(models.Resume, "before_insert")
+@event.listens_for(models.Resume, "before_update")
+def _fill_resume_vector(mapper, connection, target):
+    if target.content_vector is None:
+        target.content_vector = compute_vector(target.content)
+
+
+@event.listens_for(models.JobApplication, "before_insert")
+@event.listens_for(models.JobApplication, "before_update")
+def _fill_description_vector(mapper, connection, target):
+    if target.description_vector is None:
+        target.description_vector = compute_vector(target.job_description)
+
+
+@event.listens_for(models.JobApplication, "after_insert")
+@event.listens_for(models.JobApplication, "after_update")
+@event.listens_for(models.JobApplication, "after_delete")
+def _invalidate_user_matrix(mapper, connection, target):
+    application_vectors.invalidate(target.user_id)
+
+
+# Index changes wait in the session until it commits, so the index never
+# holds rows from a transaction that was rolled back. Keyed by application
+# id; None removes the id.
+PENDING_INDEX_KEY = "job_index_changes"
+
+
+def _pending_index_changes(target) -> Dict[int, Optional[np.ndarray]]:
+    return object_session(target).info.setdefault(PENDING_INDEX_KEY, {})
+
+
+@event.listens_for(models.JobApplication, "after_insert")
+@event.listens_for(models.JobApplication, "after_update")
+def _index_job_description(mapper, connection, target):
+    if not inspect(target).attrs.description_vector.history.has_changes():
+        return
+    _pending_index_changes(target)[target.id] = decode_vector(target.description_vector)
+
+
+@event.listens_for(models.JobApplication, "after_delete")
+def _unindex_job_description(mapper, connection, target):
+    _pending_index_changes(target)[target.id] = None
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_index_changes(session):
+    changes = session.info.pop(PENDING_INDEX_KEY, None)
+    if not changes:
+        return
+    index = get_job_index()
+    removed = [id_ for id_, vector in changes.items() if vector is None]
+    if removed:
+        index.remove(removed)
+    upserted = {id_: vector for id_, vector in changes.items() if vector is not None}
+    if upserted:
+        index.upsert(list(upserted), np.stack(list(upserted.values())))
+    index.schedule_training()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_index_changes(session):
+    session.info.pop(PENDING_INDEX_KEY, None)
+
+
+class ApplicationVectorStore:
+    """Per-user matrix of normalized job description vectors.
+
+    Matrices are cached in-process and dropped whenever one of the user's
+    applications is written through this process. The TTL bounds how long
+    a write made by another worker can go unnoticed.
+    """
+
+    def __init__(self, ttl_seconds: float = settings.VECTOR_CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._matrices: Dict[int, Tuple[float, np.ndarray, np.ndarray]] = {}
+        self._lock = threading.Lock()
+
+    def invalidate(self, user_id: Optional[int] = None) -> None:
+        with self._lock:
+            if user_id is None:
+                self._matrices.clear()
+            else:
+                self._matrices.pop(user_id, None)
+
+    def matrix(self, db: Session, user_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Application ids and their normalized vectors for `user_id`."""
+        cached = self._matrices.get(user_id)
+        if cached is not None and time.monotonic() - cached[0] < self.ttl_seconds:
+            return cached[1], cached[2]
+
+        rows = db.query(
+            models.JobApplication.id,
+            models.JobApplication.description_vector
+        ).filter(models.JobApplication.user_id == user_id).order_by(models.JobApplication.id).all()
+
+        ids = np.fromiter((row.id for row in rows), dtype=np.int64, count=len(rows))
+        dims = get_nlp(profile="vectors").vocab.vectors_length
+        matrix = np.zeros((len(rows), dims), dtype=np.float32)
+        stale: List[int] = []
+        for i, row in enumerate(rows):
+            vector = decode_vector(row.description_vector, dims)
+            if vector is None:
+                stale.append(row.id)
+            else:
+                matrix[i] = vector
+
+        if stale:
+            # Rows written before vectors existed, or by a different model
+            for application in db.query(models.JobApplication).filter(
+                models.JobApplication.id.in_(stale)
+            ):
+                application.description_vector = compute_vector(application.job_description)
+                vector = decode_vector(application.description_vector, dims)
+                if vector is not None:
+                    matrix[np.searchsorted(ids, application.id)] = vector
+            db.commit()
+
+        matrix = _normalize(matrix)
+        with self._lock:
+            self._matrices[user_id] = (time.monotonic(), ids, matrix)
+        return ids, matrix
+
+    def rank(
+        self,
+        db: Session,
+        resume: models.Resume,
+        limit: Optional[int] = None
+    ) -> List[Tuple[int, float]]:
+        """(application_id, cosine similarity) pairs, best match first."""
+        vector = decode_vector(resume.content_vector)
+        if vector is None:
+            resume.content_vector = compute_vector(resume.content)
+            db.commit()
+            vector = decode_vector(resume.content_vector)
+        ids, matrix = self.matrix(db, resume.user_id)
+        if vector is None or not len(ids):
+            return []
+
+        # One matrix-vector product scores every application
+        scores = matrix @ _normalize(vector)
+        if limit is not None and limit < len(scores):
+            top = np.argpartition(-scores, limit)[:limit]
+            order = top[np.argsort(-scores[top], kind="stable")]
+        else:
+            order = np.argsort(-scores, kind="stable")
+        return [(int(ids[i]), float(scores[i])) for i in order]
+
+
+application_vectors = ApplicationVectorStore()
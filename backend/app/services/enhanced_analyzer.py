@@ -1,21 +1,31 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from typing import Dict, List
-import json
+from typing import Dict, Optional, Tuple
 from io import BytesIO
-import base64
-from fpdf import FPDF
-from openpyxl import Workbook
 from datetime import datetime
+from .charts import chart_renderer
+
+# Height of each chart in exported PDFs; widths follow the chart's aspect ratio
+CHART_HEIGHT_MM = 100
+
+
+def warmup() -> None:
+    """Import the export libraries and matplotlib before the first report needs them.
+
+    They are otherwise imported on first use, so processes that never
+    export or draw a chart don't pay for them at startup.
+    """
+    import fpdf  # noqa: F401
+    import openpyxl  # noqa: F401
+    from .charts import warmup as warmup_charts
+
+    warmup_charts()
 
 class EnhancedAnalyzer:
     def __init__(self):
         self.visualization_types = {
-            'radar': self._create_radar_chart,
-            'timeline': self._create_timeline_chart,
-            'distribution': self._create_distribution_chart,
-            'heatmap': self._create_heatmap
+            'radar': self._radar_chart,
+            'timeline': self._timeline_chart,
+            'distribution': self._distribution_chart,
+            'heatmap': self._heatmap
         }
 
     def export_report(self, analysis_data: Dict, format: str = 'pdf') -> BytesIO:
@@ -27,6 +37,8 @@ class EnhancedAnalyzer:
             raise ValueError(f"Unsupported format: {format}")
 
     def _export_pdf(self, analysis_data: Dict) -> BytesIO:
+        from fpdf import FPDF
+
         pdf = FPDF()
         pdf.add_page()
         
@@ -38,18 +50,24 @@ class EnhancedAnalyzer:
         pdf.set_font('Arial', '', 12)
         pdf.cell(0, 10, f"Overall Match Score: {analysis_data['match_score']}%", 0, 1)
         
-        # Add visualizations
-        for chart_type, chart_data in analysis_data['visualizations'].items():
-            img_data = base64.b64decode(chart_data)
-            pdf.image(BytesIO(img_data), x=10, y=pdf.get_y(), w=190)
-            pdf.ln(100)  # Add space after each chart
+        # Add visualizations, embedding the rendered bytes straight from the chart cache
+        for chart_type in self.visualization_types:
+            image = self.create_chart(chart_type, analysis_data)
+            if image is None:
+                continue
+            if pdf.get_y() + CHART_HEIGHT_MM > pdf.page_break_trigger:
+                pdf.add_page()
+            info = pdf.image(BytesIO(image), x='C', y=pdf.get_y(), h=CHART_HEIGHT_MM)
+            pdf.set_y(pdf.get_y() + info.rendered_height + 5)
         
         output = BytesIO()
-        pdf.output(output, 'F')
+        pdf.output(output)
         output.seek(0)
         return output
 
     def _export_excel(self, analysis_data: Dict) -> BytesIO:
+        from openpyxl import Workbook
+
         wb = Workbook()
         ws = wb.active
         ws.title = "Analysis Summary"
@@ -62,7 +80,7 @@ class EnhancedAnalyzer:
         ws['B3'] = f"{analysis_data['match_score']}%"
         
         # Add skills analysis
-        ws.create_sheet("Skills Analysis")
+        wb.create_sheet("Skills Analysis")
         skills_sheet = wb["Skills Analysis"]
         skills_sheet['A1'] = "Matching Skills"
         skills_sheet['B1'] = "Missing Skills"
@@ -77,58 +95,65 @@ class EnhancedAnalyzer:
         output.seek(0)
         return output
 
-    def _create_radar_chart(self, data: Dict) -> str:
-        plt.figure(figsize=(8, 8))
-        categories = list(data.keys())
-        values = list(data.values())
-        
-        angles = np.linspace(0, 2*np.pi, len(categories), endpoint=False)
-        values += values[:1]
-        angles += angles[:1]
-        
-        ax = plt.subplot(111, projection='polar')
-        ax.plot(angles, values)
-        ax.fill(angles, values, alpha=0.25)
-        ax.set_xticks(angles[:-1])
-        ax.set_xticklabels(categories)
-        
-        return self._fig_to_base64()
+    def chart_spec(self, chart_type: str, analysis_data: Dict) -> Optional[Tuple[str, Dict]]:
+        """Chart kind and inputs for `chart_type`, or None if the analysis lacks its data."""
+        if chart_type not in self.visualization_types:
+            raise ValueError(f"Unknown chart type: {chart_type}")
+        return self.visualization_types[chart_type](analysis_data)
 
-    def _create_timeline_chart(self, data: List[Dict]) -> str:
-        plt.figure(figsize=(10, 6))
-        dates = [d['date'] for d in data]
-        values = [d['value'] for d in data]
-        
-        plt.plot(dates, values, marker='o')
-        plt.xticks(rotation=45)
-        plt.title('Analysis Timeline')
-        
-        return self._fig_to_base64()
+    def create_chart(self, chart_type: str, analysis_data: Dict, format: str = "png") -> Optional[bytes]:
+        """Rendered chart, drawn in this thread; reuses the cached image when inputs repeat."""
+        spec = self.chart_spec(chart_type, analysis_data)
+        if spec is None:
+            return None
+        return chart_renderer.render_sync(*spec, format)
 
-    def _create_distribution_chart(self, data: Dict) -> str:
-        plt.figure(figsize=(8, 8))
-        labels = list(data.keys())
-        sizes = list(data.values())
-        
-        plt.pie(sizes, labels=labels, autopct='%1.1f%%')
-        plt.title('Skills Distribution')
-        
-        return self._fig_to_base64()
+    def _radar_chart(self, data: Dict) -> Tuple[str, Dict]:
+        return "radar", {
+            "labels": ["Match Score", "Skills Match", "Experience Relevance"],
+            "values": [
+                data["match_score"],
+                data["skills_match"]["match_percentage"],
+                data["experience_relevance"]["overall_relevance"]
+            ],
+            "size": (8, 8)
+        }
 
-    def _create_heatmap(self, data: List[List[float]], labels: List[str]) -> str:
-        plt.figure(figsize=(10, 8))
-        sns.heatmap(data, annot=True, xticklabels=labels, yticklabels=labels)
-        plt.title('Skills Correlation Matrix')
-        
-        return self._fig_to_base64()
-
-    def _fig_to_base64(self) -> str:
-        """Convert matplotlib figure to base64 string."""
-        buf = BytesIO()
-        plt.savefig(buf, format='png', bbox_inches='tight')
-        plt.close()
-        buf.seek(0)
-        return base64.b64encode(buf.getvalue()).decode('utf-8')
+    def _timeline_chart(self, data: Dict) -> Optional[Tuple[str, Dict]]:
+        if 'historical_scores' not in data:
+            return None
+        return "line", {
+            "x": [score['date'] for score in data['historical_scores']],
+            "y": [score['value'] for score in data['historical_scores']],
+            "title": "Analysis Timeline"
+        }
+
+    def _distribution_chart(self, data: Dict) -> Tuple[str, Dict]:
+        skills = data['skills_match']
+        return "pie", {
+            "labels": ["Matching", "Missing", "Extra"],
+            "values": [
+                len(skills['matching_skills']),
+                len(skills['missing_skills']),
+                len(skills['extra_skills'])
+            ],
+            "title": "Skills Distribution",
+            "size": (8, 8)
+        }
+
+    def _heatmap(self, data: Dict) -> Optional[Tuple[str, Dict]]:
+        correlation = data.get('skills_correlation')
+        if not correlation:
+            return None
+        return "heatmap", {
+            "matrix": correlation['matrix'],
+            "row_labels": correlation['labels'],
+            "col_labels": correlation['labels'],
+            "cmap": "viridis",
+            "fmt": ".2f",
+            "title": "Skills Correlation Matrix",
+            "size": (10, 8)
+        }
 
     def create_real_time_analysis(self, resume_content: str, job_description: str) -> Dict:
         """Generate real-time analysis updates."""
@@ -0,0 +1,253 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+import asyncio
+import functools
+import logging
+import multiprocessing
+import threading
+import time
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _timed_call(fn: Callable, args: Tuple, kwargs: Dict) -> Tuple[float, float, Any]:
+    """Run `fn` and report when it actually started and finished.
+
+    Wall-clock time is used because the call may run in another process.
+    """
+    started = time.time()
+    result = fn(*args, **kwargs)
+    return started, time.time(), result
+
+
+def _init_cpu_worker() -> None:
+    """Load the spaCy pipeline and skill taxonomy once per worker process."""
+    from .nlp_registry import nlp_registry
+    from .skill_taxonomy import skill_taxonomy
+
+    nlp_registry.warmup()
+    skill_taxonomy.reload()
+    if settings.REPORTS_WARMUP:
+        # Report exports run on this pool too
+        from .enhanced_analyzer import warmup
+
+        warmup()
+
+
+def _init_render_worker() -> None:
+    """Import matplotlib and build its font cache once per worker process."""
+    from .charts import warmup
+
+    warmup()
+
+
+def _ping() -> int:
+    # Sleep briefly so concurrent pings can't all be served by one worker
+    time.sleep(0.05)
+    return multiprocessing.current_process().pid
+
+
+class WorkerPool:
+    """An executor plus the queue-depth and wait-time bookkeeping behind its metrics.
+
+    The executor is created on first use, so importing this module never
+    starts threads or processes.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], Executor], max_workers: int):
+        self.name = name
+        self.max_workers = max_workers
+        self._factory = factory
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.in_flight = 0
+        self.max_queue_depth = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.run_seconds_total = 0.0
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = self._factory()
+        return self._executor
+
+    @property
+    def queue_depth(self) -> int:
+        """Calls waiting for a free worker."""
+        return max(self.in_flight - self.max_workers, 0)
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run `fn(*args, **kwargs)` on this pool without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        submitted = time.time()
+        self.submitted += 1
+        self.in_flight += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        try:
+            started, finished, result = await loop.run_in_executor(
+                self.executor, functools.partial(_timed_call, fn, args, kwargs)
+            )
+        except BaseException:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+
+        wait = max(started - submitted, 0.0)
+        self.completed += 1
+        self.wait_seconds_total += wait
+        self.wait_seconds_max = max(self.wait_seconds_max, wait)
+        self.run_seconds_total += finished - started
+        return result
+
+    def stats(self) -> Dict:
+        return {
+            "max_workers": self.max_workers,
+            "started": self._executor is not None,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "avg_wait_ms": round(self.wait_seconds_total / self.completed * 1000, 2) if self.completed else 0.0,
+            "max_wait_ms": round(self.wait_seconds_max * 1000, 2),
+            "avg_run_ms": round(self.run_seconds_total / self.completed * 1000, 2) if self.completed else 0.0
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
+
+
+class ExecutorLayer:
+    """Worker pools that keep blocking work off the event loop.
+
+    `io` is a thread pool for file handling. `cpu` is a process pool for
+    NLP, where each process loads the spaCy pipeline once in its
+    initializer; functions sent to it must be importable at module level
+    (see app.services.tasks). With `cpu_workers=0` NLP runs on a separate
+    thread pool instead, which avoids loading one model per process on
+    small machines. `pdf` is a lighter process pool, without a model, that
+    decodes PDF pages in parallel; with `pdf_workers=0` pages are decoded
+    on the io pool. `render` is a process pool for charts, which keeps
+    matplotlib's CPU time off the API process; with `render_workers=0`
+    charts are drawn on a thread pool of their own.
+    """
+
+    def __init__(
+        self,
+        io_workers: int = settings.EXECUTOR_IO_WORKERS,
+        cpu_workers: int = settings.EXECUTOR_CPU_WORKERS,
+        pdf_workers: int = settings.EXECUTOR_PDF_WORKERS,
+        render_workers: int = settings.EXECUTOR_RENDER_WORKERS
+    ):
+        self.io = WorkerPool(
+            "io",
+            lambda: ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="io"),
+            io_workers
+        )
+        if cpu_workers > 0:
+            # spawn, not fork: the parent has threads, and forking those is unsafe
+            self.cpu = WorkerPool(
+                "cpu",
+                lambda: ProcessPoolExecutor(
+                    max_workers=cpu_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_cpu_worker
+                ),
+                cpu_workers
+            )
+        else:
+            self.cpu = WorkerPool(
+                "cpu",
+                lambda: ThreadPoolExecutor(max_workers=1, thread_name_prefix="cpu"),
+                1
+            )
+        if pdf_workers > 0:
+            self.pdf = WorkerPool(
+                "pdf",
+                lambda: ProcessPoolExecutor(
+                    max_workers=pdf_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                ),
+                pdf_workers
+            )
+        else:
+            self.pdf = self.io
+        if render_workers > 0:
+            self.render = WorkerPool(
+                "render",
+                lambda: ProcessPoolExecutor(
+                    max_workers=render_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_render_worker
+                ),
+                render_workers
+            )
+        else:
+            self.render = WorkerPool(
+                "render",
+                lambda: ThreadPoolExecutor(max_workers=2, thread_name_prefix="render"),
+                2
+            )
+
+    async def run_io(self, fn: Callable, *args, **kwargs) -> Any:
+        return await self.io.run(fn, *args, **kwargs)
+
+    async def run_cpu(self, fn: Callable, *args, **kwargs) -> Any:
+        return await self.cpu.run(fn, *args, **kwargs)
+
+    async def run_pdf(self, fn: Callable, *args, **kwargs) -> Any:
+        return await self.pdf.run(fn, *args, **kwargs)
+
+    async def run_render(self, fn: Callable, *args, **kwargs) -> Any:
+        return await self.render.run(fn, *args, **kwargs)
+
+    async def start(self) -> None:
+        """Start every worker now so the first requests don't pay for it."""
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        # Bypass `run` so process start-up doesn't count towards wait times
+        pids = await asyncio.gather(*(
+            loop.run_in_executor(self.cpu.executor, _ping) for _ in range(self.cpu.max_workers)
+        ))
+        logger.info(
+            "Started %d cpu worker(s) in %.2fs", len(set(pids)), time.perf_counter() - start
+        )
+
+    def stats(self) -> Dict[str, Dict]:
+        return {
+            "io": self.io.stats(),
+            "cpu": self.cpu.stats(),
+            "pdf": self.pdf.stats(),
+            "render": self.render.stats()
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self.io.shutdown(wait)
+        self.cpu.shutdown(wait)
+        self.pdf.shutdown(wait)
+        self.render.shutdown(wait)
+
+
+executor = ExecutorLayer()
+
+
+async def run_io(fn: Callable, *args, **kwargs) -> Any:
+    """Shortcut for `executor.run_io`."""
+    return await executor.run_io(fn, *args, **kwargs)
+
+
+async def run_cpu(fn: Callable, *args, **kwargs) -> Any:
+    """Shortcut for `executor.run_cpu`."""
+    return await executor.run_cpu(fn, *args, **kwargs)
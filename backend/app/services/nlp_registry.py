@@ -0,0 +1,175 @@
+from typing import Dict, Iterable, Iterator, Optional, Sequence, Tuple
+import logging
+import os
+import resource
+import threading
+import time
+import spacy
+from spacy.language import Language
+from spacy.tokens import Doc
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Named pipeline profiles: the components each kind of task actually needs.
+# Anything else in the loaded pipeline is disabled for that call. Vectors
+# come from the vocab, so similarity work needs no components at all.
+PROFILES: Dict[str, Optional[Tuple[str, ...]]] = {
+    "full": None,
+    "tokenize": (),
+    "pos": ("tok2vec", "tagger", "attribute_ruler"),
+    "vectors": ()
+}
+
+
+def _current_rss_bytes() -> int:
+    """Return the resident set size of this process in bytes."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # ru_maxrss is a peak value (KB on Linux), but it's the best we have elsewhere
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class PipelineView:
+    """A shared spaCy pipeline with a fixed set of components disabled.
+
+    Views never copy the underlying model, so asking for several variants
+    of the same pipeline costs nothing beyond the first load.
+    """
+
+    def __init__(self, nlp: Language, disable: Tuple[str, ...] = ()):
+        self._nlp = nlp
+        self.disable = tuple(name for name in disable if name in nlp.pipe_names)
+        self._pipe_names = [name for name in nlp.pipe_names if name not in self.disable]
+
+    @property
+    def vocab(self):
+        return self._nlp.vocab
+
+    @property
+    def meta(self) -> Dict:
+        return self._nlp.meta
+
+    @property
+    def pipe_names(self) -> Sequence[str]:
+        return self._pipe_names
+
+    @property
+    def language(self) -> Language:
+        return self._nlp
+
+    def make_doc(self, text: str) -> Doc:
+        return self._nlp.make_doc(text)
+
+    def __call__(self, text: str) -> Doc:
+        return self._nlp(text, disable=self.disable)
+
+    def pipe(
+        self,
+        texts: Iterable[str],
+        batch_size: int = 1000,
+        n_process: int = 1
+    ) -> Iterator[Doc]:
+        return self._nlp.pipe(
+            texts, batch_size=batch_size, n_process=n_process, disable=self.disable
+        )
+
+
+class NLPRegistry:
+    """Process-wide registry that loads each spaCy pipeline once."""
+
+    def __init__(self, default_model: str = settings.SPACY_MODEL):
+        self.default_model = default_model
+        self._models: Dict[str, Language] = {}
+        self._stats: Dict[str, Dict] = {}
+        self._views: Dict[Tuple, PipelineView] = {}
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        model: Optional[str] = None,
+        disable: Sequence[str] = (),
+        profile: Optional[str] = None
+    ) -> PipelineView:
+        """Return a view of `model`, loading it on first use.
+
+        `profile` names an entry of PROFILES; its unused components are
+        disabled on top of anything listed in `disable`.
+        """
+        key = (model or self.default_model, tuple(disable), profile)
+        view = self._views.get(key)
+        if view is not None:
+            return view
+
+        nlp = self._load(key[0])
+        disable = key[1]
+        if profile is not None:
+            if profile not in PROFILES:
+                raise ValueError(f"Unknown pipeline profile: {profile}")
+            keep = PROFILES[profile]
+            if keep is not None:
+                disable += tuple(name for name in nlp.pipe_names if name not in keep)
+        # Views are immutable, so one per combination can be shared by every caller
+        view = self._views[key] = PipelineView(nlp, disable)
+        return view
+
+    def warmup(self, models: Optional[Sequence[str]] = None) -> Dict[str, Dict]:
+        """Eagerly load pipelines so the first request doesn't pay for it."""
+        for model in models or [self.default_model]:
+            self._load(model)
+        return self.stats()
+
+    def is_loaded(self, model: Optional[str] = None) -> bool:
+        return (model or self.default_model) in self._models
+
+    def stats(self) -> Dict[str, Dict]:
+        """Load time and memory cost of every pipeline loaded in this process."""
+        return {
+            "models": {name: dict(info) for name, info in self._stats.items()},
+            "process_rss_bytes": _current_rss_bytes()
+        }
+
+    def _load(self, model: str) -> Language:
+        nlp = self._models.get(model)
+        if nlp is not None:
+            return nlp
+
+        with self._lock:
+            # Another thread may have finished loading while we waited
+            nlp = self._models.get(model)
+            if nlp is not None:
+                return nlp
+
+            rss_before = _current_rss_bytes()
+            start = time.perf_counter()
+            nlp = spacy.load(model)
+            load_seconds = time.perf_counter() - start
+            rss_delta = max(_current_rss_bytes() - rss_before, 0)
+
+            self._stats[model] = {
+                "version": nlp.meta.get("version"),
+                "pipeline": list(nlp.pipe_names),
+                "load_seconds": round(load_seconds, 3),
+                "rss_delta_bytes": rss_delta,
+                "pid": os.getpid()
+            }
+            self._models[model] = nlp
+            logger.info(
+                "Loaded spaCy model %s in %.2fs (+%.1f MB RSS)",
+                model, load_seconds, rss_delta / (1024 * 1024)
+            )
+            return nlp
+
+
+nlp_registry = NLPRegistry()
+
+
+def get_nlp(
+    model: Optional[str] = None,
+    disable: Sequence[str] = (),
+    profile: Optional[str] = None
+) -> PipelineView:
+    """Shortcut for `nlp_registry.get`."""
+    return nlp_registry.get(model, disable, profile)
@@ -0,0 +1,319 @@
+"""Relay of websocket messages between API worker processes.
+
+Each worker's ConnectionManager only knows its own sockets. It delivers
+to them directly and also hands every message to a PubSub, which gets
+it to the managers of the other workers:
+
+- `InProcessPubSub` connects managers within one process; with one
+  worker per process it has nothing to do.
+- `BrokerPubSub` connects processes on one host through a Unix socket.
+  Whichever worker takes the lock file next to the socket serves it and
+  relays between the others; when it exits, another takes over. Run
+  `python -m app.services.pubsub` to keep a broker outside the workers.
+
+Messages are (topic, key, text, retain) tuples, batched per flush
+interval and coalesced by (topic, key), so a burst of progress updates
+for one analysis crosses processes once.
+"""
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Set, Tuple
+import asyncio
+import json
+import logging
+import os
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+Deliver = Callable[[str, str, str, bool], None]
+
+# Longest batch line a peer accepts
+MAX_LINE_BYTES = 16 * 1024 * 1024
+
+
+class PubSub(ABC):
+    """Batches published messages and sends them to other processes.
+
+    Messages wait up to `flush_seconds`, or until `max_batch` are
+    pending, keyed by (topic, key): a newer message replaces an unsent
+    one. Received batches are handed to the `deliver` callback given to
+    `start`. Subclasses implement `_send`, the transport of one batch.
+    """
+
+    def __init__(
+        self,
+        flush_seconds: float = settings.PUBSUB_FLUSH_MS / 1000,
+        max_batch: int = settings.PUBSUB_MAX_BATCH
+    ):
+        self.flush_seconds = flush_seconds
+        self.max_batch = max_batch
+        self._pending: "OrderedDict[Tuple[str, str], Tuple[str, bool]]" = OrderedDict()
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._deliver: Optional[Deliver] = None
+        self.published = 0
+        self.coalesced = 0
+        self.batches = 0
+        self.received = 0
+
+    async def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+
+    async def stop(self) -> None:
+        self.flush()
+        self._deliver = None
+
+    def publish(self, topic: str, key: str, text: str, retain: bool = False) -> None:
+        if not self._active():
+            return
+        self.published += 1
+        if (topic, key) in self._pending:
+            self.coalesced += 1
+        self._pending[(topic, key)] = (text, retain)
+        if len(self._pending) >= self.max_batch:
+            self.flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.flush_seconds, self.flush)
+
+    def flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+        batch = [[topic, key, text, retain] for (topic, key), (text, retain) in self._pending.items()]
+        self._pending = OrderedDict()
+        self.batches += 1
+        self._send(batch)
+
+    def stats(self) -> Dict:
+        return {
+            "backend": type(self).__name__,
+            "published": self.published,
+            "coalesced": self.coalesced,
+            "batches": self.batches,
+            "received": self.received
+        }
+
+    def _active(self) -> bool:
+        return self._deliver is not None
+
+    @abstractmethod
+    def _send(self, batch: List[List]) -> None:
+        """Send a batch of [topic, key, text, retain] messages to the other processes."""
+
+    def _receive(self, batch: List[List]) -> None:
+        if self._deliver is None:
+            return
+        self.received += len(batch)
+        for topic, key, text, retain in batch:
+            self._deliver(topic, key, text, retain)
+
+
+class InProcessPubSub(PubSub):
+    """Relays between the started instances sharing `peers`, in one process."""
+
+    _default_peers: Set["InProcessPubSub"] = set()
+
+    def __init__(self, peers: Optional[Set["InProcessPubSub"]] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.peers = self._default_peers if peers is None else peers
+
+    async def start(self, deliver: Deliver) -> None:
+        await super().start(deliver)
+        self.peers.add(self)
+
+    async def stop(self) -> None:
+        await super().stop()
+        self.peers.discard(self)
+
+    def _active(self) -> bool:
+        return self._deliver is not None and len(self.peers) > 1
+
+    def _send(self, batch: List[List]) -> None:
+        for peer in list(self.peers):
+            if peer is not self:
+                peer._receive(batch)
+
+
+class BrokerPubSub(PubSub):
+    """Relays between processes through a Unix socket at `path`.
+
+    The instance holding `<path>.lock` listens on the socket, delivers
+    what its peers send and forwards it to the others; everyone else
+    connects to it, reconnecting every `retry_seconds` and taking over
+    the lock when the broker is gone. Batches that find no connection,
+    and peers whose unsent output exceeds `peer_buffer_bytes`, are
+    dropped: progress updates are superseded soon anyway.
+    """
+
+    def __init__(
+        self,
+        path: str = settings.PUBSUB_SOCKET,
+        retry_seconds: float = 0.5,
+        peer_buffer_bytes: int = settings.PUBSUB_PEER_BUFFER_BYTES,
+        **kwargs
+    ):
+        super().__init__(**kwargs)
+        self.path = path
+        self.retry_seconds = retry_seconds
+        self.peer_buffer_bytes = peer_buffer_bytes
+        self.role = "starting"
+        self._lock_fd: Optional[int] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._peers: Set[asyncio.StreamWriter] = set()
+        self._ready: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.lost = 0
+
+    async def start(self, deliver: Deliver, timeout: float = 2.0) -> None:
+        await super().start(deliver)
+        self._ready = asyncio.Event()
+        self._task = asyncio.ensure_future(self._run())
+        try:
+            # Messages published before a connection exists would be lost
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("No pub/sub broker at %s yet; retrying in the background", self.path)
+
+    async def stop(self) -> None:
+        await super().stop()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._close()
+
+    def stats(self) -> Dict:
+        return {**super().stats(), "role": self.role, "peers": len(self._peers), "lost": self.lost}
+
+    def _send(self, batch: List[List]) -> None:
+        line = (json.dumps(batch) + "\n").encode("utf-8")
+        if self.role == "broker":
+            self._forward(line, None)
+        elif self._writer is not None and not self._writer.is_closing():
+            self._writer.write(line)
+        else:
+            self.lost += len(batch)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if self._try_lock():
+                    await self._serve()
+                else:
+                    await self._connect()
+            except asyncio.CancelledError:
+                raise
+            except (OSError, ValueError) as e:
+                logger.debug("Pub/sub connection to %s failed: %s", self.path, e)
+            self._close_client()
+            self.role = "disconnected"
+            await asyncio.sleep(self.retry_seconds)
+
+    def _try_lock(self) -> bool:
+        import fcntl
+
+        if self._lock_fd is None:
+            self._lock_fd = os.open(self.path + ".lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            return False
+
+    async def _serve(self) -> None:
+        # Holding the lock means any socket file left behind is stale
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(self._serve_peer, self.path, limit=MAX_LINE_BYTES)
+        self.role = "broker"
+        self._ready.set()
+        logger.info("Serving pub/sub broker at %s", self.path)
+        await self._server.serve_forever()
+
+    async def _serve_peer(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._peers.add(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                self._receive(json.loads(line))
+                self._forward(line, writer)
+        except (OSError, ValueError) as e:
+            logger.debug("Dropping pub/sub peer: %s", e)
+        except asyncio.CancelledError:
+            # The broker is stopping; asyncio logs handlers that end cancelled
+            pass
+        finally:
+            self._peers.discard(writer)
+            writer.close()
+
+    def _forward(self, line: bytes, source: Optional[asyncio.StreamWriter]) -> None:
+        for peer in list(self._peers):
+            if peer is source:
+                continue
+            if peer.transport.get_write_buffer_size() > self.peer_buffer_bytes:
+                # Not reading; it reconnects and resumes from new messages
+                logger.warning("Dropping a pub/sub peer that stopped reading")
+                self._peers.discard(peer)
+                peer.close()
+                continue
+            peer.write(line)
+
+    async def _connect(self) -> None:
+        reader, self._writer = await asyncio.open_unix_connection(self.path, limit=MAX_LINE_BYTES)
+        self.role = "client"
+        self._ready.set()
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            self._receive(json.loads(line))
+
+    def _close_client(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def _close(self) -> None:
+        self._close_client()
+        for peer in list(self._peers):
+            peer.close()
+        self._peers.clear()
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+        if self._lock_fd is not None:
+            # Closing releases the lock for the next broker
+            os.close(self._lock_fd)
+            self._lock_fd = None
+        self.role = "stopped"
+
+
+def create_pubsub(backend: str = settings.PUBSUB_BACKEND) -> PubSub:
+    if backend == "inprocess":
+        return InProcessPubSub()
+    if backend == "broker":
+        return BrokerPubSub()
+    raise ValueError(f"Unknown pub/sub backend: {backend}")
+
+
+async def _run_broker() -> None:
+    broker = BrokerPubSub()
+    await broker.start(lambda topic, key, text, retain: None)
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_run_broker())
@@ -0,0 +1,198 @@
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from ..config import settings
+from ..database import SessionLocal
+from ..api import models
+from .charts import CHART_VERSION
+from .executor import executor, run_cpu, run_io
+
+logger = logging.getLogger(__name__)
+
+# Bump when the PDF layout in EnhancedAnalyzer._export_pdf changes, so
+# stored reports are rendered again instead of served stale
+REPORT_VERSION = 1
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def render_report_file(analysis_data: Dict, path: str) -> int:
+    """Render an analysis's PDF report to `path` and return its size.
+
+    Runs in a CPU worker, which writes the file itself so the PDF never
+    has to be sent back to the API process.
+    """
+    from .enhanced_analyzer import EnhancedAnalyzer
+
+    data = EnhancedAnalyzer().export_report(analysis_data, "pdf").getvalue()
+    _write_atomic(path, data)
+    return len(data)
+
+
+def merge_report_files(parts: Sequence[Tuple[str, str]], path: str) -> int:
+    """Concatenate (path, bookmark title) PDFs into one at `path`; returns its size."""
+    from io import BytesIO
+    from PyPDF2 import PdfWriter
+
+    writer = PdfWriter()
+    for part, title in parts:
+        writer.append(part, outline_item=title, import_outline=False)
+    output = BytesIO()
+    writer.write(output)
+    _write_atomic(path, output.getvalue())
+    return output.tell()
+
+
+def _mtime(path: str) -> float:
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return 0.0
+
+
+def _load_analysis(analysis_id: int) -> Optional[Dict]:
+    db = SessionLocal()
+    try:
+        analysis = db.query(models.ResumeAnalysis).filter(models.ResumeAnalysis.id == analysis_id).first()
+        if analysis is None or analysis.status != "completed" or not analysis.result:
+            return None
+        return json.loads(analysis.result)
+    finally:
+        db.close()
+
+
+class ReportArtifactStore:
+    """Rendered PDF reports, stored on disk and rendered once per version.
+
+    A completed analysis never changes, so its report is kept at
+    `<root>/<analysis id>/report-v<report version>-c<chart version>.pdf`
+    and served from there. Files of older versions are removed when the
+    new one is written. Renders run on the CPU pool; concurrent requests
+    for the same report share one render. Combined reports of several
+    analyses are merged from the single ones and kept under
+    `<root>/combined`, newest `combined_keep` only.
+    """
+
+    def __init__(self, root: str = settings.REPORT_DIR, combined_keep: int = settings.REPORT_COMBINED_KEEP):
+        self.root = root
+        self.combined_keep = combined_keep
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._background: Set[asyncio.Task] = set()
+        self.hits = 0
+        self.renders = 0
+
+    def path(self, analysis_id: int) -> str:
+        return os.path.join(
+            self.root, str(analysis_id), f"report-v{REPORT_VERSION}-c{CHART_VERSION}.pdf"
+        )
+
+    async def ensure(self, analysis_id: int, analysis_data: Dict) -> str:
+        """Path of the analysis's PDF report, rendering it first if needed."""
+        path = self.path(analysis_id)
+        if await run_io(os.path.exists, path):
+            self.hits += 1
+            return path
+        await self._once(path, self._render, analysis_data, path)
+        return path
+
+    async def ensure_combined(self, analyses: Sequence[Tuple[int, str, Dict]]) -> str:
+        """Path of one PDF with the reports of (id, title, data) analyses in order."""
+        ids = [analysis_id for analysis_id, _, _ in analyses]
+        key = hashlib.sha256(
+            json.dumps([REPORT_VERSION, CHART_VERSION, ids]).encode("utf-8")
+        ).hexdigest()
+        path = os.path.join(self.root, "combined", f"{key}.pdf")
+        if await run_io(os.path.exists, path):
+            self.hits += 1
+            return path
+
+        parts = await asyncio.gather(*(self.ensure(a_id, data) for a_id, _, data in analyses))
+        titles = [title for _, title, _ in analyses]
+        await self._once(path, self._merge, list(zip(parts, titles)), path)
+        return path
+
+    def schedule(self, analysis_id: int) -> None:
+        """Render a newly completed analysis's report in the background."""
+        task = asyncio.ensure_future(self._render_completed(analysis_id))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "renders": self.renders, "rendering": len(self._in_flight)}
+
+    async def _render_completed(self, analysis_id: int) -> None:
+        try:
+            analysis_data = await run_io(_load_analysis, analysis_id)
+            if analysis_data is not None:
+                await self.ensure(analysis_id, analysis_data)
+        except Exception:
+            # It is rendered again on first download
+            logger.exception("Could not pre-render the report of analysis %d", analysis_id)
+
+    async def _once(self, key: str, fn, *args) -> None:
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            await fn(*args)
+            future.set_result(None)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Nobody may be waiting on it; don't log "exception never retrieved"
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+
+    async def _render(self, analysis_data: Dict, path: str) -> None:
+        await run_cpu(render_report_file, analysis_data, path)
+        self.renders += 1
+        await run_io(self._remove_stale, os.path.dirname(path), os.path.basename(path))
+
+    async def _merge(self, parts: List[Tuple[str, str]], path: str) -> None:
+        await executor.run_pdf(merge_report_files, parts, path)
+        self.renders += 1
+        await run_io(self._prune_combined, os.path.dirname(path))
+
+    @staticmethod
+    def _remove_stale(directory: str, keep: str) -> None:
+        for name in os.listdir(directory):
+            if name != keep and name.endswith(".pdf"):
+                try:
+                    os.remove(os.path.join(directory, name))
+                except OSError:
+                    pass
+
+    def _prune_combined(self, directory: str) -> None:
+        paths = [os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".pdf")]
+        if len(paths) <= self.combined_keep:
+            return
+        paths.sort(key=_mtime, reverse=True)
+        for path in paths[self.combined_keep:]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+report_artifacts = ReportArtifactStore()
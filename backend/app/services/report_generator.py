@@ -1,11 +1,5 @@
-from typing import Dict, List
-import json
+from typing import Callable, Dict, Optional, Tuple
 from datetime import datetime
-import matplotlib.pyplot as plt
-import io
-import base64
-import seaborn as sns
-import pandas as pd
 
 class ResumeReportGenerator:
     def __init__(self):
@@ -15,68 +9,67 @@ class ResumeReportGenerator:
             "comparison": self._generate_comparison_report
         }
 
-    def generate_report(self, analysis_data: Dict, report_type: str = "detailed") -> Dict:
-        """Generate a report based on analysis data."""
+    def generate_report(
+        self,
+        analysis_data: Dict,
+        report_type: str = "detailed",
+        chart_url: Optional[Callable[[str], str]] = None
+    ) -> Dict:
+        """Generate a report based on analysis data.
+
+        Charts are referenced rather than embedded: `chart_url` maps a chart
+        name to the URL it is served from, and defaults to the bare name.
+        """
         if report_type not in self.report_types:
             raise ValueError(f"Unknown report type: {report_type}")
             
-        return self.report_types[report_type](analysis_data)
+        return self.report_types[report_type](analysis_data, chart_url or (lambda name: name))
 
-    def _generate_charts(self, analysis_data: Dict) -> Dict[str, str]:
-        """Generate visualization charts."""
-        charts = {}
-        
-        # Skills Match Chart
-        plt.figure(figsize=(10, 6))
-        skills_data = {
-            'Matching': len(analysis_data['skills_match']['matching_skills']),
-            'Missing': len(analysis_data['skills_match']['missing_skills']),
-            'Extra': len(analysis_data['skills_match']['extra_skills'])
+    def chart_specs(self, analysis_data: Dict) -> Dict[str, Tuple[str, Dict]]:
+        """Kind and inputs of each chart the analysis has data for."""
+        skills_match = analysis_data['skills_match']
+        specs = {
+            'skills_chart': ("pie", {
+                "labels": ["Matching", "Missing", "Extra"],
+                "values": [
+                    len(skills_match['matching_skills']),
+                    len(skills_match['missing_skills']),
+                    len(skills_match['extra_skills'])
+                ],
+                "title": "Skills Distribution"
+            })
         }
-        plt.pie(skills_data.values(), labels=skills_data.keys(), autopct='%1.1f%%')
-        plt.title('Skills Distribution')
-        charts['skills_chart'] = self._fig_to_base64()
 
         # Match Score Timeline
         if 'historical_scores' in analysis_data:
-            plt.figure(figsize=(10, 6))
-            dates = [score['date'] for score in analysis_data['historical_scores']]
-            scores = [score['value'] for score in analysis_data['historical_scores']]
-            plt.plot(dates, scores, marker='o')
-            plt.title('Match Score Timeline')
-            plt.xticks(rotation=45)
-            plt.ylabel('Match Score (%)')
-            charts['timeline_chart'] = self._fig_to_base64()
+            specs['timeline_chart'] = ("line", {
+                "x": [score['date'] for score in analysis_data['historical_scores']],
+                "y": [score['value'] for score in analysis_data['historical_scores']],
+                "title": "Match Score Timeline",
+                "ylabel": "Match Score (%)"
+            })
 
         # Experience Relevance Heatmap
         if 'experience_relevance' in analysis_data:
-            plt.figure(figsize=(8, 6))
-            relevance_data = {
-                'Overall Relevance': analysis_data['experience_relevance']['overall_relevance'],
-                'Recent Experience': 90 if analysis_data['experience_relevance']['has_recent_relevant_experience'] else 30
-            }
-            sns.heatmap(
-                pd.DataFrame([relevance_data]).T,
-                annot=True,
-                cmap='RdYlGn',
-                fmt='.0f'
-            )
-            plt.title('Experience Relevance Analysis')
-            charts['relevance_chart'] = self._fig_to_base64()
-
-        return charts
+            relevance = analysis_data['experience_relevance']
+            specs['relevance_chart'] = ("heatmap", {
+                "matrix": [
+                    [relevance['overall_relevance']],
+                    [90 if relevance['has_recent_relevant_experience'] else 30]
+                ],
+                "row_labels": ["Overall Relevance", "Recent Experience"],
+                "col_labels": [""],
+                "cmap": "RdYlGn",
+                "fmt": ".0f",
+                "title": "Experience Relevance Analysis",
+                "size": (8, 6)
+            })
 
-    def _fig_to_base64(self) -> str:
-        """Convert matplotlib figure to base64 string."""
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png', bbox_inches='tight')
-        plt.close()
-        buf.seek(0)
-        return base64.b64encode(buf.getvalue()).decode('utf-8')
+        return specs
 
-    def _generate_detailed_report(self, analysis_data: Dict) -> Dict:
-        """Generate a detailed report with visualizations."""
-        charts = self._generate_charts(analysis_data)
+    def _generate_detailed_report(self, analysis_data: Dict, chart_url: Callable[[str], str]) -> Dict:
+        """Generate a detailed report with links to its visualizations."""
+        charts = {name: chart_url(name) for name in self.chart_specs(analysis_data)}
         
         return {
             "report_type": "detailed",
@@ -99,7 +92,7 @@ class ResumeReportGenerator:
             "visualizations": charts
         }
 
-    def _generate_simple_report(self, analysis_data: Dict) -> Dict:
+    def _generate_simple_report(self, analysis_data: Dict, chart_url: Callable[[str], str]) -> Dict:
         """Generate a simple summary report."""
         return {
             "report_type": "simple",
@@ -109,7 +102,7 @@ class ResumeReportGenerator:
             "key_suggestions": analysis_data["improvement_suggestions"][:3]
         }
 
-    def _generate_comparison_report(self, analysis_data: Dict) -> Dict:
+    def _generate_comparison_report(self, analysis_data: Dict, chart_url: Callable[[str], str]) -> Dict:
         """Generate a comparison report against similar job descriptions."""
         # Implement comparison logic here
         pass
\ No newline at end of file
@@ -1,13 +1,20 @@
-from typing import Dict, List, Optional
-import spacy
-from collections import Counter
+from typing import Callable, Dict, List, Optional
 from datetime import datetime
 import re
+from spacy.tokens import Doc
+from .doc_cache import doc_cache
+from .nlp_registry import get_nlp
+from .skill_taxonomy import skill_taxonomy
+
+ProgressCallback = Callable[[int, str], None]
+
+
+class AnalysisCancelled(Exception):
+    """Raised by a progress callback to stop an analysis at the next stage."""
+
 
 class ResumeAnalyzer:
     def __init__(self):
-        self.nlp = spacy.load("en_core_web_lg")
-        
         # Define common job titles and their variations
         self.job_titles = {
             "software_engineer": [
@@ -28,25 +35,51 @@ class ResumeAnalyzer:
             "senior": ["senior", "lead", "principal", "architect", "manager"]
         }
 
-    def analyze_resume_for_job(self, resume_text: str, job_description: str) -> Dict:
-        """Comprehensive resume analysis for a specific job."""
+    @property
+    def nlp(self):
+        """Shared pipeline from the process-wide registry, loaded on first use.
+
+        Skills are matched on token text and similarity comes from vectors,
+        so no pipeline component needs to run.
+        """
+        return get_nlp(profile="vectors")
+
+    def analyze_resume_for_job(
+        self,
+        resume_text: str,
+        job_description: str,
+        progress: Optional[ProgressCallback] = None
+    ) -> Dict:
+        """Comprehensive resume analysis for a specific job.
+
+        `progress(percent, message)` is called as each stage completes; it
+        may raise AnalysisCancelled to abandon the analysis.
+        """
+        report = progress or (lambda percent, message: None)
         try:
-            resume_doc = self.nlp(resume_text)
-            job_doc = self.nlp(job_description)
+            report(0, "Starting analysis")
+            
+            # Parse each text exactly once; every stage below works off these Docs
+            resume_doc = doc_cache.parse(self.nlp, resume_text)
+            job_doc = doc_cache.parse(self.nlp, job_description)
+            report(20, "Parsed resume and job description")
             
             # Basic similarity score
             similarity_score = resume_doc.similarity(job_doc)
             
             # Analyze experience level
-            experience_level = self._determine_experience_level(resume_text)
+            experience_level = self._determine_experience_level(resume_doc.text)
+            report(35, "Determined experience level")
             
             # Extract and match skills
-            skills_analysis = self._analyze_skills(resume_text, job_description)
+            skills_analysis = self._analyze_skills(resume_doc, job_doc)
+            report(60, "Matched skills")
             
             # Analyze work experience relevance
             experience_analysis = self._analyze_experience_relevance(
-                resume_text, job_description
+                resume_doc, job_doc
             )
+            report(80, "Evaluated experience relevance")
             
             # Generate improvement suggestions
             suggestions = self._generate_suggestions(
@@ -54,6 +87,7 @@ class ResumeAnalyzer:
                 experience_analysis,
                 similarity_score
             )
+            report(95, "Generated suggestions")
             
             return {
                 "match_score": round(similarity_score * 100, 2),
@@ -64,6 +98,8 @@ class ResumeAnalyzer:
                 "analysis_timestamp": datetime.now().isoformat()
             }
         
+        except AnalysisCancelled:
+            raise
         except Exception as e:
             raise Exception(f"Error analyzing resume: {str(e)}")
 
@@ -90,11 +126,11 @@ class ResumeAnalyzer:
         else:
             return "entry"
 
-    def _analyze_skills(self, resume_text: str, job_description: str) -> Dict:
+    def _analyze_skills(self, resume_doc: Doc, job_doc: Doc) -> Dict:
         """Analyze skills match between resume and job description."""
         # Extract skills from both texts
-        resume_skills = self._extract_skills(resume_text)
-        job_skills = self._extract_skills(job_description)
+        resume_skills = self._extract_skills(resume_doc)
+        job_skills = self._extract_skills(job_doc)
         
         # Calculate matches and gaps
         matching_skills = set(resume_skills) & set(job_skills)
@@ -111,20 +147,18 @@ class ResumeAnalyzer:
             "match_percentage": round(match_percentage, 2)
         }
 
-    def _analyze_experience_relevance(self, resume_text: str, job_description: str) -> Dict:
+    def _analyze_experience_relevance(self, resume_doc: Doc, job_doc: Doc) -> Dict:
         """Analyze how relevant the work experience is to the job."""
-        resume_doc = self.nlp(resume_text)
-        job_doc = self.nlp(job_description)
-        
-        # Extract work experience sections
+        # Extract work experience sections as spans of the already parsed resume
         experience_pattern = r'(?:EXPERIENCE|WORK EXPERIENCE|EMPLOYMENT).*?(?=\n\n[A-Z]|$)'
-        experience_matches = re.findall(experience_pattern, resume_text, re.DOTALL | re.I)
+        experience_spans = [
+            resume_doc.char_span(match.start(), match.end(), alignment_mode="expand")
+            for match in re.finditer(experience_pattern, resume_doc.text, re.DOTALL | re.I)
+        ]
         
-        relevance_scores = []
-        if experience_matches:
-            for exp in experience_matches:
-                exp_doc = self.nlp(exp)
-                relevance_scores.append(exp_doc.similarity(job_doc))
+        relevance_scores = [
+            span.similarity(job_doc) for span in experience_spans if span is not None
+        ]
         
         avg_relevance = sum(relevance_scores) / len(relevance_scores) if relevance_scores else 0
         
@@ -163,24 +197,6 @@ class ResumeAnalyzer:
         
         return suggestions
 
-    def _extract_skills(self, text: str) -> List[str]:
-        """Extract technical and professional skills from text."""
-        doc = self.nlp(text)
-        
-        # Extract potential skills (nouns and proper nouns)
-        potential_skills = [
-            token.text.lower() for token in doc 
-            if (token.pos_ in ['NOUN', 'PROPN'] and len(token.text) > 2)
-        ]
-        
-        # Count skill occurrences
-        skill_counts = Counter(potential_skills)
-        
-        # Filter common words and return significant skills
-        common_words = set(['experience', 'year', 'work', 'team', 'project'])
-        skills = [
-            skill for skill, count in skill_counts.items()
-            if skill not in common_words and count >= 1
-        ]
-        
-        return skills
\ No newline at end of file
+    def _extract_skills(self, doc: Doc) -> List[str]:
+        """Extract technical and professional skills from a parsed text."""
+        return skill_taxonomy.skills(doc)
\ No newline at end of file
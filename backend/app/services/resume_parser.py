@@ -1,8 +1,13 @@
-import spacy
 import re
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
 from pydantic import BaseModel
+from spacy.tokens import Doc
+from .doc_cache import doc_cache
+from .nlp_registry import get_nlp
+from .sections import SECTION_HEADERS, SectionIndexer, SectionSpan, section_detector, section_text
+from .text_extraction import ACCURATE_ENGINE, iter_text_chunks
+from .skill_taxonomy import skill_taxonomy
 
 class Education(BaseModel):
     degree: str
@@ -27,109 +32,46 @@ class ResumeSection(BaseModel):
 
 class ResumeParser:
     def __init__(self):
-        self.nlp = spacy.load("en_core_web_lg")
-        
-        # Common section headers
-        self.section_headers = {
-            'education': ['education', 'academic background', 'academic history', 'academic qualification'],
-            'experience': ['experience', 'work experience', 'employment history', 'work history', 'professional experience'],
-            'skills': ['skills', 'technical skills', 'core competencies', 'competencies'],
-            'projects': ['projects', 'personal projects', 'professional projects'],
-            'contact': ['contact', 'contact information', 'personal information']
-        }
-        
-        # Common skill keywords
-        self.technical_skills = set([
-            'python', 'java', 'javascript', 'react', 'node', 'sql', 'aws', 'docker',
-            'kubernetes', 'machine learning', 'ai', 'data science', 'devops', 'cloud',
-            'git', 'agile', 'scrum', 'ci/cd', 'rest api', 'microservices'
-        ])
+        self.section_headers = SECTION_HEADERS
+        self.section_detector = section_detector
 
     def extract_text(self, file_content: bytes, file_type: str) -> str:
         """Extract text based on file type with improved formatting preservation."""
         try:
-            if file_type == 'pdf':
-                return self._extract_from_pdf(file_content)
-            elif file_type == 'docx':
-                return self._extract_from_docx(file_content)
-            else:
-                raise ValueError(f"Unsupported file type: {file_type}")
+            return "".join(self._iter_text(file_content, file_type))
         except Exception as e:
             raise Exception(f"Error extracting text: {str(e)}")
 
-    def _extract_from_pdf(self, content: bytes) -> str:
-        import pdfplumber  # Better text extraction than PyPDF2
-        
-        text_content = []
-        with pdfplumber.open(BytesIO(content)) as pdf:
-            for page in pdf.pages:
-                text_content.append(page.extract_text(x_tolerance=3))
-        
-        return "\n".join(text_content)
+    def extract_sections(self, file_content: bytes, file_type: str) -> Tuple[str, Dict[str, SectionSpan]]:
+        """Extract text and its section index, detecting sections page by page as the file is decoded."""
+        indexer = SectionIndexer(self.section_detector)
+        try:
+            for chunk in self._iter_text(file_content, file_type):
+                indexer.feed(chunk)
+        except Exception as e:
+            raise Exception(f"Error extracting text: {str(e)}")
+        return indexer.close()
 
-    def _extract_from_docx(self, content: bytes) -> str:
-        from docx import Document
-        
-        doc = Document(BytesIO(content))
-        full_text = []
-        
-        for para in doc.paragraphs:
-            full_text.append(para.text)
-            
-        # Extract tables
-        for table in doc.tables:
-            for row in table.rows:
-                row_text = []
-                for cell in row.cells:
-                    row_text.append(cell.text)
-                full_text.append(" | ".join(row_text))
-        
-        return "\n".join(full_text)
+    def _iter_text(self, content: bytes, file_type: str) -> Iterator[str]:
+        # pdfplumber keeps layout better than PyPDF2; pages stream up to the configured caps
+        return iter_text_chunks(content, f"resume.{file_type}", engine=ACCURATE_ENGINE)
 
-    def parse_sections(self, text: str) -> ResumeSection:
-        """Parse resume into structured sections."""
-        doc = self.nlp(text)
-        sections = self._identify_sections(text)
+    def parse_sections(self, text: str, sections: Optional[Dict[str, SectionSpan]] = None) -> ResumeSection:
+        """Parse resume into structured sections, reusing `sections` from `extract_sections` if given."""
+        if sections is None:
+            sections = self._identify_sections(text)
         
         return ResumeSection(
-            education=self._parse_education(sections.get('education', '')),
-            work_experience=self._parse_experience(sections.get('experience', '')),
-            skills=self._parse_skills(sections.get('skills', '')),
-            contact=self._parse_contact(sections.get('contact', '')),
-            projects=self._parse_projects(sections.get('projects', ''))
+            education=self._parse_education(section_text(text, sections.get('education'))),
+            work_experience=self._parse_experience(section_text(text, sections.get('experience'))),
+            skills=self._parse_skills(section_text(text, sections.get('skills'))),
+            contact=self._parse_contact(section_text(text, sections.get('contact'))),
+            projects=self._parse_projects(section_text(text, sections.get('projects')))
         )
 
-    def _identify_sections(self, text: str) -> Dict[str, str]:
-        """Identify different sections in the resume."""
-        lines = text.split('\n')
-        sections = {}
-        current_section = None
-        current_content = []
-
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-
-            # Check if this line is a section header
-            section_found = False
-            for section, headers in self.section_headers.items():
-                if any(header in line.lower() for header in headers):
-                    if current_section:
-                        sections[current_section] = '\n'.join(current_content)
-                    current_section = section
-                    current_content = []
-                    section_found = True
-                    break
-
-            if not section_found and current_section:
-                current_content.append(line)
-
-        # Add the last section
-        if current_section:
-            sections[current_section] = '\n'.join(current_content)
-
-        return sections
+    def _identify_sections(self, text: str) -> Dict[str, SectionSpan]:
+        """Identify different sections in the resume as character offsets into `text`."""
+        return self.section_detector.index(text)
 
     def _parse_education(self, text: str) -> List[Education]:
         """Extract education information."""
@@ -212,16 +154,15 @@ class ResumeParser:
 
             # Extract description and skills
             description_lines = []
-            skills = set()
             
             lines = entry.split('\n')
             for line in lines:
                 line = line.strip()
                 if line and not any(x in line.lower() for x in ['company', 'position', 'present']):
                     description_lines.append(line)
-                    # Extract skills from description
-                    words = set(word.lower() for word in line.split())
-                    skills.update(words.intersection(self.technical_skills))
+
+            # Extract skills from the whole description in one pass
+            skills = skill_taxonomy.skills(get_nlp(profile="tokenize")('\n'.join(description_lines)))
 
             experience_list.append(WorkExperience(
                 company=company,
@@ -229,7 +170,7 @@ class ResumeParser:
                 start_date=start_date,
                 end_date=end_date,
                 description=description_lines,
-                skills=list(skills)
+                skills=skills
             ))
 
         return experience_list
@@ -239,50 +180,32 @@ class ResumeParser:
         if not text:
             return []
 
-        # Split skills by common delimiters
-        skills = set()
-        skill_text = re.sub(r'[\n•●■\-\|,]', ' ', text)
-        
-        # Extract mentioned skills
-        doc = self.nlp(skill_text)
-        for token in doc:
-            if token.text.lower() in self.technical_skills:
-                skills.add(token.text.lower())
-
-        return list(skills)
+        # Extract mentioned skills; only token text is compared, so skip tagging.
+        # Bullets and delimiters become their own tokens, so no phrase spans them.
+        doc = get_nlp(profile="tokenize")(text)
+        return skill_taxonomy.skills(doc)
 
     def extract_keywords(self, text: str) -> Dict[str, List[str]]:
         """Extract important keywords by category."""
-        doc = self.nlp(text)
-        
-        keywords = {
-            'technical_skills': [],
-            'soft_skills': [],
-            'tools': [],
-            'certifications': [],
-            'industries': []
-        }
-        
-        # Add keyword extraction logic here
-        for token in doc:
-            if token.text.lower() in self.technical_skills:
-                keywords['technical_skills'].append(token.text)
-            
-            # Add more keyword categorization logic
-        
-        return keywords
+        return self._keywords_from_doc(doc_cache.parse(get_nlp(profile="tokenize"), text))
+
+    def _keywords_from_doc(self, doc: Doc) -> Dict[str, List[str]]:
+        # Canonical skill names from the taxonomy, so aliases compare equal
+        return skill_taxonomy.categorize(doc)
 
     def calculate_match_score(self, resume_text: str, job_description: str) -> Dict[str, any]:
         """Calculate how well the resume matches a job description."""
-        resume_doc = self.nlp(resume_text)
-        job_doc = self.nlp(job_description)
+        # Similarity only needs vectors, and keyword lookup only needs tokens
+        nlp = get_nlp(profile="vectors")
+        resume_doc = doc_cache.parse(nlp, resume_text)
+        job_doc = doc_cache.parse(nlp, job_description)
         
         # Calculate similarity score
         similarity_score = resume_doc.similarity(job_doc)
         
         # Extract keywords from both
-        resume_keywords = self.extract_keywords(resume_text)
-        job_keywords = self.extract_keywords(job_description)
+        resume_keywords = self._keywords_from_doc(resume_doc)
+        job_keywords = self._keywords_from_doc(job_doc)
         
         # Calculate matching and missing keywords
         matching_keywords = set(resume_keywords['technical_skills']).intersection(set(job_keywords['technical_skills']))
@@ -0,0 +1,197 @@
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+import re
+
+
+# Common section headers
+SECTION_HEADERS: Dict[str, List[str]] = {
+    'education': ['education', 'academic background', 'academic history', 'academic qualification'],
+    'experience': ['experience', 'work experience', 'employment history', 'work history', 'professional experience'],
+    'skills': ['skills', 'technical skills', 'core competencies', 'competencies'],
+    'projects': ['projects', 'personal projects', 'professional projects'],
+    'contact': ['contact', 'contact information', 'personal information']
+}
+
+
+class SectionSpan(NamedTuple):
+    """Character offsets of one resume section within the source text.
+
+    `header_start`/`header_end` cover the matched header phrase; `start`/`end`
+    cover the section body, from the line after the header up to the next
+    header line.
+    """
+    section: str
+    header_start: int
+    header_end: int
+    start: int
+    end: int
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """Regex alternation of `words` factored into a trie.
+
+    Sharing prefixes lets the regex engine reject most positions after one
+    character instead of trying every alternative in turn. Optional
+    suffixes are greedy, so the longest word at a position wins.
+    """
+    root: Dict[str, Dict] = {}
+    for word in words:
+        node = root
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def emit(node: Dict[str, Dict]) -> str:
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{body})?" if "" in node else body
+
+    return emit(root)
+
+
+class SectionDetector:
+    """Finds section headers with one precompiled trie-shaped regex.
+
+    A line is a header for a section if it contains any of that section's
+    header phrases, case-insensitively. When a line mentions several
+    sections, the one listed first in `section_headers` wins.
+    """
+
+    def __init__(self, section_headers: Dict[str, List[str]]):
+        self.sections = list(section_headers)
+        self._priority = {section: i for i, section in enumerate(self.sections)}
+        self._section_of: Dict[str, str] = {}
+        for section, headers in section_headers.items():
+            for header in headers:
+                self._section_of.setdefault(header.lower(), section)
+        # Matching runs over lowercased text; the case-insensitive variant is
+        # only needed when lowercasing would shift character offsets
+        pattern = _trie_pattern(self._section_of)
+        self._pattern = re.compile(pattern)
+        self._pattern_ignorecase = re.compile(pattern, re.IGNORECASE)
+
+    def headers(self, text: str, pos: int = 0, endpos: Optional[int] = None) -> Iterator[SectionSpan]:
+        """Yield one span per header line in `text[pos:endpos]`.
+
+        `start`/`end` of the yielded spans are the bounds of the header line
+        itself; `index` turns them into section bodies.
+        """
+        endpos = len(text) if endpos is None else endpos
+        lowered = text.lower()
+        if len(lowered) == len(text):
+            haystack, pattern = lowered, self._pattern
+        else:
+            haystack, pattern = text, self._pattern_ignorecase
+
+        best: Optional[SectionSpan] = None
+        for match in pattern.finditer(haystack, pos, endpos):
+            section = self._section_of.get(match.group().lower())
+            if section is None:
+                # Case-insensitive match that plain lowercasing would not produce
+                continue
+            line_start = text.rfind("\n", 0, match.start()) + 1
+            if best is not None and line_start == best.start:
+                # Same line as the previous header match: keep the higher priority section
+                if self._priority[section] < self._priority[best.section]:
+                    best = best._replace(
+                        section=section, header_start=match.start(), header_end=match.end()
+                    )
+                continue
+            if best is not None:
+                yield best
+            line_end = text.find("\n", match.end())
+            best = SectionSpan(
+                section=section,
+                header_start=match.start(),
+                header_end=match.end(),
+                start=line_start,
+                end=len(text) if line_end == -1 else line_end
+            )
+        if best is not None:
+            yield best
+
+    def index(self, text: str) -> Dict[str, SectionSpan]:
+        """Map each section to the offsets of its body within `text`.
+
+        Text before the first header belongs to no section. If a section
+        appears more than once, the last occurrence wins.
+        """
+        return _bodies(self.headers(text), len(text))
+
+
+def _bodies(headers: Iterable[SectionSpan], length: int) -> Dict[str, SectionSpan]:
+    """Turn header line spans into section body spans over a text of `length`."""
+    sections: Dict[str, SectionSpan] = {}
+    current: Optional[SectionSpan] = None
+    for header in headers:
+        if current is not None:
+            sections[current.section] = current._replace(end=header.start)
+        current = header._replace(start=min(header.end + 1, length))
+    if current is not None:
+        sections[current.section] = current._replace(end=length)
+    return sections
+
+
+class SectionIndexer:
+    """Builds a section index from text that arrives in chunks, e.g. PDF pages.
+
+    Each complete line is scanned for headers once, as soon as it arrives,
+    so detection keeps pace with extraction instead of waiting for the
+    whole document. Only the trailing partial line is ever rescanned.
+    """
+
+    def __init__(self, detector: SectionDetector):
+        self.detector = detector
+        self._chunks: List[str] = []
+        self._headers: List[SectionSpan] = []
+        self._pending = ""
+        self._offset = 0
+
+    def feed(self, chunk: str) -> List[SectionSpan]:
+        """Add the next piece of text; return header lines it completed."""
+        self._chunks.append(chunk)
+        pending = self._pending + chunk
+        complete = pending.rfind("\n") + 1
+        if not complete:
+            self._pending = pending
+            return []
+        found = self._scan(pending[:complete])
+        self._pending = pending[complete:]
+        self._offset += complete
+        return found
+
+    def close(self) -> Tuple[str, Dict[str, SectionSpan]]:
+        """Scan the final line and return the full text and its section index."""
+        self._scan(self._pending)
+        self._offset += len(self._pending)
+        self._pending = ""
+        text = "".join(self._chunks)
+        return text, _bodies(self._headers, len(text))
+
+    def _scan(self, lines: str) -> List[SectionSpan]:
+        offset = self._offset
+        found = [
+            SectionSpan(
+                section=header.section,
+                header_start=header.header_start + offset,
+                header_end=header.header_end + offset,
+                start=header.start + offset,
+                end=header.end + offset
+            )
+            for header in self.detector.headers(lines)
+        ]
+        self._headers.extend(found)
+        return found
+
+
+section_detector = SectionDetector(SECTION_HEADERS)
+
+
+def section_text(text: str, span: Optional[SectionSpan]) -> str:
+    """Body of `span` with lines stripped and blank lines dropped."""
+    if span is None:
+        return ""
+    return "\n".join(
+        line for line in (raw.strip() for raw in text[span.start:span.end].split("\n")) if line
+    )
@@ -0,0 +1,195 @@
+from typing import Dict, List, NamedTuple, Optional
+import json
+import logging
+import os
+import threading
+import time
+from spacy.matcher import PhraseMatcher
+from spacy.tokens import Doc, Span
+from spacy.util import filter_spans
+from ..config import settings
+from .nlp_registry import _current_rss_bytes, get_nlp
+
+logger = logging.getLogger(__name__)
+
+CATEGORIES = ("technical_skills", "soft_skills", "tools", "certifications", "industries")
+
+
+class Skill(NamedTuple):
+    name: str
+    category: str
+
+
+class SkillMatch(NamedTuple):
+    name: str
+    category: str
+    start: int
+    end: int
+    text: str
+
+
+class _Compiled(NamedTuple):
+    lower: PhraseMatcher
+    exact: PhraseMatcher
+    skills: Dict[int, Skill]
+    mtime: float
+    version: Optional[int]
+    patterns: int
+
+
+class SkillTaxonomy:
+    """Skill dictionary compiled into spaCy PhraseMatchers.
+
+    Every name and alias in the data file becomes one pattern, so a single
+    pass over a Doc finds all multi-word skills in time linear in its
+    length. Entries may list `cased` forms for terms that are also everyday
+    words or initialisms ("Go", "Excel", "AI"); those only match with that
+    exact casing. The data file is polled for changes at most every
+    `reload_seconds` and a rebuilt matcher is swapped in atomically.
+    """
+
+    def __init__(
+        self,
+        path: str = settings.SKILL_TAXONOMY_PATH,
+        reload_seconds: float = settings.SKILL_TAXONOMY_RELOAD_SECONDS
+    ):
+        self.path = path
+        self.reload_seconds = reload_seconds
+        self._compiled: Optional[_Compiled] = None
+        self._build_lock = threading.Lock()
+        self._checked_at = 0.0
+        self._stats: Dict = {}
+        self.reloads = 0
+
+    def match(self, doc: Doc) -> List[SkillMatch]:
+        """Skills mentioned in `doc`, longest match first where they overlap."""
+        compiled = self._current()
+        spans = [
+            Span(doc, start, end, label=match_id)
+            for matcher in (compiled.lower, compiled.exact)
+            for match_id, start, end in matcher(doc)
+        ]
+        matches = []
+        # filter_spans keeps the longest of overlapping matches, e.g. "machine
+        # learning engineer" over "machine learning"
+        for span in sorted(filter_spans(spans), key=lambda s: s.start):
+            skill = compiled.skills[span.label]
+            matches.append(SkillMatch(skill.name, skill.category, span.start, span.end, span.text))
+        return matches
+
+    def skills(self, doc: Doc, category: Optional[str] = None) -> List[str]:
+        """Unique canonical skill names in `doc`, in order of first mention."""
+        return list(dict.fromkeys(
+            match.name for match in self.match(doc)
+            if category is None or match.category == category
+        ))
+
+    def categorize(self, doc: Doc) -> Dict[str, List[str]]:
+        """Unique canonical skill names in `doc`, grouped by category."""
+        keywords: Dict[str, List[str]] = {category: [] for category in CATEGORIES}
+        for match in self.match(doc):
+            names = keywords.setdefault(match.category, [])
+            if match.name not in names:
+                names.append(match.name)
+        return keywords
+
+    def reload(self, force: bool = False) -> bool:
+        """Rebuild the matchers if the data file changed; True if rebuilt."""
+        mtime = os.path.getmtime(self.path)
+        compiled = self._compiled
+        if not force and compiled is not None and compiled.mtime == mtime:
+            return False
+
+        with self._build_lock:
+            # Another thread may have rebuilt while we waited
+            compiled = self._compiled
+            if not force and compiled is not None and compiled.mtime == mtime:
+                return False
+
+            rss_before = _current_rss_bytes()
+            start = time.perf_counter()
+            try:
+                compiled = self._build(mtime)
+            except (OSError, ValueError, KeyError) as e:
+                if self._compiled is None:
+                    raise
+                # Keep serving the previous taxonomy rather than failing requests
+                logger.error("Could not reload skill taxonomy from %s: %s", self.path, e)
+                return False
+            build_seconds = time.perf_counter() - start
+
+            self._compiled = compiled
+            self.reloads += 1
+            self._stats = {
+                "path": self.path,
+                "version": compiled.version,
+                "skills": len(compiled.skills),
+                "patterns": compiled.patterns,
+                "build_seconds": round(build_seconds, 3),
+                "rss_delta_bytes": max(_current_rss_bytes() - rss_before, 0),
+                "loaded_at": time.time()
+            }
+            logger.info(
+                "Compiled %d skills (%d patterns) in %.2fs",
+                len(compiled.skills), compiled.patterns, build_seconds
+            )
+            return True
+
+    def stats(self) -> Dict:
+        """Size, build time and memory cost of the current matcher."""
+        return {**self._stats, "reloads": self.reloads, "loaded": self._compiled is not None}
+
+    def _current(self) -> _Compiled:
+        now = time.monotonic()
+        if self._compiled is None or now - self._checked_at >= self.reload_seconds:
+            self._checked_at = now
+            try:
+                self.reload()
+            except OSError as e:
+                if self._compiled is None:
+                    raise
+                logger.error("Could not check skill taxonomy %s: %s", self.path, e)
+        return self._compiled
+
+    def _build(self, mtime: float) -> _Compiled:
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+
+        nlp = get_nlp(profile="tokenize")
+        lower = PhraseMatcher(nlp.vocab, attr="LOWER")
+        exact = PhraseMatcher(nlp.vocab)
+        skills: Dict[int, Skill] = {}
+        lower_terms: Dict[str, str] = {}
+        exact_terms: Dict[str, str] = {}
+
+        for entry in data["skills"]:
+            name = entry["name"]
+            cased = entry.get("cased", [])
+            folded = {term.lower() for term in cased}
+            skills[nlp.vocab.strings.add(name)] = Skill(name, entry["category"])
+            for term in [name] + entry.get("aliases", []):
+                if term.lower() not in folded:
+                    # The first entry to claim a term keeps it
+                    lower_terms.setdefault(term.lower(), name)
+            for term in cased:
+                exact_terms.setdefault(term, name)
+
+        tokenizer = nlp.language.tokenizer
+        for matcher, terms in ((lower, lower_terms), (exact, exact_terms)):
+            by_name: Dict[str, List[Doc]] = {}
+            for (term, name), pattern in zip(terms.items(), tokenizer.pipe(terms)):
+                by_name.setdefault(name, []).append(pattern)
+            for name, patterns in by_name.items():
+                matcher.add(name, patterns)
+
+        return _Compiled(
+            lower=lower,
+            exact=exact,
+            skills=skills,
+            mtime=mtime,
+            version=data.get("version"),
+            patterns=len(lower_terms) + len(exact_terms)
+        )
+
+
+skill_taxonomy = SkillTaxonomy()
@@ -0,0 +1,52 @@
+"""Entry points for work dispatched to the executor's CPU pool.
+
+Everything here is a module-level function that takes and returns plain,
+picklable values, so it can run in a worker process. Docs never cross the
+process boundary; the disk tier of the document cache is shared, so work
+done in a worker still benefits later parses in any process.
+"""
+from typing import Dict, List, Optional, Sequence, Set
+from .doc_cache import doc_cache
+from .doc_vectors import compute_vector
+from .nlp_registry import get_nlp
+
+
+def noun_keywords(doc) -> Set[str]:
+    """Key terms (non-stopword nouns and proper nouns) of a parsed text."""
+    return {
+        token.text.lower() for token in doc
+        if token.pos_ in ['NOUN', 'PROPN'] and not token.is_stop
+    }
+
+
+def keyword_sets(texts: Sequence[str], batch_size: Optional[int] = None) -> List[Set[str]]:
+    """Noun keywords of each text; keyword extraction only needs POS tags."""
+    nlp = get_nlp(profile="pos")
+    if len(texts) == 1:
+        return [noun_keywords(doc_cache.parse(nlp, texts[0]))]
+    kwargs = {"batch_size": batch_size} if batch_size else {}
+    # Parallelism comes from the pool, so each worker parses in-process
+    return [noun_keywords(doc) for doc in doc_cache.pipe(nlp, texts, n_process=1, **kwargs)]
+
+
+def prepare_document(text: str) -> Optional[bytes]:
+    """Parse a new resume into the document cache and return its stored vector.
+
+    compute_vector parses with the pipeline profile ResumeAnalyzer uses, so
+    analyses of the resume find its Doc cached.
+    """
+    return compute_vector(text)
+
+
+def analyze_resume_for_job(resume_text: str, job_description: str) -> Dict:
+    """Full ResumeAnalyzer report for one resume and job description."""
+    from .resume_analyzer import ResumeAnalyzer
+
+    return ResumeAnalyzer().analyze_resume_for_job(resume_text, job_description)
+
+
+def export_report(analysis_data: Dict, format: str) -> bytes:
+    """Rendered report file; bytes, since BytesIO can't leave a worker process."""
+    from .enhanced_analyzer import EnhancedAnalyzer
+
+    return EnhancedAnalyzer().export_report(analysis_data, format).getvalue()
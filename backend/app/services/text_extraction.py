@@ -0,0 +1,290 @@
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import asyncio
+import io
+import logging
+import math
+from ..config import settings
+from .executor import executor, run_io
+from .sections import SectionDetector, SectionIndexer, SectionSpan, section_detector
+
+logger = logging.getLogger(__name__)
+
+Source = Union[bytes, str, BinaryIO]
+
+# PDF engines: PyPDF2 is fast, pdfplumber is slower but keeps word spacing
+# and reading order on layouts PyPDF2 mangles. "auto" tries the fast one
+# first and falls back when its output looks damaged.
+FAST_ENGINE = "pypdf2"
+ACCURATE_ENGINE = "pdfplumber"
+ENGINES = (FAST_ENGINE, ACCURATE_ENGINE, "auto")
+
+# Thresholds behind `needs_layout`
+MIN_CHARS_PER_PAGE = 200
+LONG_WORD_CHARS = 25
+MAX_LONG_WORD_RATIO = 0.05
+
+
+class ExtractionTimeout(Exception):
+    """Raised when a document takes longer than the extraction timeout."""
+
+
+def _open(source: Source) -> Union[str, BinaryIO]:
+    # BytesIO shares the caller's buffer, so wrapping bytes does not copy them
+    return io.BytesIO(source) if isinstance(source, bytes) else source
+
+
+def _is_pdf(filename: str) -> bool:
+    return filename.lower().endswith('.pdf')
+
+
+def _is_docx(filename: str) -> bool:
+    return filename.lower().endswith('.docx')
+
+
+def _capped(
+    pages: Iterable[str],
+    max_pages: Optional[int],
+    max_chars: Optional[int]
+) -> Iterator[str]:
+    """Yield page texts until either cap is reached, truncating the last page."""
+    chars = 0
+    for number, text in enumerate(pages, start=1):
+        if max_chars is not None and chars + len(text) >= max_chars:
+            yield text[:max_chars - chars]
+            logger.info("Stopped PDF extraction at the %d character cap (page %d)", max_chars, number)
+            return
+        chars += len(text)
+        yield text
+        if max_pages is not None and number >= max_pages:
+            logger.info("Stopped PDF extraction at the %d page cap", max_pages)
+            return
+
+
+def _pypdf2_pages(source: Source, pages: Optional[range] = None) -> Iterator[str]:
+    import PyPDF2
+
+    reader = PyPDF2.PdfReader(_open(source))
+    # Pages are decoded on access, so stopping early skips the rest of the file
+    numbers = range(len(reader.pages)) if pages is None else range(
+        pages.start, min(pages.stop, len(reader.pages))
+    )
+    for number in numbers:
+        yield reader.pages[number].extract_text() or ""
+
+
+def _pdfplumber_pages(source: Source, pages: Optional[range] = None) -> Iterator[str]:
+    import pdfplumber
+
+    numbers = None if pages is None else [number + 1 for number in pages]
+    with pdfplumber.open(_open(source), pages=numbers) as pdf:
+        for page in pdf.pages:
+            text = page.extract_text(x_tolerance=3) or ""
+            # Drop the page's parsed layout objects before moving on
+            page.flush_cache()
+            yield text
+
+
+def _engine_pages(source: Source, engine: str, pages: Optional[range] = None) -> Iterator[str]:
+    if engine == FAST_ENGINE:
+        return _pypdf2_pages(source, pages)
+    if engine == ACCURATE_ENGINE:
+        return _pdfplumber_pages(source, pages)
+    raise ValueError(f"Unknown PDF engine: {engine}")
+
+
+def _docx_text(source: Source) -> str:
+    from docx import Document
+
+    doc = Document(_open(source))
+    lines = [para.text for para in doc.paragraphs]
+    for table in doc.tables:
+        for row in table.rows:
+            lines.append(" | ".join(cell.text for cell in row.cells))
+    return "\n".join(lines)
+
+
+def needs_layout(text: str, pages: int) -> bool:
+    """Whether fast-engine output looks damaged enough to redo with pdfplumber.
+
+    PyPDF2 drops the spaces between words on some PDFs, which shows up as
+    long runs of letters, and finds little or no text on pages drawn with
+    unusual fonts.
+    """
+    if len(text.strip()) < MIN_CHARS_PER_PAGE * max(pages, 1):
+        return True
+    words = text.split()
+    long_words = sum(1 for word in words if len(word) > LONG_WORD_CHARS)
+    return long_words > MAX_LONG_WORD_RATIO * len(words)
+
+
+def page_count(source: Union[bytes, str]) -> int:
+    import PyPDF2
+
+    return len(PyPDF2.PdfReader(_open(source)).pages)
+
+
+def extract_pages(source: Union[bytes, str], engine: str, start: int, stop: int) -> List[str]:
+    """Text of pages `start` to `stop - 1`; the unit of work for parallel extraction."""
+    return list(_engine_pages(source, engine, range(start, stop)))
+
+
+def iter_pdf_pages(
+    source: Source,
+    engine: str = FAST_ENGINE,
+    max_pages: Optional[int] = settings.PDF_MAX_PAGES,
+    max_chars: Optional[int] = settings.PDF_MAX_CHARS
+) -> Iterator[str]:
+    """Yield the text of each PDF page as soon as it is decoded.
+
+    `source` is the file's bytes, a path or a binary file object. Extraction
+    stops once `max_pages` pages or `max_chars` characters have been produced;
+    pass None to lift a cap. "auto" needs the whole document to decide, so
+    it is not accepted here.
+    """
+    pages = None if max_pages is None else range(max_pages)
+    return _capped(_engine_pages(source, engine, pages), max_pages, max_chars)
+
+
+def iter_text_chunks(source: Source, filename: str, engine: str = FAST_ENGINE) -> Iterator[str]:
+    """Yield the text of an uploaded resume in document order.
+
+    PDFs are streamed page by page, with a newline between pages so words on
+    either side of a page break stay apart; DOCX files arrive in one chunk.
+    """
+    if _is_pdf(filename):
+        for number, text in enumerate(iter_pdf_pages(source, engine=engine)):
+            yield "\n" + text if number else text
+    elif _is_docx(filename):
+        yield _docx_text(source)
+    else:
+        raise ValueError(f"Unsupported file format: {filename}")
+
+
+def extract_text(source: Source, filename: str, engine: str = "auto") -> str:
+    """Full text of an uploaded resume, extracted in the calling thread."""
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown PDF engine: {engine}")
+    if engine != "auto" or not _is_pdf(filename):
+        return "".join(iter_text_chunks(source, filename, FAST_ENGINE if engine == "auto" else engine))
+
+    if not isinstance(source, (bytes, str)):
+        source = source.read()  # Read twice if the fallback runs
+    pages = list(iter_pdf_pages(source, FAST_ENGINE))
+    text = "\n".join(pages)
+    if needs_layout(text, len(pages)):
+        text = "\n".join(iter_pdf_pages(source, ACCURATE_ENGINE))
+    return text
+
+
+def _page_ranges(pages: int, workers: int, min_pages: int) -> List[range]:
+    """Split `pages` into at most `workers` contiguous runs of at least `min_pages`."""
+    chunks = max(1, min(workers, pages // max(min_pages, 1)))
+    size = math.ceil(pages / chunks) if pages else 1
+    return [range(start, min(start + size, pages)) for start in range(0, pages, size)]
+
+
+async def _index_pdf(
+    source: Union[bytes, str],
+    engine: str,
+    pages: int,
+    detector: SectionDetector,
+    max_chars: Optional[int] = settings.PDF_MAX_CHARS
+) -> Tuple[str, Dict[str, SectionSpan]]:
+    """Text and section index of the first `pages` pages, decoded in parallel.
+
+    Runs of pages are decoded on the pdf pool at once, and each is fed to
+    a SectionIndexer as soon as it and the runs before it are done, so
+    header detection keeps pace with extraction. Runs still queued once
+    the character cap is reached are cancelled.
+    """
+    runs = [
+        asyncio.ensure_future(executor.run_pdf(extract_pages, source, engine, run.start, run.stop))
+        for run in _page_ranges(pages, executor.pdf.max_workers, settings.PDF_PARALLEL_MIN_PAGES)
+    ]
+    indexer = SectionIndexer(detector)
+    chars = 0
+    number = 0
+    try:
+        for run in runs:
+            for text in await run:
+                # Same cap, and the same page separator, as iter_text_chunks
+                capped = max_chars is not None and chars + len(text) >= max_chars
+                if capped:
+                    text = text[:max_chars - chars]
+                chars += len(text)
+                indexer.feed("\n" + text if number else text)
+                number += 1
+                if capped:
+                    logger.info("Stopped PDF extraction at the %d character cap (page %d)", max_chars, number)
+                    return indexer.close()
+    finally:
+        for run in runs:
+            run.cancel()
+    return indexer.close()
+
+
+async def _extract_pdf(
+    source: Union[bytes, str],
+    engine: str,
+    detector: SectionDetector
+) -> Tuple[str, Dict[str, SectionSpan]]:
+    pages = await executor.run_pdf(page_count, source)
+    if settings.PDF_MAX_PAGES is not None:
+        pages = min(pages, settings.PDF_MAX_PAGES)
+
+    text, sections = await _index_pdf(source, FAST_ENGINE if engine == "auto" else engine, pages, detector)
+    if engine == "auto" and needs_layout(text, pages):
+        logger.info("Fast PDF extraction looks damaged; retrying with %s", ACCURATE_ENGINE)
+        text, sections = await _index_pdf(source, ACCURATE_ENGINE, pages, detector)
+    return text, sections
+
+
+def _docx_sections(source: Source, detector: SectionDetector) -> Tuple[str, Dict[str, SectionSpan]]:
+    indexer = SectionIndexer(detector)
+    indexer.feed(_docx_text(source))
+    return indexer.close()
+
+
+async def extract_sections(
+    source: Source,
+    filename: str,
+    engine: str = "auto",
+    timeout: Optional[float] = settings.EXTRACTION_TIMEOUT_SECONDS,
+    detector: SectionDetector = section_detector
+) -> Tuple[str, Dict[str, SectionSpan]]:
+    """Full text of an uploaded resume and its section index, without blocking the event loop.
+
+    PDF pages are split into contiguous runs and extracted in parallel on
+    the executor's pdf pool, and sections are detected page by page as
+    the runs finish. `engine` is "pypdf2", "pdfplumber" or "auto".
+    Raises ValueError for unsupported formats and engines, and
+    ExtractionTimeout after `timeout` seconds; runs already being decoded
+    then finish in the background, but none queued behind them start.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown PDF engine: {engine}")
+    if _is_pdf(filename):
+        if not isinstance(source, (bytes, str)):
+            # File objects can't be sent to worker processes
+            source = await run_io(source.read)
+        work = _extract_pdf(source, engine, detector)
+    elif _is_docx(filename):
+        work = run_io(_docx_sections, source, detector)
+    else:
+        raise ValueError(f"Unsupported file format: {filename}")
+
+    try:
+        return await asyncio.wait_for(work, timeout)
+    except asyncio.TimeoutError:
+        raise ExtractionTimeout(f"Text extraction took longer than {timeout} seconds")
+
+
+async def extract_document(
+    source: Source,
+    filename: str,
+    engine: str = "auto",
+    timeout: Optional[float] = settings.EXTRACTION_TIMEOUT_SECONDS
+) -> str:
+    """Full text of an uploaded resume, without blocking the event loop; see `extract_sections`."""
+    text, _ = await extract_sections(source, filename, engine, timeout)
+    return text
@@ -0,0 +1,189 @@
+from typing import BinaryIO, Dict, NamedTuple, Optional, Tuple
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from fastapi import UploadFile
+from ..config import settings
+from .executor import run_io
+from .sections import SECTION_HEADERS, SectionSpan, section_detector
+from .text_extraction import extract_sections
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_EXTENSIONS = (".pdf", ".docx")
+
+SECTIONS_VERSION = hashlib.sha256(json.dumps(SECTION_HEADERS, sort_keys=True).encode()).hexdigest()[:8]
+
+
+class UploadTooLarge(Exception):
+    """Raised when an upload exceeds the configured size limit."""
+
+
+class StoredUpload(NamedTuple):
+    digest: str  # SHA-256 of the file content
+    path: str
+    size: int
+    duplicate: bool  # The same content was already stored
+
+
+class UploadStore:
+    """Content-addressed storage for uploaded resumes.
+
+    Uploads are streamed to a temporary file in chunks while their SHA-256
+    is computed, then moved to `<root>/<hash[:2]>/<hash><ext>`, so identical
+    files share one copy. Extracted text, and the offsets of its sections,
+    are cached next to the file under the same hash, the engine and the
+    extraction caps, so a re-upload skips extraction.
+    """
+
+    def __init__(
+        self,
+        root: str = settings.UPLOAD_DIR,
+        max_bytes: int = settings.MAX_FILE_SIZE,
+        chunk_size: int = settings.UPLOAD_CHUNK_SIZE
+    ):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.text_hits = 0
+        self.text_misses = 0
+
+    async def save(self, upload: UploadFile) -> StoredUpload:
+        """Stream `upload` into the store; raises ValueError or UploadTooLarge."""
+        extension = os.path.splitext(upload.filename or "")[1].lower()
+        if extension not in SUPPORTED_EXTENSIONS:
+            raise ValueError(f"Unsupported file format: {upload.filename}")
+        if upload.size is not None and upload.size > self.max_bytes:
+            raise UploadTooLarge(self._too_large_message())
+
+        f, tmp_path = await run_io(self._open_temp)
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            while True:
+                chunk = await upload.read(self.chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > self.max_bytes:
+                    raise UploadTooLarge(self._too_large_message())
+                digest.update(chunk)
+                await run_io(f.write, chunk)
+            await run_io(f.close)
+            path, duplicate = await run_io(self._commit, tmp_path, digest.hexdigest() + extension)
+        except BaseException:
+            await run_io(self._discard, f, tmp_path)
+            raise
+        return StoredUpload(digest.hexdigest(), path, size, duplicate)
+
+    async def extract(self, upload: StoredUpload, engine: str = "auto") -> str:
+        """Return the upload's text, extracting it only if it isn't cached yet."""
+        text, _ = await self.extract_sections(upload, engine)
+        return text
+
+    async def extract_sections(
+        self,
+        upload: StoredUpload,
+        engine: str = "auto"
+    ) -> Tuple[str, Dict[str, SectionSpan]]:
+        """Return the upload's text and section index, extracting them only if they aren't cached yet."""
+        text_path = self._text_path(upload.digest, engine)
+        sections_path = self._sections_path(text_path)
+        text = await run_io(self._read_text, text_path)
+        if text is not None:
+            self.text_hits += 1
+            sections = await run_io(self._read_sections, sections_path)
+            if sections is None:
+                # Cached before section offsets were, or with other headers
+                sections = section_detector.index(text)
+                await self._cache(upload, sections_path, self._encode_sections(sections))
+            return text, sections
+
+        self.text_misses += 1
+        text, sections = await extract_sections(upload.path, upload.path, engine)
+        await self._cache(upload, text_path, text.encode("utf-8"))
+        await self._cache(upload, sections_path, self._encode_sections(sections))
+        return text, sections
+
+    async def _cache(self, upload: StoredUpload, path: str, data: bytes) -> None:
+        try:
+            await run_io(self._write_atomic, path, data)
+        except OSError as e:
+            # The text cache is an optimisation; never fail an upload because of it
+            logger.warning("Could not cache extracted text for %s: %s", upload.digest, e)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "max_bytes": self.max_bytes,
+            "text_hits": self.text_hits,
+            "text_misses": self.text_misses
+        }
+
+    def _too_large_message(self) -> str:
+        return f"File exceeds the {self.max_bytes} byte upload limit"
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, name[:2], name)
+
+    def _text_path(self, digest: str, engine: str) -> str:
+        # Different engines and caps extract different text, so they are part of the key
+        return self._path(f"{digest}.{engine}.{settings.PDF_MAX_PAGES}p{settings.PDF_MAX_CHARS}c.txt")
+
+    @staticmethod
+    def _sections_path(text_path: str) -> str:
+        # Offsets depend on the text, and on the headers they were detected with
+        return f"{text_path[:-len('.txt')]}.{SECTIONS_VERSION}.sections.json"
+
+    @staticmethod
+    def _encode_sections(sections: Dict[str, SectionSpan]) -> bytes:
+        return json.dumps({section: list(span[1:]) for section, span in sections.items()}).encode("utf-8")
+
+    @staticmethod
+    def _read_sections(path: str) -> Optional[Dict[str, SectionSpan]]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return {section: SectionSpan(section, *offsets) for section, offsets in json.load(f).items()}
+        except (OSError, ValueError, TypeError):
+            return None
+
+    @staticmethod
+    def _read_text(path: str) -> Optional[str]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _open_temp(self) -> Tuple[BinaryIO, str]:
+        os.makedirs(self.root, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".part")
+        return os.fdopen(fd, "wb"), tmp_path
+
+    def _commit(self, tmp_path: str, name: str) -> Tuple[str, bool]:
+        path = self._path(name)
+        if os.path.exists(path):
+            os.remove(tmp_path)
+            return path, True
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp_path, path)
+        return path, False
+
+    @staticmethod
+    def _discard(f: BinaryIO, tmp_path: str) -> None:
+        f.close()
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+    def _write_atomic(self, path: str, data: bytes) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+
+upload_store = UploadStore()
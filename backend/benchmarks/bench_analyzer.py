@@ -0,0 +1,149 @@
+"""Per-call latency of ResumeAnalyzer.analyze_resume_for_job.
+
+Compares the single-pass analyzer against a copy of the analysis as it
+was before, which ran the full pipeline, re-parsed the resume and job
+description in every stage, extracted skills by part of speech and
+parsed each experience block on its own.
+
+    python -m benchmarks.bench_analyzer --model en_core_web_lg --pairs 20
+"""
+import argparse
+import re
+import statistics
+import tempfile
+import time
+from collections import Counter
+from typing import List
+from app.services import resume_analyzer
+from app.services.doc_cache import DocCache
+from app.services.nlp_registry import get_nlp, nlp_registry
+from app.services.resume_analyzer import ResumeAnalyzer
+from . import corpus
+
+
+# Nouns the pre-rewrite skill extraction ignored
+LEGACY_COMMON_WORDS = {'experience', 'year', 'work', 'team', 'project'}
+
+
+def legacy_extract_skills(nlp, text: str) -> List[str]:
+    """Skills as the baseline found them: every noun or proper noun, from a fresh parse."""
+    doc = nlp(text)
+    potential_skills = [
+        token.text.lower() for token in doc
+        if (token.pos_ in ['NOUN', 'PROPN'] and len(token.text) > 2)
+    ]
+    return [skill for skill in Counter(potential_skills) if skill not in LEGACY_COMMON_WORDS]
+
+
+def legacy_analyze(analyzer: ResumeAnalyzer, nlp, resume_text: str, job_description: str) -> dict:
+    """The analysis as it existed before the single-pass rewrite.
+
+    A copy of the baseline's parsing, skills and experience logic, run on
+    the full pipeline (`nlp`): the resume and job description are parsed
+    again by every stage, the skill extraction tags parts of speech, and
+    each experience block is parsed on its own. Only the experience level
+    and suggestions, which parse nothing, come from `analyzer`.
+    """
+    resume_doc = nlp(resume_text)
+    job_doc = nlp(job_description)
+    similarity_score = resume_doc.similarity(job_doc)
+    experience_level = analyzer._determine_experience_level(resume_text)
+
+    resume_skills = legacy_extract_skills(nlp, resume_text)
+    job_skills = legacy_extract_skills(nlp, job_description)
+    matching_skills = set(resume_skills) & set(job_skills)
+    skills_analysis = {
+        "matching_skills": list(matching_skills),
+        "missing_skills": list(set(job_skills) - set(resume_skills)),
+        "extra_skills": list(set(resume_skills) - set(job_skills)),
+        "match_percentage": round(len(matching_skills) / len(job_skills) * 100 if job_skills else 0, 2)
+    }
+
+    resume_doc = nlp(resume_text)
+    job_doc = nlp(job_description)
+    experience_pattern = r'(?:EXPERIENCE|WORK EXPERIENCE|EMPLOYMENT).*?(?=\n\n[A-Z]|$)'
+    relevance_scores = [
+        nlp(exp).similarity(job_doc)
+        for exp in re.findall(experience_pattern, resume_text, re.DOTALL | re.I)
+    ]
+    avg_relevance = sum(relevance_scores) / len(relevance_scores) if relevance_scores else 0
+    experience_analysis = {
+        "overall_relevance": round(avg_relevance * 100, 2),
+        "relevant_experience_count": len(relevance_scores),
+        "has_recent_relevant_experience": avg_relevance > 0.6
+    }
+
+    return {
+        "match_score": round(similarity_score * 100, 2),
+        "experience_level": experience_level,
+        "skills_match": skills_analysis,
+        "experience_relevance": experience_analysis,
+        "improvement_suggestions": analyzer._generate_suggestions(
+            skills_analysis, experience_analysis, similarity_score
+        )
+    }
+
+
+def _time_calls(fn, pairs) -> list:
+    timings = []
+    for resume_text, job_description in pairs:
+        start = time.perf_counter()
+        fn(resume_text, job_description)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def _summary(label: str, timings: list) -> str:
+    return (
+        f"{label:<12} mean {statistics.mean(timings):8.2f} ms   "
+        f"p50 {statistics.median(timings):8.2f} ms   max {max(timings):8.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default=nlp_registry.default_model)
+    parser.add_argument("--pairs", type=int, default=20)
+    args = parser.parse_args()
+
+    nlp_registry.default_model = args.model
+    nlp_registry.warmup()
+    cache_dir = tempfile.mkdtemp(prefix="bench_doc_cache_")
+    # A zero-sized cache never stores anything, so every call really parses
+    resume_analyzer.doc_cache = DocCache(cache_dir, memory_bytes=0, disk_bytes=0)
+    analyzer = ResumeAnalyzer()
+    pairs = list(zip(corpus.resumes(args.pairs), corpus.job_descriptions(args.pairs)))
+
+    # The baseline parses with every component, as analyses did before profiles
+    legacy_nlp = get_nlp()
+
+    # Scores come from the same vectors and must agree; skills are matched
+    # against the taxonomy now, so only how often they agree is reported
+    same_skills = 0
+    for resume_text, job_description in pairs:
+        new = analyzer.analyze_resume_for_job(resume_text, job_description)
+        old = legacy_analyze(analyzer, legacy_nlp, resume_text, job_description)
+        assert abs(new["match_score"] - old["match_score"]) <= 0.01, "match score diverged from the baseline"
+        assert abs(
+            new["experience_relevance"]["overall_relevance"] - old["experience_relevance"]["overall_relevance"]
+        ) <= 0.01, "experience relevance diverged from the baseline"
+        assert new["experience_level"] == old["experience_level"]
+        same_skills += set(new["skills_match"]["matching_skills"]) == set(old["skills_match"]["matching_skills"])
+
+    legacy = _time_calls(lambda r, j: legacy_analyze(analyzer, legacy_nlp, r, j), pairs)
+    single = _time_calls(analyzer.analyze_resume_for_job, pairs)
+
+    resume_analyzer.doc_cache = DocCache(cache_dir)
+    _time_calls(analyzer.analyze_resume_for_job, pairs)
+    cached = _time_calls(analyzer.analyze_resume_for_job, pairs)
+
+    print(f"model: {args.model}, pairs: {len(pairs)}")
+    print(_summary("legacy", legacy))
+    print(_summary("single-pass", single))
+    print(_summary("doc cache", cached))
+    print(f"speedup      {statistics.mean(legacy) / statistics.mean(single):.2f}x")
+    print(f"same matching skills as the baseline: {same_skills}/{len(pairs)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Recall and latency of the IVF job index against exact search.
+
+Uses clustered synthetic vectors (document vectors are far from uniformly
+distributed), so no spaCy model is needed.
+
+    python -m benchmarks.bench_ann --vectors 100000 --dims 300 --queries 200
+"""
+import argparse
+import statistics
+import tempfile
+import time
+import numpy as np
+from app.services.ann_index import IVFIndex
+
+
+def clustered_vectors(rng: np.random.Generator, count: int, dims: int, clusters: int) -> np.ndarray:
+    centers = rng.standard_normal((clusters, dims)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=count)
+    return centers[labels] + 0.6 * rng.standard_normal((count, dims)).astype(np.float32)
+
+
+def _latency(fn, queries) -> list:
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vectors", type=int, default=100000)
+    parser.add_argument("--dims", type=int, default=300)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 32])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = clustered_vectors(rng, args.vectors, args.dims, clusters=200)
+    queries = clustered_vectors(rng, args.queries, args.dims, clusters=200)
+
+    index = IVFIndex(tempfile.mkdtemp(prefix="bench_ann_"), args.dims, train_min=args.vectors + 1)
+    start = time.perf_counter()
+    for offset in range(0, args.vectors, 10000):
+        index.upsert(np.arange(offset, min(offset + 10000, args.vectors)), vectors[offset:offset + 10000])
+    insert_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    index.train()
+    train_seconds = time.perf_counter() - start
+
+    # Incremental inserts after training, one at a time as the API does them
+    extra = clustered_vectors(rng, 200, args.dims, clusters=200)
+    start = time.perf_counter()
+    for i, vector in enumerate(extra):
+        index.upsert([args.vectors + i], vector)
+    single_insert_ms = (time.perf_counter() - start) * 1000 / len(extra)
+
+    print(
+        f"vectors: {len(index)}, dims: {args.dims}, lists: {len(index._centroids)}, "
+        f"bulk insert {insert_seconds:.2f}s, train {train_seconds:.2f}s, "
+        f"single insert {single_insert_ms:.2f} ms"
+    )
+
+    exact = [{id_ for id_, _ in index.exact_search(q, args.k)} for q in queries]
+    exact_timings = _latency(lambda q: index.exact_search(q, args.k), queries)
+    print(f"{'exact':<12} recall 1.000   p50 {statistics.median(exact_timings):7.2f} ms   "
+          f"p99 {np.percentile(exact_timings, 99):7.2f} ms")
+
+    for nprobe in args.nprobe:
+        found = [{id_ for id_, _ in index.search(q, args.k, nprobe)} for q in queries]
+        recall = statistics.mean(len(f & e) / args.k for f, e in zip(found, exact))
+        timings = _latency(lambda q: index.search(q, args.k, nprobe), queries)
+        print(f"nprobe={nprobe:<5} recall {recall:.3f}   p50 {statistics.median(timings):7.2f} ms   "
+              f"p99 {np.percentile(timings, 99):7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""Request latency and event-loop lag of the sync and async database stacks.
+
+Serves resume list pages, the query of `GET /resumes/?user_id=`, three
+ways, each under --concurrency clients for --seconds:
+
+- sync in async def: a sync Session inside an `async def` route, as the
+  routes were; every query blocks the event loop
+- sync in def: the same in a plain `def` route, which FastAPI runs in
+  its threadpool
+- async: the app's own route, on an AsyncSession (aiosqlite or asyncpg)
+
+Requests go through httpx's ASGI transport in this process, so client
+and server share one event loop, like the requests and websockets of
+one worker. A ticker records how late the loop wakes it. Uses a
+temporary SQLite database, and also --postgres-url if given; that
+database's tables are dropped and recreated.
+
+With more clients than the sync pool has connections (15 by default),
+"sync in async def" stalls: the loop blocks waiting for a connection
+that only a dependency teardown, which needs the loop, would return.
+Each stall lasts the pool timeout, 30 s. Leave that stack out with
+--stacks to load the others harder:
+
+    python -m benchmarks.bench_async_db --concurrency 10 --seconds 5
+    python -m benchmarks.bench_async_db --concurrency 100 --stacks sync-def async
+    python -m benchmarks.bench_async_db --postgres-url postgresql://localhost/resume_bench
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import List
+import httpx
+from fastapi import Depends, FastAPI, Query
+from sqlalchemy import insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import Session, load_only, sessionmaker
+from app.api import models
+from app.api.pagination import keyset_page
+from app.api.routes import resume
+from app.database import Base, get_async_db, make_async_engine, make_engine
+from .bench_event_loop import _ticker
+
+USERS = 200
+
+
+def seed(engine, resumes: int, seed: int) -> None:
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(models.Resume), [
+            {
+                "id": i, "title": f"Resume {i}", "content": "x" * 4096, "file_path": f"uploads/{i}.pdf",
+                "user_id": rng.randrange(USERS) + 1, "created_at": start + timedelta(seconds=i),
+                "updated_at": start
+            }
+            for i in range(1, resumes + 1)
+        ])
+
+
+def build_app(url: str) -> FastAPI:
+    engine = make_engine(url)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    async_engine = make_async_engine(url)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    def get_db():
+        with SessionLocal() as db:
+            yield db
+
+    async def get_bench_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    def resume_page(db: Session, user_id: int, limit: int) -> List[int]:
+        query = db.query(models.Resume).options(load_only(*resume.RESUME_LIST_COLUMNS)).filter(
+            models.Resume.user_id == user_id
+        )
+        rows, _ = keyset_page(query, models.Resume.created_at, models.Resume.id, None, limit)
+        return [row.id for row in rows]
+
+    app = FastAPI()
+    app.include_router(resume.router)
+    app.dependency_overrides[get_async_db] = get_bench_async_db
+
+    @app.get("/sync-async-def/resumes/")
+    async def sync_in_async_def(user_id: int, limit: int = Query(100), db: Session = Depends(get_db)):
+        return resume_page(db, user_id, limit)
+
+    @app.get("/sync-def/resumes/")
+    def sync_in_def(user_id: int, limit: int = Query(100), db: Session = Depends(get_db)):
+        return resume_page(db, user_id, limit)
+
+    app.state.engines = (engine, async_engine)
+    return app
+
+
+async def _client(client: httpx.AsyncClient, path: str, deadline: float, rng: random.Random,
+                  latencies: List[float], errors: List[str]) -> None:
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await client.get(path, params={"user_id": rng.randrange(USERS) + 1, "limit": 100})
+        latencies.append(time.perf_counter() - start)
+        if response.status_code != 200:
+            errors.append(response.text)
+
+
+async def run(app: FastAPI, name: str, path: str, args) -> None:
+    latencies: List[float] = []
+    errors: List[str] = []
+    lags: List[float] = []
+    stop = asyncio.Event()
+    # Errors, such as pool checkout timeouts, are counted rather than raised
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Open the pools and warm the statement caches first
+        await client.get(path, params={"user_id": 1})
+        ticker = asyncio.ensure_future(_ticker(stop, lags))
+        deadline = time.perf_counter() + args.seconds
+        await asyncio.gather(*(
+            _client(client, path, deadline, random.Random(args.seed + i), latencies, errors)
+            for i in range(args.concurrency)
+        ))
+        stop.set()
+        await ticker
+
+    latencies.sort()
+    lags.sort()
+    p50 = latencies[len(latencies) // 2] * 1000 if latencies else 0.0
+    p99 = latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)] * 1000 if latencies else 0.0
+    lag99 = lags[min(int(len(lags) * 0.99), len(lags) - 1)] * 1000 if lags else 0.0
+    lag_max = lags[-1] * 1000 if lags else 0.0
+    print(
+        f"{name:<20} {len(latencies) / args.seconds:>9.0f} {p50:>8.2f} {p99:>9.2f} "
+        f"{lag99:>10.2f} {lag_max:>10.2f} {len(errors):>7}"
+    )
+    if errors:
+        print(f"    first error: {errors[0][:200]}")
+
+
+STACKS = {
+    "sync-async-def": ("sync in async def", "/sync-async-def/resumes/"),
+    "sync-def": ("sync in def", "/sync-def/resumes/"),
+    "async": ("async", "/resumes/")
+}
+
+
+async def bench(url: str, args) -> None:
+    app = build_app(url)
+    print(f"{'stack':<20} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>9} {'lag p99':>10} {'lag max':>10} {'errors':>7}")
+    for stack in args.stacks:
+        await run(app, *STACKS[stack], args)
+    engine, async_engine = app.state.engines
+    engine.dispose()
+    await async_engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--resumes", type=int, default=20000)
+    parser.add_argument("--stacks", nargs="+", choices=list(STACKS), default=list(STACKS))
+    parser.add_argument("--postgres-url", default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{args.concurrency} concurrent clients, {args.resumes} resumes, {args.seconds:.0f}s per stack")
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite:///{os.path.join(directory, 'bench_async.db')}"
+        seed(make_engine(url), args.resumes, args.seed)
+        print("sqlite")
+        asyncio.run(bench(url, args))
+    if args.postgres_url:
+        try:
+            seed(make_engine(args.postgres_url), args.resumes, args.seed)
+        except OperationalError as e:
+            print(f"postgres unreachable: {e.orig}".strip())
+            return
+        print("postgres")
+        asyncio.run(bench(args.postgres_url, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Bulk analysis export: throughput and peak memory as the row count grows.
+
+Seeds a temporary SQLite database with synthetic analyses and drains
+`export_analyses` for each format, the way the streaming response does.
+Peak memory is measured with tracemalloc on a second pass and should
+stay roughly flat across row counts; output size and rows per second
+are reported too.
+
+    python -m benchmarks.bench_bulk_export --rows 1000 10000 100000
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, insert
+from app.api import models
+from app.database import Base, SessionLocal
+from app.services import bulk_export
+from . import corpus
+
+
+def seed(engine, rows: int, seed: int) -> None:
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        # One user's whole history, which is what an export covers
+        conn.execute(insert(models.User), [{"id": 1, "email": "user@example.com"}])
+        conn.execute(insert(models.Resume), [
+            {"id": i, "title": f"Resume {i}", "content": corpus.make_resume(rng), "user_id": 1}
+            for i in range(1, 101)
+        ])
+        conn.execute(insert(models.JobApplication), [
+            {
+                "id": i, "company": rng.choice(corpus.COMPANIES), "position": rng.choice(corpus.TITLES),
+                "status": rng.choice(["Applied", "Interview", "Offer", "Rejected"]), "user_id": 1
+            }
+            for i in range(1, 501)
+        ])
+        for offset in range(0, rows, 10000):
+            conn.execute(insert(models.ResumeAnalysis), [
+                {
+                    "resume_id": rng.randint(1, 100),
+                    "application_id": rng.randint(1, 500),
+                    "match_score": round(rng.uniform(20, 95), 2),
+                    "missing_keywords": json.dumps(rng.sample(corpus.SKILLS, 4)),
+                    "suggested_modifications": json.dumps([
+                        f"Consider adding experience with {skill}" for skill in rng.sample(corpus.SKILLS, 2)
+                    ]),
+                    "result": json.dumps({"match_score": 0, "padding": "x" * 2000}),
+                    "status": "completed",
+                    "created_at": start + timedelta(minutes=offset + number)
+                }
+                for number in range(min(10000, rows - offset))
+            ])
+
+
+def drain(format: str) -> int:
+    chunks, _ = bulk_export.export_analyses(format, 1)
+    return sum(len(chunk) for chunk in chunks)
+
+
+def measure(format: str):
+    """Output bytes, seconds, and peak traced bytes; timed apart from tracing, which slows it."""
+    start = time.perf_counter()
+    size = drain(format)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    drain(format)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, elapsed, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # Keep the one-off openpyxl import out of the first peak
+    import openpyxl  # noqa: F401
+
+    print(f"{'rows':>8} {'format':<6} {'MiB out':>8} {'rows/s':>10} {'peak MiB':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in args.rows:
+            engine = create_engine(f"sqlite:///{os.path.join(directory, f'{rows}.db')}")
+            Base.metadata.create_all(engine)
+            seed(engine, rows, args.seed)
+            # export_analyses opens its sessions from the app's session factory
+            SessionLocal.configure(bind=engine)
+            for format in bulk_export.EXPORT_FORMATS:
+                size, elapsed, peak = measure(format)
+                print(
+                    f"{rows:>8} {format:<6} {size / 2**20:>8.2f} {rows / elapsed:>10.0f} "
+                    f"{peak / 2**20:>9.2f}"
+                )
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Concurrent database writes under each engine profile.
+
+Writer threads replay the analysis job pattern: insert a job, then
+commit several progress updates to it, each in its own short
+transaction, while reader threads poll job state the way the queue
+does. Reports commits per second, commit latency, "database is locked"
+and other errors, and the pool metrics, for SQLite with SQLAlchemy's
+defaults and with the tuned profile (WAL, synchronous=NORMAL, busy
+timeout), and for PostgreSQL when --postgres-url is given. The tables
+are dropped and recreated, so point --postgres-url at a scratch database.
+
+    python -m benchmarks.bench_db_writes --writers 8 --readers 4 --seconds 5 \\
+        --postgres-url postgresql://localhost/resume_bench
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, List
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from app.api import models
+from app.database import Base, database_stats, make_engine
+
+
+def _writer(Session, deadline: float, updates: int, latencies: List[float], errors: Dict[str, int]) -> None:
+    while time.perf_counter() < deadline:
+        try:
+            start = time.perf_counter()
+            with Session() as db:
+                job = models.ResumeAnalysis(status="running", progress=0)
+                db.add(job)
+                db.commit()
+                latencies.append(time.perf_counter() - start)
+                for progress in range(1, updates + 1):
+                    start = time.perf_counter()
+                    db.query(models.ResumeAnalysis).filter(models.ResumeAnalysis.id == job.id).update(
+                        {"progress": progress * 100 // updates, "stage": f"stage {progress}"},
+                        synchronize_session=False
+                    )
+                    db.commit()
+                    latencies.append(time.perf_counter() - start)
+        except OperationalError as e:
+            kind = "locked" if "locked" in str(e) else "other"
+            errors[kind] = errors.get(kind, 0) + 1
+
+
+def _reader(Session, deadline: float, reads: List[int]) -> None:
+    count = 0
+    while time.perf_counter() < deadline:
+        try:
+            with Session() as db:
+                db.execute(text(
+                    "SELECT status, progress, stage FROM resume_analyses ORDER BY id DESC LIMIT 1"
+                )).fetchall()
+            count += 1
+        except OperationalError:
+            pass
+    reads.append(count)
+
+
+def run(name: str, url: str, tuned: bool, args) -> None:
+    engine = make_engine(url, tuned)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    reads: List[int] = []
+    deadline = time.perf_counter() + args.seconds
+    threads = [
+        threading.Thread(target=_writer, args=(Session, deadline, args.updates, latencies, errors))
+        for _ in range(args.writers)
+    ] + [
+        threading.Thread(target=_reader, args=(Session, deadline, reads))
+        for _ in range(args.readers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000 if latencies else 0.0
+    p99 = latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)] * 1000 if latencies else 0.0
+    pool = database_stats(engine)
+    print(
+        f"{name:<16} {len(latencies) / args.seconds:>10.0f} {p50:>8.2f} {p99:>9.2f} "
+        f"{sum(reads) / args.seconds:>9.0f} {errors.get('locked', 0):>7} {errors.get('other', 0):>6} "
+        f"{pool['p95_hold_ms']:>9.2f} {pool['connects']:>6}"
+    )
+    engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--updates", type=int, default=5, help="progress commits per job")
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--postgres-url", default=None)
+    args = parser.parse_args()
+
+    print(f"{args.writers} writers, {args.readers} readers, {args.seconds:.0f}s per profile")
+    print(
+        f"{'profile':<16} {'commits/s':>10} {'p50 ms':>8} {'p99 ms':>9} {'reads/s':>9} "
+        f"{'locked':>7} {'other':>6} {'hold p95':>9} {'conns':>6}"
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        for tuned in (False, True):
+            path = os.path.join(directory, f"bench_{tuned}.db")
+            run("sqlite tuned" if tuned else "sqlite default", f"sqlite:///{path}", tuned, args)
+    if args.postgres_url:
+        for tuned in (False, True):
+            try:
+                run("postgres tuned" if tuned else "postgres default", args.postgres_url, tuned, args)
+            except OperationalError as e:
+                print(f"postgres unreachable: {e.orig}".strip())
+                break
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Event-loop latency while analyses run inline versus on the executor.
+
+A ticker coroutine sleeps for a fixed interval and records how late it
+wakes up; that lateness is what every other request and WebSocket on the
+worker would see.
+
+    python -m benchmarks.bench_event_loop --model en_core_web_lg --analyses 40 --cpu-workers 2
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from app.services import tasks
+from app.services.executor import ExecutorLayer
+from app.services.nlp_registry import nlp_registry
+from . import corpus
+
+TICK_SECONDS = 0.005
+
+
+async def _ticker(stop: asyncio.Event, lags: list) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK_SECONDS)
+        lags.append(time.perf_counter() - start - TICK_SECONDS)
+
+
+async def _inline(pairs, layer) -> None:
+    # What an async route calling spaCy directly does
+    for resume_text, job_description in pairs:
+        tasks.analyze_resume_for_job(resume_text, job_description)
+        await asyncio.sleep(0)
+
+
+async def _offloaded(pairs, layer) -> None:
+    await asyncio.gather(*(
+        layer.run_cpu(tasks.analyze_resume_for_job, resume_text, job_description)
+        for resume_text, job_description in pairs
+    ))
+
+
+async def _measure(name, workload, pairs, layer) -> None:
+    lags: list = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_ticker(stop, lags))
+    start = time.perf_counter()
+    await workload(pairs, layer)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticker
+
+    lags_ms = sorted(lag * 1000 for lag in lags) or [0.0]
+    print(
+        f"{name:<10} {len(pairs) / elapsed:>10.1f} {statistics.median(lags_ms):>10.2f} "
+        f"{lags_ms[int(len(lags_ms) * 0.99) - 1]:>10.2f} {lags_ms[-1]:>10.2f}"
+    )
+
+
+async def _run(args) -> None:
+    resumes = corpus.resumes(args.analyses)
+    jobs = corpus.job_descriptions(args.analyses)
+    pairs = list(zip(resumes, jobs))
+    layer = ExecutorLayer(io_workers=1, cpu_workers=args.cpu_workers)
+    await layer.start()
+
+    print(f"analyses: {len(pairs)}, cpu workers: {args.cpu_workers}")
+    print(f"{'mode':<10} {'calls/s':>10} {'p50 ms':>10} {'p99 ms':>10} {'max ms':>10}")
+    try:
+        await _measure("inline", _inline, pairs, layer)
+        await _measure("executor", _offloaded, pairs, layer)
+        print(layer.stats()["cpu"])
+    finally:
+        layer.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default=nlp_registry.default_model)
+    parser.add_argument("--analyses", type=int, default=40)
+    parser.add_argument("--cpu-workers", type=int, default=2)
+    args = parser.parse_args()
+
+    # Workers are spawned and read the model name from the environment
+    os.environ["SPACY_MODEL"] = args.model
+    nlp_registry.default_model = args.model
+    nlp_registry.warmup()
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""PDF extraction backends: throughput and text quality over generated PDFs.
+
+Each fixture is a synthetic resume rendered to PDF, so the exact source
+text is known. Quality is the F1 of the extracted words against it;
+throughput is pages per second. "parallel" rows go through
+`extract_document`, which splits pages across the pdf worker pool.
+Rendering the fixtures needs fpdf (`pip install fpdf`).
+
+    python -m benchmarks.bench_extraction --docs 20 --pages 8 --pdf-workers 4
+"""
+import argparse
+import asyncio
+import os
+import random
+import re
+import tempfile
+import time
+from collections import Counter
+from typing import List, Tuple
+from app.services import text_extraction
+from app.services.executor import ExecutorLayer
+from . import corpus
+
+WORD = re.compile(r"[A-Za-z0-9+#/.@-]+")
+
+
+def render_pdf(text: str, path: str) -> None:
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    pdf.set_auto_page_break(True, margin=15)
+    pdf.add_page()
+    pdf.set_font("Helvetica", size=10)
+    for line in text.split("\n"):
+        pdf.multi_cell(0, 5, line or " ")
+        # fpdf2 leaves the cursor right of the cell; PyFPDF moved it back
+        pdf.set_x(pdf.l_margin)
+    pdf.output(path)
+
+
+def make_fixtures(directory: str, docs: int, pages: int, seed: int) -> List[Tuple[str, str]]:
+    """Write `docs` PDFs of roughly `pages` pages; returns (path, source text) pairs."""
+    rng = random.Random(seed)
+    fixtures = []
+    for number in range(docs):
+        # One generated resume fills about half a page at this font size
+        text = "\n\n".join(corpus.make_resume(rng, jobs=4, bullets=6) for _ in range(pages * 2))
+        path = os.path.join(directory, f"resume_{number}.pdf")
+        render_pdf(text, path)
+        fixtures.append((path, text))
+    return fixtures
+
+
+def word_f1(extracted: str, source: str) -> float:
+    got = Counter(WORD.findall(extracted.lower()))
+    want = Counter(WORD.findall(source.lower()))
+    overlap = sum((got & want).values())
+    if not overlap:
+        return 0.0
+    precision = overlap / sum(got.values())
+    recall = overlap / sum(want.values())
+    return 2 * precision * recall / (precision + recall)
+
+
+def _report(name: str, fixtures, texts: List[str], elapsed: float) -> None:
+    pages = sum(text_extraction.page_count(path) for path, _ in fixtures)
+    quality = sum(word_f1(text, source) for text, (_, source) in zip(texts, fixtures)) / len(fixtures)
+    print(f"{name:<22} {pages / elapsed:>10.1f} {elapsed / len(fixtures) * 1000:>10.1f} {quality:>8.3f}")
+
+
+def _sequential(fixtures, engine: str) -> None:
+    start = time.perf_counter()
+    texts = [text_extraction.extract_text(path, path, engine) for path, _ in fixtures]
+    _report(f"{engine}", fixtures, texts, time.perf_counter() - start)
+
+
+async def _parallel(fixtures, engine: str) -> None:
+    start = time.perf_counter()
+    texts = [
+        await text_extraction.extract_document(path, path, engine, timeout=None)
+        for path, _ in fixtures
+    ]
+    _report(f"{engine} parallel", fixtures, texts, time.perf_counter() - start)
+
+
+async def _run(args, fixtures) -> None:
+    layer = ExecutorLayer(io_workers=4, cpu_workers=0, pdf_workers=args.pdf_workers)
+    # extract_document uses the module-level executor
+    text_extraction.executor = layer
+    try:
+        # Start the pdf workers outside the timed runs
+        await asyncio.gather(*(
+            layer.run_pdf(text_extraction.page_count, fixtures[0][0])
+            for _ in range(args.pdf_workers)
+        ))
+        for engine in text_extraction.ENGINES:
+            await _parallel(fixtures, engine)
+    finally:
+        layer.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=8)
+    parser.add_argument("--pdf-workers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        fixtures = make_fixtures(directory, args.docs, args.pages, args.seed)
+        print(f"{'engine':<22} {'pages/s':>10} {'ms/doc':>10} {'word F1':>8}")
+        for engine in text_extraction.ENGINES:
+            _sequential(fixtures, engine)
+        asyncio.run(_run(args, fixtures))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Cold-start cost of importing the app, measured with `python -X importtime`.
+
+Each run imports the module in a fresh interpreter and reports the
+cumulative import time of the module itself and of the slowest modules
+under it. It also checks that the lazily imported reporting libraries
+stay out of a plain startup. Exits non-zero on a leaked heavy import,
+or when the median exceeds --budget-ms, so CI can run it as a check.
+
+    python -m benchmarks.bench_import_time --runs 5 --top 15 --budget-ms 5000
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+# Imported on first chart or export only; see enhanced_analyzer.warmup
+LAZY_MODULES = ("matplotlib", "fpdf", "openpyxl", "pandas", "seaborn")
+
+LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$")
+
+
+def _import_once(module: str) -> Tuple[Dict[str, int], List[str]]:
+    """Cumulative microseconds per top-level import, and lazy modules that got loaded."""
+    check = (
+        f"import sys, {module}; "
+        f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", check],
+        capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            # The first report of a module is its real import
+            cumulative.setdefault(match.group(4), int(match.group(2)))
+    leaked = [name for name in result.stdout.strip().split(",") if name]
+    return cumulative, leaked
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    samples: Dict[str, List[int]] = defaultdict(list)
+    leaked = set()
+    for _ in range(args.runs):
+        cumulative, run_leaked = _import_once(args.module)
+        leaked.update(run_leaked)
+        for name, micros in cumulative.items():
+            samples[name].append(micros)
+
+    medians = {name: statistics.median(values) for name, values in samples.items()}
+    total_ms = medians.get(args.module, 0) / 1000
+    print(f"{args.module}: {total_ms:.1f} ms median over {args.runs} runs")
+    print(f"\n{'module':<50} {'cumulative ms':>14}")
+    slowest = sorted(
+        (item for item in medians.items() if item[0] != args.module),
+        key=lambda item: item[1], reverse=True
+    )
+    for name, micros in slowest[:args.top]:
+        print(f"{name:<50} {micros / 1000:>14.1f}")
+
+    failed = False
+    if leaked:
+        print(f"\nFAIL: imported at startup but meant to be lazy: {', '.join(sorted(leaked))}")
+        failed = True
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        print(f"\nFAIL: {total_ms:.1f} ms exceeds the {args.budget_ms:.0f} ms budget")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Resume list pages by offset and by cursor, as the page gets deeper.
+
+Seeds a temporary SQLite database, migrated to head, with --resumes
+resumes of --content-kb KiB of text each, then fetches one page at
+several depths two ways: the old `GET /resumes/` query (offset, whole
+rows) and the current one (keyset_page after a cursor, list columns
+only). Offset pages slow down linearly with depth and carry every
+resume's text; cursor pages should take the same time at any depth.
+
+    python -m benchmarks.bench_pagination --resumes 100000 --content-kb 8
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from sqlalchemy.orm import load_only, sessionmaker
+from app.api import models
+from app.api.pagination import encode_cursor, keyset_page
+from app.api.routes.resume import RESUME_LIST_COLUMNS
+from app.database import make_engine
+from .bench_query_plans import migrate
+from . import corpus
+
+
+def seed(engine, resumes: int, content_kb: int, seed: int, batch: int = 5000) -> None:
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    content = (corpus.make_resume(rng) * (content_kb * 1024 // 500 + 1))[:content_kb * 1024]
+    with engine.begin() as conn:
+        for offset in range(0, resumes, batch):
+            conn.execute(insert(models.Resume), [
+                {
+                    "id": i, "title": f"Resume {i}", "content": content, "file_path": f"uploads/{i}.pdf",
+                    "user_id": i % 1000 + 1, "created_at": start + timedelta(seconds=i), "updated_at": start
+                }
+                for i in range(offset + 1, min(offset + batch, resumes) + 1)
+            ])
+
+
+def timed(fetch, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fetch()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resumes", type=int, default=100000)
+    parser.add_argument("--content-kb", type=int, default=8)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite:///{os.path.join(directory, 'bench_pagination.db')}"
+        migrate(url, "head")
+        engine = make_engine(url)
+        seed(engine, args.resumes, args.content_kb, args.seed)
+        Session = sessionmaker(bind=engine)
+
+        print(f"{args.resumes} resumes of {args.content_kb} KiB, pages of {args.limit}")
+        print(f"{'depth':>8} {'offset ms':>10} {'cursor ms':>10} {'speedup':>8}")
+        for fraction in (0, 0.1, 0.5, 0.9, 0.99):
+            skip = int((args.resumes - args.limit) * fraction)
+            with Session() as db:
+                cursor = None
+                if skip:
+                    # Newest first, so the row before the page has the id just above it
+                    before = db.get(models.Resume, args.resumes - skip + 1)
+                    cursor = encode_cursor(before.created_at, before.id)
+
+                def by_offset():
+                    db.expunge_all()
+                    # Unordered, as it was; ordering would only add a sort
+                    db.query(models.Resume).offset(skip).limit(args.limit).all()
+
+                def by_cursor():
+                    db.expunge_all()
+                    keyset_page(
+                        db.query(models.Resume).options(load_only(*RESUME_LIST_COLUMNS)),
+                        models.Resume.created_at, models.Resume.id, cursor, args.limit
+                    )
+
+                offset_ms = timed(by_offset, args.repeat)
+                cursor_ms = timed(by_cursor, args.repeat)
+            print(f"{skip:>8} {offset_ms:>10.2f} {cursor_ms:>10.2f} {offset_ms / cursor_ms:>7.1f}x")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Throughput of each named pipeline profile over a synthetic resume corpus.
+
+    python -m benchmarks.bench_profiles --model en_core_web_lg --docs 200
+"""
+import argparse
+import time
+from app.services.nlp_registry import PROFILES, get_nlp, nlp_registry
+from . import corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default=nlp_registry.default_model)
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    nlp_registry.default_model = args.model
+    nlp_registry.warmup()
+    texts = corpus.resumes(args.docs)
+    chars = sum(len(text) for text in texts)
+
+    print(f"model: {args.model}, docs: {len(texts)}, chars: {chars}")
+    print(f"{'profile':<10} {'components':<45} {'docs/s':>10} {'chars/s':>12}")
+    for profile in PROFILES:
+        nlp = get_nlp(profile=profile)
+        # Warm up any lazily initialised state before timing
+        list(nlp.pipe(texts[:4], batch_size=args.batch_size))
+        start = time.perf_counter()
+        for _ in nlp.pipe(texts, batch_size=args.batch_size):
+            pass
+        elapsed = time.perf_counter() - start
+        print(
+            f"{profile:<10} {','.join(nlp.pipe_names) or '-':<45} "
+            f"{len(texts) / elapsed:>10.1f} {chars / elapsed:>12.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Cross-worker websocket delivery latency through the pub/sub broker.
+
+Starts --workers processes, each with its own ConnectionManager on a
+BrokerPubSub sharing one socket, and --clients simulated websockets per
+worker subscribed to random analysis topics. Every worker publishes
+progress updates at --rate per second, so most deliveries cross to
+another process. Each client records publish-to-send latency, split into
+updates from its own worker and from others. --burst publishes several
+updates per analysis back to back to show coalescing.
+
+    python -m benchmarks.bench_pubsub --workers 4 --clients 500 --seconds 5
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+from typing import Dict, List
+
+
+class LatencySocket:
+    """Stands in for a websocket and records how old each update is on arrival."""
+
+    def __init__(self, worker: int, results: Dict[str, List[float]]):
+        self.worker = worker
+        self.results = results
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, text: str) -> None:
+        message = json.loads(text)
+        if "sent_at" in message:
+            origin = "local" if message["worker"] == self.worker else "remote"
+            self.results[origin].append(time.time() - message["sent_at"])
+
+    async def close(self) -> None:
+        pass
+
+
+async def _worker(number: int, args, path: str, start_at: float) -> Dict:
+    from app.api.websocket import ConnectionManager
+    from app.services.pubsub import BrokerPubSub
+
+    rng = random.Random(args.seed + number)
+    pubsub = BrokerPubSub(path, flush_seconds=args.flush_ms / 1000)
+    manager = ConnectionManager(heartbeat_seconds=3600, heartbeat_timeout=3600, pubsub=pubsub)
+    await manager.start()
+
+    results: Dict[str, List[float]] = {"local": [], "remote": []}
+    for _ in range(args.clients):
+        connection = await manager.connect(LatencySocket(number, results))
+        manager.subscribe(connection, {f"analysis:{rng.randrange(args.analyses)}" for _ in range(3)})
+
+    # Every worker is connected before anyone publishes
+    await asyncio.sleep(max(start_at - time.time(), 0))
+    interval = args.burst / args.rate
+    deadline = time.time() + args.seconds
+    while time.time() < deadline:
+        analysis = rng.randrange(args.analyses)
+        for progress in range(args.burst):
+            manager.publish(
+                f"analysis:{analysis}",
+                {"worker": number, "progress": progress, "sent_at": time.time()},
+                retain=True
+            )
+        await asyncio.sleep(interval)
+    await asyncio.sleep(1)
+
+    stats = manager.stats()["pubsub"]
+    await manager.stop()
+    return {"results": results, "pubsub": stats}
+
+
+def _run_worker(number: int, args, path: str, start_at: float, queue) -> None:
+    queue.put((number, asyncio.run(_worker(number, args, path, start_at))))
+
+
+def _summary(latencies: List[float]) -> str:
+    if not latencies:
+        return "no deliveries"
+    latencies = sorted(latencies)
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)] * 1000
+    return f"p50 {p50:7.2f} ms  p99 {p99:7.2f} ms  ({len(latencies)} deliveries)"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--clients", type=int, default=500, help="simulated websockets per worker")
+    parser.add_argument("--analyses", type=int, default=200)
+    parser.add_argument("--rate", type=float, default=200, help="updates per second per worker")
+    parser.add_argument("--burst", type=int, default=1, help="updates per analysis published back to back")
+    parser.add_argument("--flush-ms", type=float, default=5)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "pubsub.sock")
+        start_at = time.time() + 3 + args.workers * 0.5
+        processes = [
+            context.Process(target=_run_worker, args=(number, args, path, start_at, queue))
+            for number in range(args.workers)
+        ]
+        for process in processes:
+            process.start()
+        outcomes = dict(queue.get() for _ in processes)
+        for process in processes:
+            process.join()
+
+    local = [lat for outcome in outcomes.values() for lat in outcome["results"]["local"]]
+    remote = [lat for outcome in outcomes.values() for lat in outcome["results"]["remote"]]
+    print(f"{args.workers} workers x {args.clients} clients, flush {args.flush_ms} ms, burst {args.burst}")
+    print(f"same worker     {_summary(local)}")
+    print(f"other workers   {_summary(remote)}")
+    for number, outcome in sorted(outcomes.items()):
+        stats = outcome["pubsub"]
+        print(
+            f"worker {number}: {stats['role']:<7} published {stats['published']:>6} "
+            f"coalesced {stats['coalesced']:>6} batches {stats['batches']:>5} "
+            f"received {stats['received']:>6} lost {stats['lost']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""Plans and latency of the hot queries, before and after their indexes.
+
+Migrates a scratch database to revision 0001 (the tables without the
+hot-query indexes), seeds --analyses analyses spread over users,
+resumes and applications, and times every query in HOT_QUERIES. Then
+upgrades to head, timing the index builds, and times them again. Each
+query's plan at head must use the indexes it lists; the run exits
+non-zero when one doesn't. tests/test_query_plans.py checks the same on
+a small database:
+
+    python -m benchmarks.bench_query_plans --analyses 1000000
+    python -m benchmarks.bench_query_plans --url postgresql://localhost/resume_bench
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Tuple
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import insert, select, text, tuple_
+from sqlalchemy.engine import Connection, Engine
+from app.api import models
+from app.database import make_engine
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini")
+
+APPLICATION_STATUSES = ["Applied", "Interview", "Offer", "Rejected"]
+
+# Seeded per user; analyses are spread evenly over the applications
+RESUMES_PER_USER = 5
+APPLICATIONS_PER_USER = 20
+ANALYSES_PER_APPLICATION = 5
+
+Analysis = models.ResumeAnalysis
+Application = models.JobApplication
+
+# name -> (statement for the sample ids, indexes its plan must use); the
+# statements mirror the queries of the routes and services named
+HOT_QUERIES: Dict[str, Tuple[Callable[[Dict[str, Any]], object], List[str]]] = {
+    # A resume's latest analyses
+    "resume analyses": (
+        lambda ids: select(Analysis.id, Analysis.created_at, Analysis.match_score)
+        .where(Analysis.resume_id == ids["resume"])
+        .order_by(Analysis.created_at.desc())
+        .limit(20),
+        ["ix_resume_analyses_resume_id_created_at"]
+    ),
+    # A user's resumes, newest first
+    "user resumes": (
+        lambda ids: select(models.Resume.id, models.Resume.title, models.Resume.created_at)
+        .where(models.Resume.user_id == ids["user"])
+        .order_by(models.Resume.created_at.desc()),
+        ["ix_resumes_user_id_created_at"]
+    ),
+    # A user's applications in one status
+    "applications by status": (
+        lambda ids: select(Application.id, Application.company, Application.position)
+        .where(Application.user_id == ids["user"], Application.status == "Interview"),
+        ["ix_job_applications_user_id_status"]
+    ),
+    # doc_vectors.ApplicationVectors.matrix; either user_id index serves it
+    "application vectors": (
+        lambda ids: select(Application.id, Application.description_vector)
+        .where(Application.user_id == ids["user"])
+        .order_by(Application.id),
+        ["ix_job_applications_user_id"]
+    ),
+    # routes/reports.py combined report for a user
+    "combined report": (
+        lambda ids: select(Analysis.id, Application.id)
+        .outerjoin(Application, Application.id == Analysis.application_id)
+        .where(Analysis.status == "completed", Analysis.result.isnot(None), Application.user_id == ids["user"])
+        .order_by(Application.date_applied, Analysis.id),
+        ["ix_job_applications_user_id_date_applied", "ix_resume_analyses_application_id_status"]
+    ),
+    # analysis_jobs queue recovery and admission
+    "queued jobs": (
+        lambda ids: select(Analysis.id, Analysis.priority).where(Analysis.status == "queued"),
+        ["ix_resume_analyses_status_priority"]
+    ),
+    # Applications that used a resume
+    "resume applications": (
+        lambda ids: select(Application.id).where(Application.resume_id == ids["resume"]),
+        ["ix_job_applications_resume_id"]
+    ),
+    # GET /analysis/jobs halfway through, with pagination.keyset_page's predicate
+    "analyses page": (
+        lambda ids: select(Analysis.id, Analysis.status, Analysis.created_at)
+        .where(tuple_(Analysis.created_at, Analysis.id) < tuple_(*ids["analysis_key"]))
+        .order_by(Analysis.created_at.desc(), Analysis.id.desc())
+        .limit(101),
+        ["ix_resume_analyses_created_at_id"]
+    ),
+    # GET /applications/ halfway through
+    "applications page": (
+        lambda ids: select(Application.id, Application.company, Application.date_applied)
+        .where(tuple_(Application.date_applied, Application.id) < tuple_(*ids["application_key"]))
+        .order_by(Application.date_applied.desc(), Application.id.desc())
+        .limit(101),
+        ["ix_job_applications_date_applied_id"]
+    )
+}
+
+
+def migrate(url: str, revision: str) -> None:
+    config = Config(ALEMBIC_INI)
+    config.set_main_option("sqlalchemy.url", url)
+    # Keep the benchmark's output free of migration logging
+    config.attributes["configure_logger"] = False
+    if revision == "base":
+        command.downgrade(config, revision)
+    else:
+        command.upgrade(config, revision)
+
+
+def seed(engine: Engine, analyses: int, seed: int, batch: int = 20000) -> Dict[str, Any]:
+    """Insert the rows in id order and return sample ids and page keys from the middle."""
+    rng = random.Random(seed)
+    per_user = APPLICATIONS_PER_USER * ANALYSES_PER_APPLICATION
+    users = max(analyses // per_user, 1)
+    applications = max(analyses // ANALYSES_PER_APPLICATION, 1)
+    start = datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [
+            {"id": i, "email": f"user{i}@example.com", "full_name": f"User {i}"} for i in range(1, users + 1)
+        ])
+        conn.execute(insert(models.Resume), [
+            {
+                "id": i, "title": f"Resume {i}", "content": "", "user_id": (i - 1) // RESUMES_PER_USER + 1,
+                "created_at": start + timedelta(minutes=i)
+            }
+            for i in range(1, users * RESUMES_PER_USER + 1)
+        ])
+        for offset in range(0, applications, batch):
+            conn.execute(insert(Application), [
+                {
+                    "id": i, "company": f"Company {i % 500}", "position": "Engineer",
+                    "status": rng.choice(APPLICATION_STATUSES),
+                    "date_applied": start + timedelta(minutes=rng.randrange(500000)),
+                    "user_id": (i - 1) % users + 1,
+                    "resume_id": ((i - 1) % users) * RESUMES_PER_USER + rng.randrange(RESUMES_PER_USER) + 1
+                }
+                for i in range(offset + 1, min(offset + batch, applications) + 1)
+            ])
+        for offset in range(0, analyses, batch):
+            rows = []
+            for i in range(offset + 1, min(offset + batch, analyses) + 1):
+                application = (i - 1) % applications + 1
+                user = (application - 1) % users
+                # Mostly finished work, with a small queue
+                roll = rng.random()
+                status = "queued" if roll < 0.001 else "failed" if roll < 0.02 else "completed"
+                rows.append({
+                    "id": i, "application_id": application,
+                    "resume_id": user * RESUMES_PER_USER + rng.randrange(RESUMES_PER_USER) + 1,
+                    "match_score": rng.random() * 100, "missing_keywords": "[]", "suggested_modifications": "[]",
+                    "created_at": start + timedelta(seconds=i), "status": status,
+                    "result": "{}" if status == "completed" else None,
+                    "priority": rng.randrange(3), "progress": 0 if status == "queued" else 100
+                })
+            conn.execute(insert(Analysis), rows)
+    middle = users // 2 + 1
+    with engine.connect() as conn:
+        application_key = tuple(conn.execute(
+            select(Application.date_applied, Application.id).where(Application.id == applications // 2 + 1)
+        ).one())
+    return {
+        "user": middle,
+        "resume": (middle - 1) * RESUMES_PER_USER + 1,
+        "analysis_key": (start + timedelta(seconds=analyses // 2 + 1), analyses // 2 + 1),
+        "application_key": application_key
+    }
+
+
+def analyze(engine: Engine) -> None:
+    # Planner statistics, as a long-running database would have them
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+
+
+def _compiled(conn: Connection, statement) -> Tuple[str, object]:
+    compiled = statement.compile(dialect=conn.dialect)
+    params = compiled.construct_params()
+    if compiled.positional:
+        return compiled.string, tuple(params[name] for name in compiled.positiontup)
+    return compiled.string, params
+
+
+def plan(conn: Connection, statement) -> str:
+    sql, params = _compiled(conn, statement)
+    if conn.dialect.name == "sqlite":
+        rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+        return "\n".join(row[-1] for row in rows)
+    return "\n".join(row[0] for row in conn.exec_driver_sql("EXPLAIN " + sql, params).fetchall())
+
+
+def latency_ms(conn: Connection, statement, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.execute(statement).fetchall()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def measure(engine: Engine, ids: Dict[str, Any], repeat: int) -> Dict[str, Tuple[float, str]]:
+    with engine.connect() as conn:
+        return {
+            name: (latency_ms(conn, build(ids), repeat), plan(conn, build(ids)))
+            for name, (build, _) in HOT_QUERIES.items()
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--analyses", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=5, help="runs per query; the median is reported")
+    parser.add_argument("--url", default=None, help="scratch database, emptied first (default: temporary SQLite)")
+    parser.add_argument("--plans", action="store_true", help="print every plan, not only failing ones")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = args.url or f"sqlite:///{os.path.join(directory, 'bench_plans.db')}"
+        migrate(url, "base")
+        migrate(url, "0001")
+        engine = make_engine(url)
+
+        start = time.perf_counter()
+        ids = seed(engine, args.analyses, args.seed)
+        analyze(engine)
+        print(f"seeded {args.analyses} analyses in {time.perf_counter() - start:.1f}s ({engine.dialect.name})")
+        before = measure(engine, ids, args.repeat)
+
+        start = time.perf_counter()
+        migrate(url, "0003")
+        print(f"built indexes in {time.perf_counter() - start:.1f}s")
+        # The later revisions change columns, not indexes; on SQLite they
+        # rebuild tables, so gather statistics after them
+        migrate(url, "head")
+        analyze(engine)
+        after = measure(engine, ids, args.repeat)
+        engine.dispose()
+
+    failures = []
+    print(f"{'query':<24} {'0001 ms':>10} {'head ms':>10} {'speedup':>8}  index")
+    for name, (_, indexes) in HOT_QUERIES.items():
+        (old_ms, old_plan), (new_ms, new_plan) = before[name], after[name]
+        missing = [index for index in indexes if index not in new_plan]
+        if missing:
+            failures.append(name)
+        print(
+            f"{name:<24} {old_ms:>10.2f} {new_ms:>10.2f} {old_ms / max(new_ms, 1e-6):>7.0f}x  "
+            f"{'MISSING ' + ', '.join(missing) if missing else 'ok'}"
+        )
+        if missing or args.plans:
+            print(f"    0001: {old_plan}".replace("\n", "\n          "))
+            print(f"    head: {new_plan}".replace("\n", "\n          "))
+    if failures:
+        print(f"{len(failures)} hot queries don't use their indexes: {', '.join(failures)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
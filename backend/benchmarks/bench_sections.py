@@ -0,0 +1,84 @@
+"""Section detection: the per-line header loop versus the compiled detector.
+
+    python -m benchmarks.bench_sections --docs 2000 --jobs 10
+"""
+import argparse
+import random
+import time
+from app.services.resume_parser import ResumeParser
+from app.services.sections import section_text
+from . import corpus
+
+
+def legacy_identify_sections(section_headers: dict, text: str) -> dict:
+    """`ResumeParser._identify_sections` as it was before the compiled detector."""
+    lines = text.split('\n')
+    sections = {}
+    current_section = None
+    current_content = []
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        section_found = False
+        for section, headers in section_headers.items():
+            if any(header in line.lower() for header in headers):
+                if current_section:
+                    sections[current_section] = '\n'.join(current_content)
+                current_section = section
+                current_content = []
+                section_found = True
+                break
+
+        if not section_found and current_section:
+            current_content.append(line)
+
+    if current_section:
+        sections[current_section] = '\n'.join(current_content)
+
+    return sections
+
+
+def _time(fn, texts) -> float:
+    start = time.perf_counter()
+    for text in texts:
+        fn(text)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--jobs", type=int, default=10, help="work history entries per resume")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    texts = [corpus.make_resume(rng, jobs=args.jobs) for _ in range(args.docs)]
+    resume_parser = ResumeParser()
+    headers = resume_parser.section_headers
+    detector = resume_parser.section_detector
+
+    for text in texts:
+        spans = detector.index(text)
+        materialized = {name: section_text(text, span) for name, span in spans.items()}
+        assert materialized == legacy_identify_sections(headers, text)
+
+    chars = sum(len(text) for text in texts)
+    print(f"docs: {len(texts)}, chars: {chars}")
+    print(f"{'method':<20} {'ms total':>10} {'docs/s':>12} {'MB/s':>8}")
+    for name, fn in (
+        ("legacy loop", lambda text: legacy_identify_sections(headers, text)),
+        ("offset index", detector.index),
+        ("index + text", lambda text: [section_text(text, s) for s in detector.index(text).values()])
+    ):
+        elapsed = _time(fn, texts)
+        print(
+            f"{name:<20} {elapsed * 1000:>10.1f} {len(texts) / elapsed:>12.0f} "
+            f"{chars / elapsed / 1e6:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
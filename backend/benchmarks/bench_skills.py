@@ -0,0 +1,58 @@
+"""Build cost and matching throughput of the compiled skill taxonomy.
+
+Compares it against the 20-word token set the parser used to check one
+token at a time, which could never match multi-word skills.
+
+    python -m benchmarks.bench_skills --model en_core_web_lg --docs 200
+"""
+import argparse
+import time
+from app.services.nlp_registry import get_nlp, nlp_registry
+from app.services.skill_taxonomy import skill_taxonomy
+from . import corpus
+
+LEGACY_SKILLS = {
+    'python', 'java', 'javascript', 'react', 'node', 'sql', 'aws', 'docker',
+    'kubernetes', 'machine learning', 'ai', 'data science', 'devops', 'cloud',
+    'git', 'agile', 'scrum', 'ci/cd', 'rest api', 'microservices'
+}
+
+
+def legacy_skills(doc) -> list:
+    return list({token.text.lower() for token in doc if token.text.lower() in LEGACY_SKILLS})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default=nlp_registry.default_model)
+    parser.add_argument("--docs", type=int, default=200)
+    args = parser.parse_args()
+
+    nlp_registry.default_model = args.model
+    nlp_registry.warmup()
+    nlp = get_nlp(profile="tokenize")
+    docs = list(nlp.pipe(corpus.resumes(args.docs) + corpus.job_descriptions(args.docs)))
+    tokens = sum(len(doc) for doc in docs)
+
+    skill_taxonomy.reload(force=True)
+    stats = skill_taxonomy.stats()
+    print(
+        f"taxonomy: {stats['skills']} skills, {stats['patterns']} patterns, "
+        f"built in {stats['build_seconds'] * 1000:.0f} ms, "
+        f"+{stats['rss_delta_bytes'] / (1024 * 1024):.1f} MB RSS"
+    )
+    print(f"docs: {len(docs)}, tokens: {tokens}")
+    print(f"{'method':<10} {'docs/s':>10} {'tokens/s':>12} {'skills/doc':>12}")
+    for name, extract in (("legacy", legacy_skills), ("taxonomy", skill_taxonomy.skills)):
+        extract(docs[0])
+        start = time.perf_counter()
+        found = sum(len(extract(doc)) for doc in docs)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{name:<10} {len(docs) / elapsed:>10.1f} {tokens / elapsed:>12.0f} "
+            f"{found / len(docs):>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
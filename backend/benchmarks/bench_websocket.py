@@ -0,0 +1,139 @@
+"""Websocket fan-out under load, with thousands of simulated clients.
+
+Clients are in-process fakes of a websocket: fast ones take a send
+immediately, slow ones sleep --slow-ms per send, and dead ones never
+return from a send or answer a ping. Each client subscribes to a few
+analysis topics and progress updates are published at --rate per second.
+Reported are the cost of a publish call, the delivery latency seen by
+fast clients, how many updates slow clients had coalesced or dropped,
+and how many dead clients were disconnected. --baseline also times the
+previous one-socket-at-a-time broadcast over the fast and slow clients
+(dead ones would block it forever).
+
+    python -m benchmarks.bench_websocket --clients 5000 --analyses 500 --seconds 5
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+from typing import List
+from app.api.websocket import PING, ConnectionManager
+
+
+class FakeSocket:
+    def __init__(self, kind: str, slow_seconds: float):
+        self.kind = kind
+        self.slow_seconds = slow_seconds
+        self.manager = None
+        self.connection = None
+        self.latencies: List[float] = []
+        self.received = 0
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, text: str) -> None:
+        if self.kind == "dead":
+            await asyncio.Event().wait()
+        if self.kind == "slow":
+            await asyncio.sleep(self.slow_seconds)
+        if text == PING:
+            self.manager.handle_message(self.connection, '{"action": "pong"}')
+            return
+        message = json.loads(text)
+        if "sent_at" in message:
+            self.received += 1
+            self.latencies.append(time.perf_counter() - message["sent_at"])
+
+    async def close(self) -> None:
+        pass
+
+
+def _percentile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(int(len(values) * q), len(values) - 1)] if values else 0.0
+
+
+async def _connect(manager: ConnectionManager, args, rng: random.Random) -> List[FakeSocket]:
+    sockets = []
+    for number in range(args.clients):
+        roll = rng.random()
+        kind = "dead" if roll < args.dead else "slow" if roll < args.dead + args.slow else "fast"
+        socket = FakeSocket(kind, args.slow_ms / 1000)
+        socket.manager = manager
+        socket.connection = await manager.connect(socket)
+        topics = {f"analysis:{rng.randrange(args.analyses)}" for _ in range(args.topics)}
+        manager.subscribe(socket.connection, topics)
+        sockets.append(socket)
+    return sockets
+
+
+async def _run(args) -> None:
+    rng = random.Random(args.seed)
+    manager = ConnectionManager(
+        queue_limit=args.queue, send_timeout=args.send_timeout,
+        heartbeat_seconds=args.heartbeat, heartbeat_timeout=args.heartbeat * 2
+    )
+    sockets = await _connect(manager, args, rng)
+    await manager.start()
+
+    publish_times = []
+    interval = 1 / args.rate
+    deadline = time.perf_counter() + args.seconds
+    sequence = 0
+    while time.perf_counter() < deadline:
+        topic = f"analysis:{rng.randrange(args.analyses)}"
+        sequence += 1
+        start = time.perf_counter()
+        manager.publish(topic, {"topic": topic, "seq": sequence, "sent_at": start}, retain=True)
+        publish_times.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+    # Let queues drain
+    await asyncio.sleep(args.slow_ms / 1000 * args.queue / 10 + 1)
+
+    stats = manager.stats()
+    kinds = Counter(socket.kind for socket in sockets)
+    fast = [lat for socket in sockets if socket.kind == "fast" for lat in socket.latencies]
+    slow_received = sum(socket.received for socket in sockets if socket.kind == "slow")
+    print(f"clients {args.clients} ({dict(kinds)}), published {sequence} updates in {args.seconds}s")
+    print(f"publish call        p50 {_percentile(publish_times, 0.5) * 1e6:8.1f} us  p99 {_percentile(publish_times, 0.99) * 1e6:8.1f} us")
+    print(f"fast delivery       p50 {_percentile(fast, 0.5) * 1000:8.2f} ms  p99 {_percentile(fast, 0.99) * 1000:8.2f} ms  ({len(fast)} updates)")
+    print(f"slow clients        received {slow_received}, coalesced {stats['coalesced']}, dropped {stats['dropped']}")
+    dead_left = sum(1 for socket in sockets if socket.kind == "dead" and socket.connection in manager.connections)
+    print(f"dead clients        disconnected {kinds['dead'] - dead_left} of {kinds['dead']}")
+    print(f"retained updates    {stats['retained']}, still connected {stats['connections']}")
+
+    if args.baseline:
+        live = [socket for socket in sockets if socket.kind != "dead"]
+        start = time.perf_counter()
+        text = json.dumps({"topic": "analysis:0", "seq": 0, "sent_at": start})
+        for socket in live:
+            await socket.send_text(text)
+        print(f"baseline broadcast  one update to {len(live)} clients took {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    await manager.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=5000)
+    parser.add_argument("--analyses", type=int, default=500)
+    parser.add_argument("--topics", type=int, default=3, help="analysis topics per client")
+    parser.add_argument("--rate", type=float, default=500, help="updates published per second")
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--slow", type=float, default=0.1, help="share of slow clients")
+    parser.add_argument("--slow-ms", type=float, default=50)
+    parser.add_argument("--dead", type=float, default=0.02, help="share of dead clients")
+    parser.add_argument("--queue", type=int, default=100)
+    parser.add_argument("--send-timeout", type=float, default=1)
+    parser.add_argument("--heartbeat", type=float, default=1)
+    parser.add_argument("--baseline", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
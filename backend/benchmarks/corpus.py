@@ -0,0 +1,87 @@
+"""Synthetic resume and job description corpus shared by the benchmarks."""
+import random
+from typing import List
+
+SKILLS = [
+    "python", "java", "javascript", "react", "node", "sql", "aws", "docker",
+    "kubernetes", "machine learning", "data science", "devops", "cloud", "git",
+    "agile", "scrum", "ci/cd", "rest api", "microservices", "postgresql",
+    "terraform", "typescript", "go", "spark", "airflow", "fastapi", "django"
+]
+
+TITLES = [
+    "Software Engineer", "Senior Software Engineer", "Data Scientist",
+    "Backend Developer", "DevOps Engineer", "Engineering Manager"
+]
+
+COMPANIES = ["Acme Inc.", "Globex LLC", "Initech Ltd.", "Umbrella Inc.", "Hooli LLC"]
+
+VERBS = ["Built", "Designed", "Led", "Maintained", "Migrated", "Optimized", "Shipped"]
+
+NOUNS = [
+    "services", "pipelines", "dashboards", "APIs", "platform", "infrastructure",
+    "data models", "deployment tooling", "customer integrations"
+]
+
+
+def _bullet(rng: random.Random) -> str:
+    return (
+        f"- {rng.choice(VERBS)} {rng.choice(NOUNS)} using "
+        f"{rng.choice(SKILLS)} and {rng.choice(SKILLS)} for {rng.randint(2, 40)} teams"
+    )
+
+
+def make_resume(rng: random.Random, jobs: int = 3, bullets: int = 5) -> str:
+    """Build a plain-text resume with the usual sections."""
+    lines = [
+        "Jane Doe",
+        "CONTACT",
+        "jane@example.com | (555) 010-0000",
+        "",
+        "SUMMARY",
+        f"{rng.choice(TITLES)} with {rng.randint(1, 15)}+ years of experience.",
+        "",
+        "WORK EXPERIENCE"
+    ]
+    for _ in range(jobs):
+        lines.append(
+            f"{rng.choice(COMPANIES)} | {rng.choice(TITLES)} | Jan 20{rng.randint(10, 19)} to Present"
+        )
+        lines.extend(_bullet(rng) for _ in range(bullets))
+    lines += [
+        "",
+        "EDUCATION",
+        "Bachelor of Science in Computer Science, University of Somewhere, May 2012",
+        "",
+        "SKILLS",
+        ", ".join(rng.sample(SKILLS, 10)),
+        "",
+        "PROJECTS",
+        _bullet(rng)
+    ]
+    return "\n".join(lines)
+
+
+def make_job_description(rng: random.Random, requirements: int = 8) -> str:
+    """Build a job posting that asks for a random subset of skills."""
+    lines = [
+        f"We are hiring a {rng.choice(TITLES)} at {rng.choice(COMPANIES)}.",
+        "",
+        "Requirements:"
+    ]
+    lines.extend(
+        f"- {rng.randint(1, 8)}+ years of experience with {rng.choice(SKILLS)}"
+        for _ in range(requirements)
+    )
+    lines.append("Nice to have: " + ", ".join(rng.sample(SKILLS, 4)))
+    return "\n".join(lines)
+
+
+def resumes(count: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    return [make_resume(rng) for _ in range(count)]
+
+
+def job_descriptions(count: int, seed: int = 1) -> List[str]:
+    rng = random.Random(seed)
+    return [make_job_description(rng) for _ in range(count)]
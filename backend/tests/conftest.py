@@ -0,0 +1,21 @@
+import os
+import pytest
+from app.database import Base, make_engine
+
+
+@pytest.fixture
+def database_url(tmp_path):
+    """A file-backed SQLite database with the models' tables."""
+    url = f"sqlite:///{os.path.join(tmp_path, 'test.db')}"
+    engine = make_engine(url)
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    return url
+
+
+@pytest.fixture
+def engine(database_url):
+    # Rows are seeded with Core inserts, which skip the ORM's vector events
+    engine = make_engine(database_url)
+    yield engine
+    engine.dispose()
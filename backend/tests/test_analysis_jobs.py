@@ -0,0 +1,95 @@
+import asyncio
+import time
+from sqlalchemy import insert, select
+from sqlalchemy.orm import sessionmaker
+from app.api import models
+from app.services import analysis_jobs
+from app.services.analysis_jobs import AnalysisJobQueue
+
+LEASE_SECONDS = 0.6
+
+
+async def _until(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.02)
+
+
+def test_queues_share_jobs_by_lease(engine, monkeypatch):
+    with engine.begin() as conn:
+        conn.execute(insert(models.Resume).values(id=1, title="Resume", content="Python"))
+        conn.execute(insert(models.ResumeAnalysis).values(
+            id=1, resume_id=1, job_description="Python", status="queued", progress=0
+        ))
+    monkeypatch.setattr(analysis_jobs, "SessionLocal", sessionmaker(bind=engine))
+    monkeypatch.setattr(analysis_jobs.report_artifacts, "schedule", lambda job_id: None)
+
+    async def broadcast(job_id, user_id, progress, message):
+        pass
+
+    monkeypatch.setattr(AnalysisJobQueue, "_broadcast", staticmethod(broadcast))
+
+    def job():
+        with engine.connect() as conn:
+            return conn.execute(
+                select(models.ResumeAnalysis.status, models.ResumeAnalysis.worker_id)
+                .where(models.ResumeAnalysis.id == 1)
+            ).one()
+
+    async def scenario():
+        started, recorded = [], []
+        release = asyncio.Event()
+
+        # Stands in for the analysis in a worker process, until released
+        async def run_cpu(fn, job_id, worker_id):
+            started.append(worker_id)
+            await release.wait()
+            finished = analysis_jobs._finish(job_id, worker_id, "completed", result="{}", progress=100)
+            recorded.append((worker_id, finished))
+            return "completed" if finished else None
+
+        monkeypatch.setattr(analysis_jobs, "run_cpu", run_cpu)
+        first = AnalysisJobQueue(workers=1, poll_seconds=0.05, lease_seconds=LEASE_SECONDS)
+        second = AnalysisJobQueue(workers=1, poll_seconds=0.05, lease_seconds=LEASE_SECONDS)
+
+        await first.start()
+        await _until(lambda: started == [first.worker_id])
+        # Another process starting, and polling for longer than a lease,
+        # leaves a job alone while its worker renews the lease
+        await second.start()
+        await asyncio.sleep(LEASE_SECONDS * 2)
+        assert started == [first.worker_id]
+        assert tuple(job()) == ("running", first.worker_id)
+
+        # The first process dies: its lease lapses and the second takes the job over
+        for task in first._tasks:
+            task.cancel()
+        await _until(lambda: len(started) == 2)
+        assert started[1] == second.worker_id
+        assert tuple(job()) == ("running", second.worker_id)
+
+        # Only the current owner records an outcome
+        release.set()
+        await _until(lambda: len(recorded) == 2)
+        assert sorted(recorded) == sorted([(first.worker_id, False), (second.worker_id, True)])
+        assert tuple(job()) == ("completed", second.worker_id)
+        await second.stop()
+
+    asyncio.run(scenario())
+
+
+def test_stop_requeues_held_jobs(engine, monkeypatch):
+    with engine.begin() as conn:
+        conn.execute(insert(models.ResumeAnalysis).values(
+            id=1, resume_id=1, job_description="Python", status="queued", progress=0
+        ))
+    monkeypatch.setattr(analysis_jobs, "SessionLocal", sessionmaker(bind=engine))
+    assert analysis_jobs._claim(1, "worker-a")
+    assert not analysis_jobs._claim(1, "worker-b")
+
+    analysis_jobs._release("worker-b")
+    assert analysis_jobs._heartbeat(1, "worker-a")
+    analysis_jobs._release("worker-a")
+    assert not analysis_jobs._heartbeat(1, "worker-a")
+    assert analysis_jobs._queued_jobs() == [(0, 1)]
@@ -0,0 +1,42 @@
+import csv
+import io
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+from app.api import models
+from app.api.routes import analysis
+from app.services import bulk_export
+
+
+def test_export_holds_only_the_users_analyses(engine, monkeypatch):
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [
+            {"id": 1, "email": "one@example.com"}, {"id": 2, "email": "two@example.com"}
+        ])
+        conn.execute(insert(models.Resume), [
+            {"id": 1, "title": "Mine", "content": "Python", "user_id": 1},
+            {"id": 2, "title": "Theirs", "content": "Java", "user_id": 2}
+        ])
+        conn.execute(insert(models.JobApplication), [
+            {"id": 1, "company": "Acme", "position": "Engineer", "user_id": 1},
+            {"id": 2, "company": "Initech", "position": "Analyst", "user_id": 2}
+        ])
+        conn.execute(insert(models.ResumeAnalysis), [
+            {"id": 1, "resume_id": 1, "application_id": 1, "status": "completed"},
+            {"id": 2, "resume_id": 2, "application_id": 2, "status": "completed"},
+            {"id": 3, "resume_id": 1, "application_id": None, "status": "completed"},
+            {"id": 4, "resume_id": 2, "application_id": None, "status": "completed"}
+        ])
+    monkeypatch.setattr(bulk_export, "SessionLocal", sessionmaker(bind=engine))
+
+    app = FastAPI()
+    app.include_router(analysis.router)
+    with TestClient(app) as client:
+        response = client.get("/analysis/export", params={"user_id": 1})
+        assert response.status_code == 200
+        rows = list(csv.reader(io.StringIO(response.content.decode("utf-8-sig"))))
+        assert rows[0] == bulk_export.HEADER
+        assert [(row[0], row[5], row[7]) for row in rows[1:]] == [("1", "Mine", "Acme"), ("3", "Mine", "")]
+
+        assert client.get("/analysis/export").status_code == 422
@@ -0,0 +1,31 @@
+import numpy as np
+import spacy
+from spacy.language import Language
+from app.services.doc_cache import DocCache
+from app.services.nlp_registry import PipelineView
+
+TENSOR_WIDTH = 96
+
+
+@Language.component("test_tensor")
+def _tensor(doc):
+    # Like a tok2vec output, the bulk of a real Doc's memory
+    doc.tensor = np.zeros((len(doc), TENSOR_WIDTH), dtype=np.float32)
+    return doc
+
+
+def test_memory_tier_stays_within_its_budget(tmp_path):
+    nlp = spacy.blank("en")
+    nlp.add_pipe("test_tensor")
+    view = PipelineView(nlp)
+    budget = 1024 * 1024
+    cache = DocCache(cache_dir=str(tmp_path), memory_bytes=budget)
+
+    docs = [cache.parse(view, f"resume {i} " + "python developer " * 500) for i in range(20)]
+
+    stats = cache.stats()
+    # Each Doc's tensor alone is ~390 KB, where its DocBin is a few KB
+    assert stats["memory_bytes"] <= budget
+    assert stats["memory_entries"] < len(docs)
+    held = [doc for doc in docs if cache._memory.get(cache.key(view, doc.text)) is doc]
+    assert sum(doc.tensor.nbytes for doc in held) <= budget
@@ -0,0 +1,78 @@
+import time
+import numpy as np
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+from app.api import models
+from app.api.routes import applications
+from app.services import doc_vectors
+from app.services.ann_index import IVFIndex
+
+DIMS = 4
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    """A small index, and vectors from the first characters of the text in place of spaCy's."""
+    index = IVFIndex(str(tmp_path / "index"), DIMS, nlist=2, train_min=4)
+    decode = doc_vectors.decode_vector
+
+    def compute_vector(text):
+        return np.array([ord(c) for c in text[:DIMS]], dtype=np.float32).tobytes() if text else None
+
+    for module in (doc_vectors, applications):
+        monkeypatch.setattr(module, "get_job_index", lambda: index)
+        monkeypatch.setattr(module, "compute_vector", compute_vector)
+        monkeypatch.setattr(module, "decode_vector", lambda data, dims=DIMS: decode(data, dims))
+    return index
+
+
+def _application(id_, description, user_id=1):
+    return models.JobApplication(
+        id=id_, company="Acme", position="Engineer", status="Interview",
+        job_description=description, user_id=user_id
+    )
+
+
+def test_index_follows_committed_applications(engine, index):
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        db.add(_application(1, "python"))
+        db.flush()
+        assert len(index) == 0
+        db.rollback()
+        assert len(index) == 0
+
+        db.add(_application(1, "python"))
+        db.commit()
+        assert [id_ for id_, _ in index.search(np.ones(DIMS))] == [1]
+
+        db.delete(db.get(models.JobApplication, 1))
+        db.flush()
+        assert len(index) == 1
+        db.commit()
+        assert len(index) == 0
+
+        # Enough vectors to train on: the commit returns, and training follows on the io pool
+        db.add_all([_application(id_, text) for id_, text in enumerate(["java", "rust", "ruby", "perl"], 2)])
+        db.commit()
+        assert len(index) == 4
+        deadline = time.monotonic() + 10
+        while index._centroids is None:
+            assert time.monotonic() < deadline, "index was never trained"
+            time.sleep(0.02)
+
+
+def test_matches_hide_other_users_status(engine, index):
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [
+            {"id": 1, "email": "one@example.com"}, {"id": 2, "email": "two@example.com"}
+        ])
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        db.add(models.Resume(id=1, title="Resume", content="python", user_id=1))
+        db.add_all([_application(1, "python", user_id=1), _application(2, "pythonic", user_id=2)])
+        db.commit()
+
+        matches = applications.match_job_postings(1, k=10, nprobe=None, db=db)
+        assert {match.application_id: match.status for match in matches} == {1: "Interview", 2: None}
@@ -0,0 +1,45 @@
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+from app.api.limits import LimitRequestSize
+
+MAX_BYTES = 64 * 1024
+BOUNDARY = "limit-test"
+
+
+def _multipart(size: int):
+    yield f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"resume.txt\"\r\n\r\n".encode()
+    for _ in range(size // 1024):
+        yield b"x" * 1024
+    yield f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def _client(stored):
+    app = FastAPI()
+    app.add_middleware(LimitRequestSize, max_bytes=MAX_BYTES)
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        stored.append(len(await file.read()))
+        return {"size": stored[-1]}
+
+    return TestClient(app)
+
+
+def test_chunked_body_over_the_limit_is_rejected():
+    stored = []
+    client = _client(stored)
+    headers = {"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"}
+
+    # A generator is sent chunked, without a Content-Length to reject it by
+    response = client.post("/upload", content=_multipart(4 * MAX_BYTES), headers=headers)
+    assert "content-length" not in response.request.headers
+    assert response.status_code == 413
+    assert stored == []
+
+    response = client.post("/upload", content=b"".join(_multipart(4 * MAX_BYTES)), headers=headers)
+    assert response.status_code == 413
+    assert stored == []
+
+    response = client.post("/upload", content=_multipart(MAX_BYTES // 2), headers=headers)
+    assert response.status_code == 200
+    assert stored == [MAX_BYTES // 2]
@@ -0,0 +1,89 @@
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+import pytest
+from app.services.pubsub import InProcessPubSub, PubSub
+
+WORKERS = 3
+TOPIC = "analysis:1"
+
+
+class RecordingSocket:
+    """Stands in for a websocket and records which worker each update came from."""
+
+    def __init__(self, seen):
+        self.seen = seen
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, text: str) -> None:
+        message = json.loads(text)
+        if "worker" in message:
+            self.seen.add(message["worker"])
+
+    async def close(self) -> None:
+        pass
+
+
+async def _worker(number: int, path: str, barrier) -> dict:
+    from app.api.websocket import ConnectionManager
+    from app.services.pubsub import BrokerPubSub
+
+    manager = ConnectionManager(
+        heartbeat_seconds=3600, heartbeat_timeout=3600, pubsub=BrokerPubSub(path, flush_seconds=0.005)
+    )
+    await manager.start()
+    seen = set()
+    manager.subscribe(await manager.connect(RecordingSocket(seen)), {TOPIC})
+    await asyncio.to_thread(barrier.wait, 30)
+
+    async def publish():
+        while True:
+            manager.publish(TOPIC, {"worker": number})
+            await asyncio.sleep(0.05)
+
+    # Keep publishing until every worker has heard from every other
+    publisher = asyncio.ensure_future(publish())
+    deadline = time.monotonic() + 10
+    while len(seen) < WORKERS and time.monotonic() < deadline:
+        await asyncio.sleep(0.02)
+    role = manager.stats()["pubsub"]["role"]
+    await asyncio.to_thread(barrier.wait, 30)
+    publisher.cancel()
+    await manager.stop()
+    return {"seen": sorted(seen), "role": role}
+
+
+def _run_worker(number: int, path: str, barrier, queue) -> None:
+    queue.put((number, asyncio.run(_worker(number, path, barrier))))
+
+
+def test_broker_delivers_between_processes(tmp_path):
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    barrier = context.Barrier(WORKERS)
+    path = os.path.join(tmp_path, "pubsub.sock")
+    processes = [
+        context.Process(target=_run_worker, args=(number, path, barrier, queue)) for number in range(WORKERS)
+    ]
+    for process in processes:
+        process.start()
+    outcomes = dict(queue.get(timeout=60) for _ in processes)
+    for process in processes:
+        process.join(timeout=10)
+
+    assert all(outcome["seen"] == list(range(WORKERS)) for outcome in outcomes.values()), outcomes
+    # One worker serves the socket and the others connect to it
+    assert sorted(outcome["role"] for outcome in outcomes.values()) == ["broker"] + ["client"] * (WORKERS - 1)
+
+
+def test_pubsub_requires_send():
+    class Incomplete(PubSub):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+    InProcessPubSub(peers=set())
@@ -0,0 +1,29 @@
+import os
+import pytest
+from app.database import make_engine
+from benchmarks.bench_query_plans import HOT_QUERIES, analyze, migrate, plan, seed
+
+# Enough rows, over enough users, for SQLite to prefer the indexes to a
+# scan; benchmarks/bench_query_plans.py measures them at full size
+ANALYSES = 2000
+
+
+@pytest.fixture(scope="module")
+def migrated(tmp_path_factory):
+    url = f"sqlite:///{os.path.join(tmp_path_factory.mktemp('plans'), 'plans.db')}"
+    migrate(url, "head")
+    engine = make_engine(url)
+    ids = seed(engine, ANALYSES, 0)
+    analyze(engine)
+    yield engine, ids
+    engine.dispose()
+
+
+@pytest.mark.parametrize("name", list(HOT_QUERIES))
+def test_hot_query_uses_its_indexes(migrated, name):
+    engine, ids = migrated
+    build, indexes = HOT_QUERIES[name]
+    with engine.connect() as conn:
+        query_plan = plan(conn, build(ids))
+    for index in indexes:
+        assert index in query_plan, f"{name} doesn't use {index}:\n{query_plan}"
@@ -0,0 +1,48 @@
+import json
+from datetime import datetime
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.api import models
+from app.api.routes import reports
+from app.database import get_async_db, make_async_engine
+
+
+def test_combined_report_skips_inline_analyses(database_url, engine, tmp_path, monkeypatch):
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [{"id": 1, "email": "user@example.com"}])
+        conn.execute(insert(models.JobApplication), [
+            {"id": 1, "company": "Acme", "position": "Engineer", "user_id": 1, "date_applied": datetime(2024, 1, 1)}
+        ])
+        # One analysis from the job queue, with its report, and one computed inline, without
+        conn.execute(insert(models.ResumeAnalysis).values(
+            id=1, application_id=1, status="completed", result=json.dumps({"score": 1})
+        ))
+        conn.execute(insert(models.ResumeAnalysis).values(id=2, application_id=1, match_score=50.0))
+
+    rendered = []
+    combined = tmp_path / "combined.pdf"
+    combined.write_bytes(b"%PDF-1.4")
+
+    async def ensure_combined(analyses):
+        rendered.extend(analyses)
+        return str(combined)
+
+    monkeypatch.setattr(reports.report_artifacts, "ensure_combined", ensure_combined)
+    AsyncSessionLocal = async_sessionmaker(make_async_engine(database_url, tuned=False), expire_on_commit=False)
+
+    async def get_test_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(reports.router)
+    app.dependency_overrides[get_async_db] = get_test_async_db
+    with TestClient(app) as client:
+        response = client.get("/reports/combined", params={"user_id": 1})
+        assert response.status_code == 200
+        assert rendered == [(1, "Engineer at Acme", {"score": 1})]
+
+        response = client.get("/reports/combined", params={"analysis_ids": [2]})
+        assert response.status_code == 404
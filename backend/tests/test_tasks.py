@@ -0,0 +1,22 @@
+import spacy
+from app.services import doc_vectors, nlp_registry, resume_analyzer, tasks
+from app.services.doc_cache import DocCache
+from app.services.nlp_registry import NLPRegistry
+from app.services.resume_analyzer import ResumeAnalyzer
+
+
+def test_prepared_resume_is_cached_for_analysis(tmp_path, monkeypatch):
+    # A pipeline with a component, so each profile parses, and caches, differently
+    nlp = spacy.blank("en")
+    nlp.add_pipe("attribute_ruler")
+    registry = NLPRegistry(default_model="test")
+    registry._models["test"] = nlp
+    monkeypatch.setattr(nlp_registry, "nlp_registry", registry)
+    cache = DocCache(cache_dir=str(tmp_path))
+    for module in (tasks, doc_vectors, resume_analyzer):
+        monkeypatch.setattr(module, "doc_cache", cache)
+
+    text = "Senior Python developer with FastAPI and PostgreSQL experience"
+    tasks.prepare_document(text)
+    assert cache.misses == 1
+    assert cache.get(ResumeAnalyzer().nlp, text) is not None
@@ -0,0 +1,45 @@
+import asyncio
+import glob
+import os
+from app.services import text_extraction
+from app.services.executor import ExecutorLayer
+from app.services.sections import section_detector
+from app.services.upload_store import StoredUpload, UploadStore
+from benchmarks.bench_extraction import render_pdf
+
+RESUME = "\n".join(
+    ["Jane Doe", "Contact Information", "jane@example.com", "Experience"]
+    + [f"Engineer at Company {i}, built service number {i} in Python" for i in range(120)]
+    + ["Education", "BSc Computer Science", "Skills"]
+    + [f"Skill {i}" for i in range(120)]
+    + ["Projects", "Resume parser"]
+)
+
+
+def test_sections_are_indexed_during_extraction_and_cached(tmp_path, monkeypatch):
+    path = str(tmp_path / "resume.pdf")
+    render_pdf(RESUME, path)
+    # Pages decoded on threads, in several runs
+    layer = ExecutorLayer(io_workers=4, cpu_workers=0, pdf_workers=0)
+    monkeypatch.setattr(text_extraction, "executor", layer)
+    monkeypatch.setattr(text_extraction.settings, "PDF_PARALLEL_MIN_PAGES", 1)
+    store = UploadStore(root=str(tmp_path / "uploads"))
+    upload = StoredUpload("ab" * 32, path, os.path.getsize(path), False)
+
+    async def scenario():
+        first = await store.extract_sections(upload, "pypdf2")
+        second = await store.extract_sections(upload, "pypdf2")
+        return first, second
+
+    try:
+        (text, sections), cached = asyncio.run(scenario())
+    finally:
+        layer.shutdown()
+
+    assert text_extraction.page_count(path) > 2
+    assert text == "".join(text_extraction.iter_text_chunks(path, path, "pypdf2"))
+    assert sections == section_detector.index(text)
+    assert set(sections) == {"contact", "experience", "education", "skills", "projects"}
+    assert cached == (text, sections)
+    assert (store.text_misses, store.text_hits) == (1, 1)
+    assert len(glob.glob(str(tmp_path / "uploads" / "ab" / "*.sections.json"))) == 1
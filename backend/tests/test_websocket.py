@@ -0,0 +1,50 @@
+import asyncio
+from app.api.websocket import ConnectionManager
+from app.services.pubsub import InProcessPubSub
+
+HEARTBEAT_SECONDS = 0.05
+
+
+class ListeningSocket:
+    """A client that reads every message and never writes, or stops reading."""
+
+    def __init__(self):
+        self.received = []
+        self.reading = asyncio.Event()
+        self.reading.set()
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, text: str) -> None:
+        await self.reading.wait()
+        self.received.append(text)
+
+    async def close(self) -> None:
+        pass
+
+
+def test_heartbeat_keeps_listen_only_clients():
+    async def scenario():
+        manager = ConnectionManager(
+            send_timeout=HEARTBEAT_SECONDS * 2,
+            heartbeat_seconds=HEARTBEAT_SECONDS,
+            heartbeat_timeout=HEARTBEAT_SECONDS * 4,
+            pubsub=InProcessPubSub(peers=set())
+        )
+        await manager.start()
+        listener, stalled = ListeningSocket(), ListeningSocket()
+        await manager.connect(listener)
+        await manager.connect(stalled)
+        stalled.reading.clear()
+
+        await asyncio.sleep(HEARTBEAT_SECONDS * 20)
+        sockets = {connection.websocket for connection in manager.connections}
+        await manager.stop()
+        return sockets, listener, stalled
+
+    sockets, listener, stalled = asyncio.run(scenario())
+    # Reading the pings keeps a silent client connected; not reading them doesn't
+    assert sockets == {listener}
+    assert len(listener.received) > 5
+    assert stalled.received == []